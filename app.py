@@ -1,19 +1,111 @@
-from flask import Flask, render_template, request, jsonify, redirect, url_for, send_from_directory
+from flask import Flask, Response, render_template, request, jsonify, redirect, url_for, send_from_directory, \
+    g, abort
+from urllib.parse import quote
 import os
-import glob
+import sqlite3
 import subprocess
-import time
-from database import init_db, add_task, update_task, delete_task, get_all_tasks, \
-    get_recurring_tasks, get_task, complete_task, get_tasks_for_today, get_completion_history, \
-    reorder_tasks, set_task_position
+import atexit
+from datetime import date, timedelta
+from database import init_db, release_db, close_all_db, get_data_version, add_task, update_task, delete_task, get_all_tasks, \
+    get_recurring_tasks, get_task, complete_task, complete_tasks, get_tasks_for_today, get_completion_history, \
+    reorder_tasks, set_task_position, get_today_cache_stats, iter_export, import_ndjson, \
+    get_completion_stats, get_schedule, search_tasks, apply_task_batch, get_change_seq, get_task_changes, \
+    get_board, list_boards, add_board, SCHEDULE_MAX_DAYS, DEFAULT_BOARD_ID
+from events import broker, stream_events
+from display import DisplayController
+from retention import RetentionWorker
+import metrics
+from assets import install as install_assets
 
 app = Flask(__name__)
-app.config['SEND_FILE_MAX_AGE_DEFAULT'] = 0  # Disable static file caching
+HISTORY_MAX_LIMIT = 500
+COMPLETE_BATCH_MAX = 500
+SEARCH_MAX_LIMIT = 100
+BATCH_MAX_OPS = 1000
+app.config['SEND_FILE_MAX_AGE_DEFAULT'] = 0  # unversioned /static/ URLs always revalidate
+assets = install_assets(app)  # templates use asset_url(): hashed, cached for good
 
+if metrics.METRICS_ENABLED:
+    metrics.install(app)
 
-@app.context_processor
-def inject_cache_bust():
-    return {"cache_bust": int(time.time())}
+retention = RetentionWorker()  # started by startup(), not when imported by tools
+_ready = False
+
+
+@app.teardown_appcontext
+def _release_db_connection(exc):
+    release_db()
+
+
+atexit.register(close_all_db)
+
+
+def _json_with_etag(etag, load):
+    """Answer 304 if the client already has `etag`, else jsonify(load())."""
+    if request.if_none_match.contains(etag):
+        resp = app.response_class(status=304)
+    else:
+        resp = jsonify(load())
+    resp.set_etag(etag)
+    resp.headers["Cache-Control"] = "no-cache"
+    return resp
+
+
+# ──────────────────────────────────────────────
+#  Boards: every data route also answers under /b/<slug>/…
+# ──────────────────────────────────────────────
+
+def board_route(rule, **options):
+    """Register a view at `rule` (default board) and at /b/<board>`rule`.
+
+    The view reads the board from g.board_id (see _resolve_board).
+    """
+    def decorator(view):
+        endpoint = options.pop("endpoint", view.__name__)
+        app.add_url_rule(rule, endpoint, view, **options)
+        app.add_url_rule(f"/b/<board>{rule}", f"board_{endpoint}", view, **options)
+        return view
+    return decorator
+
+
+@app.url_value_preprocessor
+def _resolve_board(endpoint, values):
+    slug = values.pop("board", None) if values else None
+    if slug is None:
+        g.board_id, g.board_slug = DEFAULT_BOARD_ID, None
+        return
+    board = get_board(slug)
+    if board is None:
+        abort(app.make_response((jsonify({"status": "error", "message": "Board not found"}), 404)))
+    g.board_id, g.board_slug = board["id"], slug
+
+
+def startup():
+    """Prepare the database and background work; call once before serving."""
+    global _ready
+    init_db()
+    retention.start()
+    _ready = True
+
+
+@app.route("/healthz")
+def healthz():
+    """Readiness probe: no template, one indexed query."""
+    if not _ready:
+        return jsonify({"status": "starting"}), 503
+    try:
+        version = get_data_version()
+    except sqlite3.Error as e:
+        return jsonify({"status": "error", "message": str(e)}), 503
+    return jsonify({"status": "ok", "data_version": version})
+
+
+@app.route("/metrics")
+def prometheus_metrics():
+    """Prometheus text exposition (needs DASHBOARD_METRICS=1)."""
+    if not metrics.METRICS_ENABLED:
+        return jsonify({"status": "error", "message": "Metrics disabled (DASHBOARD_METRICS=1)"}), 404
+    return Response(metrics.render_prometheus(), mimetype="text/plain; version=0.0.4")
 
 
 @app.route("/favicon.ico")
@@ -29,139 +121,133 @@ def favicon():
 #  Display control (RPi backlight + screen power)
 # ──────────────────────────────────────────────
 
-def _display_power(on):
-    """Turn RPi display on/off using every available method."""
-    results = {}
-    env = {**os.environ, "DISPLAY": os.environ.get("DISPLAY", ":0")}
-
-    # 1) sysfs brightness
-    bri_paths = glob.glob("/sys/class/backlight/*/brightness")
-    if bri_paths:
-        try:
-            if on:
-                max_paths = glob.glob("/sys/class/backlight/*/max_brightness")
-                val = 255
-                if max_paths:
-                    with open(max_paths[0]) as f:
-                        val = int(f.read().strip())
-            else:
-                val = 0
-            with open(bri_paths[0], "w") as f:
-                f.write(str(val))
-            results["brightness"] = True
-        except OSError as e:
-            results["brightness"] = str(e)
-
-    # 2) sysfs bl_power (0 = on, 1 = off on most panels)
-    bl_paths = glob.glob("/sys/class/backlight/*/bl_power")
-    if bl_paths:
-        try:
-            with open(bl_paths[0], "w") as f:
-                f.write("0" if on else "1")
-            results["bl_power"] = True
-        except OSError as e:
-            results["bl_power"] = str(e)
-
-    # 3) vcgencmd display_power (works for DSI & HDMI on RPi)
-    try:
-        subprocess.run(
-            ["vcgencmd", "display_power", "1" if on else "0"],
-            capture_output=True, timeout=5, env=env,
-        )
-        results["vcgencmd"] = True
-    except (FileNotFoundError, subprocess.TimeoutExpired):
-        pass
-
-    # 4) xset dpms (X11)
-    try:
-        if on:
-            subprocess.run(["xset", "dpms", "force", "on"],
-                           capture_output=True, timeout=5, env=env)
-        else:
-            subprocess.run(["xset", "dpms", "force", "off"],
-                           capture_output=True, timeout=5, env=env)
-        results["xset"] = True
-    except (FileNotFoundError, subprocess.TimeoutExpired):
-        pass
+display = DisplayController(run=metrics.timed_run if metrics.METRICS_ENABLED else subprocess.run)
 
-    return results
 
+def _display_job(action):
+    """Queue a display action; the client polls /api/display/jobs/<id> if it cares.
 
-@app.route("/api/backlight/off", methods=["POST"])
+    The screen is the one attached to this host, which belongs to the default
+    board; kiosks of other boards get a 404 and keep their own screen on.
+    """
+    if g.board_id != DEFAULT_BOARD_ID:
+        return jsonify({"status": "error", "message": "No display attached to this board"}), 404
+    job = display.submit(action)
+    return jsonify({"ok": True, "job_id": job["id"], "status": job["status"]}), 202
+
+
+@board_route("/api/backlight/off", methods=["POST"])
 def backlight_off():
-    r = _display_power(False)
-    return jsonify({"ok": True, "methods": r})
+    return _display_job("backlight_off")
 
 
-@app.route("/api/backlight/on", methods=["POST"])
+@board_route("/api/backlight/on", methods=["POST"])
 def backlight_on():
-    r = _display_power(True)
-    return jsonify({"ok": True, "methods": r})
+    return _display_job("backlight_on")
 
 
-@app.route("/api/screen/off", methods=["POST"])
+@board_route("/api/screen/off", methods=["POST"])
 def screen_off():
     """Night mode – turn off display AND cut USB power to screen."""
-    r = _display_power(False)
-    # Also try uhubctl to cut USB power entirely
-    try:
-        subprocess.run(["uhubctl", "-a", "off", "-p", "2"],
-                       capture_output=True, timeout=10)
-        r["uhubctl"] = True
-    except (FileNotFoundError, subprocess.TimeoutExpired):
-        # If uhubctl not available, try generic USB power off
-        try:
-            subprocess.run(["uhubctl", "-a", "off"],
-                           capture_output=True, timeout=10)
-            r["uhubctl"] = True
-        except (FileNotFoundError, subprocess.TimeoutExpired):
-            r["uhubctl"] = False
-    return jsonify({"ok": True, "methods": r})
-
-
-@app.route("/api/screen/on", methods=["POST"])
+    return _display_job("screen_off")
+
+
+@board_route("/api/screen/on", methods=["POST"])
 def screen_on():
     """Restore USB power + display."""
-    results = {}
-    # Restore USB power first (so screen has power before we set backlight)
-    try:
-        subprocess.run(["uhubctl", "-a", "on", "-p", "2"],
-                       capture_output=True, timeout=10)
-        results["uhubctl"] = True
-    except (FileNotFoundError, subprocess.TimeoutExpired):
-        try:
-            subprocess.run(["uhubctl", "-a", "on"],
-                           capture_output=True, timeout=10)
-            results["uhubctl"] = True
-        except (FileNotFoundError, subprocess.TimeoutExpired):
-            results["uhubctl"] = False
-    time.sleep(2)  # Give screen time to power up
-    r = _display_power(True)
-    results.update(r)
-    return jsonify({"ok": True, "methods": results})
+    return _display_job("screen_on")
+
+
+@app.route("/api/display/jobs/<int:job_id>", methods=["GET"])
+def display_job_status(job_id):
+    job = display.get_job(job_id)
+    if job is None:
+        return jsonify({"status": "error", "message": "Job not found"}), 404
+    return jsonify(job)
+
+
+@app.route("/api/display", methods=["GET"])
+def display_capabilities():
+    """Display control methods detected at startup."""
+    return jsonify(display.capabilities())
 
 
 # ──────────────────────────────────────────────
 #  Dashboard (touchscreen kiosk)
 # ──────────────────────────────────────────────
 
-@app.route("/")
+def _cached_page(template):
+    """Render a page with an ETag so a reload costs a 304 until assets change.
+
+    api_base is the URL prefix of the page's board ("" for the default board).
+    """
+    api_base = f"/b/{g.board_slug}" if g.board_slug else ""
+    resp = app.make_response(render_template(template, api_base=api_base))
+    resp.headers["Cache-Control"] = "no-cache"
+    resp.add_etag()
+    return resp.make_conditional(request)
+
+
+@board_route("/")
 def dashboard():
-    return render_template("dashboard.html")
+    return _cached_page("dashboard.html")
 
 
-@app.route("/api/tasks/today")
+@board_route("/api/tasks/today")
 def api_tasks_today():
     """Return tasks that should appear on today's dashboard."""
-    tasks = get_tasks_for_today()
-    return jsonify(tasks)
-
-
-@app.route("/api/tasks/<int:task_id>/complete", methods=["POST"])
+    # The today-view also depends on the date, not only on stored data
+    etag = f"v{get_data_version(g.board_id)}-{date.today().isoformat()}"
+    return _json_with_etag(etag, lambda: get_tasks_for_today(g.board_id))
+
+
+@board_route("/api/events")
+def api_events():
+    """SSE stream of "tasks" / "day" events for the dashboard."""
+    if not broker.try_register():
+        resp = jsonify({"status": "error", "message": "Too many event streams"})
+        resp.status_code = 503
+        resp.headers["Retry-After"] = "60"
+        return resp
+    resp = Response(stream_events(request.headers.get("Last-Event-ID"), g.board_id),
+                    mimetype="text/event-stream")
+    resp.call_on_close(broker.unregister)
+    resp.headers["Cache-Control"] = "no-cache"
+    resp.headers["X-Accel-Buffering"] = "no"
+    return resp
+
+
+@app.route("/api/cache/stats")
+def api_cache_stats():
+    """Hit/miss counters of the in-memory today-view cache (total and per board id)."""
+    return jsonify(get_today_cache_stats())
+
+
+@app.route("/api/retention")
+def api_retention():
+    """Policy and last result of the background completion compaction."""
+    return jsonify(retention.status())
+
+
+@board_route("/api/tasks/complete", methods=["POST"])
+def api_complete_tasks():
+    """Batched, idempotent completions: {"completions": [{client_id, task_id, completed_at}]}."""
+    data = request.get_json(force=True, silent=True) or {}
+    items = data.get("completions") if isinstance(data, dict) else None
+    if not isinstance(items, list) or not all(isinstance(i, dict) for i in items):
+        return jsonify({"status": "error", "message": "Expected a list of completions"}), 400
+    if len(items) > COMPLETE_BATCH_MAX:
+        return jsonify({"status": "error",
+                        "message": f"At most {COMPLETE_BATCH_MAX} completions per request"}), 400
+    results = complete_tasks(items, g.board_id)
+    return jsonify({"status": "ok", "results": results, "seq": get_change_seq(g.board_id)})
+
+
+@board_route("/api/tasks/<int:task_id>/complete", methods=["POST"])
 def api_complete_task(task_id):
-    ok = complete_task(task_id)
+    ok = complete_task(task_id, g.board_id)
     if ok:
-        return jsonify({"status": "ok"})
+        return jsonify({"status": "ok", "seq": get_change_seq(g.board_id)})
     return jsonify({"status": "error", "message": "Task not found"}), 404
 
 
@@ -169,100 +255,288 @@ def api_complete_task(task_id):
 #  Admin panel (accessed from another device)
 # ──────────────────────────────────────────────
 
-@app.route("/admin")
+@board_route("/admin")
 def admin():
-    return render_template("admin.html")
+    return _cached_page("admin.html")
 
 
-@app.route("/api/tasks", methods=["GET"])
+@app.route("/benchmark/render")
+def render_benchmark():
+    """Frame times of the task list with hundreds of synthetic tasks (in the browser)."""
+    return _cached_page("render_benchmark.html")
+
+
+@board_route("/api/tasks", methods=["GET"])
 def api_get_tasks():
-    tasks = get_all_tasks()
-    return jsonify(tasks)
+    seq = get_change_seq(g.board_id)  # read first: a change racing the list is re-sent, never lost
+    resp = _json_with_etag(f"v{get_data_version(g.board_id)}", lambda: get_all_tasks(g.board_id))
+    resp.headers["X-Change-Seq"] = str(seq)
+    return resp
+
+
+@board_route("/api/tasks/changes", methods=["GET"])
+def api_task_changes():
+    """Tasks created/updated and ids deleted since ?since=<seq> (X-Change-Seq or a write's "seq")."""
+    since = request.args.get("since", type=int)
+    if since is None or since < 0:
+        return jsonify({"status": "error", "message": "since must be a sequence number >= 0"}), 400
+    return jsonify(get_task_changes(since, g.board_id))
+
+
+@board_route("/api/tasks/search", methods=["GET"])
+def api_search_tasks():
+    """Ranked prefix search over titles and descriptions; X-Next-Offset when more remain."""
+    q = request.args.get("q", "")
+    limit = request.args.get("limit", 20, type=int)
+    offset = request.args.get("offset", 0, type=int)
+    if limit < 1 or limit > SEARCH_MAX_LIMIT or offset < 0:
+        return jsonify({"status": "error",
+                        "message": f"limit must be 1..{SEARCH_MAX_LIMIT}, offset >= 0"}), 400
+    kind = request.args.get("type")
+    if kind not in (None, "recurring", "one-time"):
+        return jsonify({"status": "error", "message": "type must be recurring or one-time"}), 400
+    recurring = None if kind is None else kind == "recurring"
+
+    results = search_tasks(q, limit + 1, offset, recurring, g.board_id)
+    resp = jsonify(results[:limit])
+    if len(results) > limit:
+        resp.headers["X-Next-Offset"] = str(offset + limit)
+    return resp
+
+
+@board_route("/api/schedule", methods=["GET"])
+def api_schedule():
+    """Projected occurrences per day: ?from=YYYY-MM-DD&to=YYYY-MM-DD (max one year)."""
+    try:
+        first = date.fromisoformat(request.args.get("from") or date.today().isoformat())
+        last = date.fromisoformat(request.args.get("to") or (first + timedelta(days=30)).isoformat())
+    except ValueError:
+        return jsonify({"status": "error", "message": "Dates must be YYYY-MM-DD"}), 400
+    if last < first or (last - first).days >= SCHEDULE_MAX_DAYS:
+        return jsonify({"status": "error",
+                        "message": f"Range must be 1..{SCHEDULE_MAX_DAYS} days"}), 400
+    return jsonify(get_schedule(first, last, g.board_id))
 
 
-@app.route("/api/tasks/recurring", methods=["GET"])
+@board_route("/api/tasks/recurring", methods=["GET"])
 def api_get_recurring():
-    tasks = get_recurring_tasks()
+    tasks = get_recurring_tasks(g.board_id)
     return jsonify(tasks)
 
 
-@app.route("/api/tasks", methods=["POST"])
-def api_add_task():
-    data = request.get_json(force=True)
-    title = data.get("title", "").strip()
+def _parse_new_task(data):
+    """Validate a create payload; returns (add_task kwargs, None) or (None, error message)."""
+    title = data.get("title")
+    title = title.strip() if isinstance(title, str) else ""
     if not title:
-        return jsonify({"status": "error", "message": "Title is required"}), 400
+        return None, "Title is required"
 
-    description = data.get("description", "").strip()
+    description = data.get("description")
+    description = description.strip() if isinstance(description, str) else ""
     is_recurring = bool(data.get("is_recurring", False))
-    recurrence_type = data.get("recurrence_type")  # days / weeks / months / weekdays
+    recurrence_type = data.get("recurrence_type")  # days / weeks / months / weekdays / month_end / nth_weekday
     recurrence_value = data.get("recurrence_value")  # int
     recurrence_days = data.get("recurrence_days")  # e.g. "mon,wed,fri"
+    recurrence_nth = data.get("recurrence_nth")  # 1-4 or -1 (last), nth_weekday only
     start_date = data.get("start_date")  # e.g. "2026-02-16"
     end_date = data.get("end_date")  # e.g. "2026-03-01"
 
     if is_recurring:
-        if recurrence_type == "weekdays":
+        if recurrence_type in ("weekdays", "nth_weekday"):
             if not recurrence_days:
-                return jsonify({"status": "error", "message": "Wybierz dni tygodnia"}), 400
-        elif not recurrence_type or not recurrence_value:
-            return jsonify({"status": "error", "message": "Recurrence details required"}), 400
+                return None, "Wybierz dni tygodnia"
+        elif not recurrence_type or (recurrence_type != "month_end" and not recurrence_value):
+            return None, "Recurrence details required"
+
+    return {"title": title, "description": description, "is_recurring": is_recurring,
+            "recurrence_type": recurrence_type, "recurrence_value": recurrence_value,
+            "recurrence_days": recurrence_days, "recurrence_nth": recurrence_nth,
+            "start_date": start_date, "end_date": end_date}, None
+
+
+_UPDATE_FIELDS = ("title", "description", "recurrence_type", "recurrence_value",
+                  "recurrence_days", "recurrence_nth", "start_date", "end_date", "sort_order")
+
 
-    task_id = add_task(title, description, is_recurring, recurrence_type,
-                       recurrence_value, recurrence_days, start_date, end_date)
-    return jsonify({"status": "ok", "id": task_id}), 201
+def _parse_task_update(data):
+    """update_task kwargs from a payload (absent fields stay unchanged)."""
+    return {field: data.get(field) for field in _UPDATE_FIELDS}
 
 
-@app.route("/api/tasks/<int:task_id>", methods=["PUT"])
+@board_route("/api/tasks", methods=["POST"])
+def api_add_task():
+    data = request.get_json(force=True)
+    fields, error = _parse_new_task(data)
+    if error:
+        return jsonify({"status": "error", "message": error}), 400
+    try:
+        task_id = add_task(**fields, board_id=g.board_id)
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+    return jsonify({"status": "ok", "id": task_id, "seq": get_change_seq(g.board_id)}), 201
+
+
+@board_route("/api/tasks/<int:task_id>", methods=["PUT"])
 def api_update_task(task_id):
     data = request.get_json(force=True)
-    title = data.get("title")
-    description = data.get("description")
-    recurrence_type = data.get("recurrence_type")
-    recurrence_value = data.get("recurrence_value")
-    recurrence_days = data.get("recurrence_days")
-    start_date = data.get("start_date")
-    end_date = data.get("end_date")
-    sort_order = data.get("sort_order")
-    update_task(task_id, title, description, recurrence_type, recurrence_value,
-               recurrence_days, start_date, end_date, sort_order)
-    return jsonify({"status": "ok"})
-
-
-@app.route("/api/tasks/<int:task_id>", methods=["DELETE"])
+    try:
+        update_task(task_id, **_parse_task_update(data), board_id=g.board_id)
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+    return jsonify({"status": "ok", "seq": get_change_seq(g.board_id)})
+
+
+@board_route("/api/tasks/batch", methods=["POST"])
+def api_task_batch():
+    """Create/update/delete many tasks in one transaction.
+
+    Body: {"operations": [{"op": "create", ...task fields},
+                          {"op": "update", "id": n, ...fields},
+                          {"op": "delete", "id": n}]}
+    Either every operation is applied (200) or none is (400/404/409);
+    a malformed field or recurrence rule is reported per operation with status "invalid".
+    "results" has one entry per operation either way.
+    """
+    data = request.get_json(force=True, silent=True) or {}
+    items = data.get("operations") if isinstance(data, dict) else None
+    if not isinstance(items, list) or not items:
+        return jsonify({"status": "error", "message": "Expected a non-empty list of operations"}), 400
+    if len(items) > BATCH_MAX_OPS:
+        return jsonify({"status": "error",
+                        "message": f"At most {BATCH_MAX_OPS} operations per request"}), 400
+
+    ops, results = [], []
+    for item in items:
+        op = item.get("op") if isinstance(item, dict) else None
+        error = None
+        if op == "create":
+            fields, error = _parse_new_task(item)
+            ops.append({"op": op, "fields": fields})
+        elif op in ("update", "delete"):
+            task_id = item.get("id")
+            if not isinstance(task_id, int) or isinstance(task_id, bool):
+                error = "id is required"
+            ops.append({"op": op, "id": task_id, "fields": _parse_task_update(item)})
+        else:
+            error = "op must be create, update or delete"
+        results.append({"status": "invalid", "message": error} if error else {"status": "ok"})
+    if any(r["status"] != "ok" for r in results):
+        return jsonify({"status": "error", "message": "Invalid operations, nothing applied",
+                        "results": results}), 400
+
+    results = apply_task_batch(ops, g.board_id)
+    failed = {r["status"] for r in results} - {"ok"}
+    if failed:
+        code = 400 if "invalid" in failed else 409 if "duplicate" in failed else 404
+        return jsonify({"status": "error", "message": "Nothing applied", "results": results}), code
+    return jsonify({"status": "ok", "results": results, "seq": get_change_seq(g.board_id)})
+
+
+@board_route("/api/tasks/<int:task_id>", methods=["DELETE"])
 def api_delete_task(task_id):
-    delete_task(task_id)
-    return jsonify({"status": "ok"})
+    delete_task(task_id, g.board_id)
+    return jsonify({"status": "ok", "seq": get_change_seq(g.board_id)})
 
 
-@app.route("/api/tasks/reorder", methods=["POST"])
+@board_route("/api/tasks/reorder", methods=["POST"])
 def api_reorder_tasks():
     data = request.get_json(force=True)
     task_ids = data.get("task_ids", [])
     if not task_ids:
         return jsonify({"status": "error", "message": "No task IDs provided"}), 400
-    reorder_tasks(task_ids)
-    return jsonify({"status": "ok"})
+    reorder_tasks(task_ids, g.board_id)
+    return jsonify({"status": "ok", "seq": get_change_seq(g.board_id)})
 
 
-@app.route("/api/tasks/<int:task_id>/position", methods=["POST"])
+@board_route("/api/tasks/<int:task_id>/position", methods=["POST"])
 def api_set_position(task_id):
     data = request.get_json(force=True)
     position = data.get("position")
     if position is None or not isinstance(position, int) or position < 1:
         return jsonify({"status": "error", "message": "Podaj pozycję (liczba >= 1)"}), 400
-    set_task_position(task_id, position)
-    return jsonify({"status": "ok"})
+    set_task_position(task_id, position, g.board_id)
+    return jsonify({"status": "ok", "seq": get_change_seq(g.board_id)})
 
 
-@app.route("/api/tasks/<int:task_id>/history", methods=["GET"])
+@board_route("/api/tasks/<int:task_id>/history", methods=["GET"])
 def api_task_history(task_id):
-    history = get_completion_history(task_id)
-    return jsonify(history)
+    """Newest-first completions; page further back with ?before=<X-Next-Cursor>."""
+    limit = request.args.get("limit", 50, type=int)
+    if limit < 1 or limit > HISTORY_MAX_LIMIT:
+        return jsonify({"status": "error", "message": f"limit must be 1..{HISTORY_MAX_LIMIT}"}), 400
+    before = None
+    cursor = request.args.get("before")
+    if cursor:
+        completed_at, _, row_id = cursor.rpartition("|")
+        if not completed_at or not row_id.lstrip("-").isdigit():
+            return jsonify({"status": "error", "message": "Invalid cursor"}), 400
+        before = (completed_at, int(row_id))
+
+    history = get_completion_history(task_id, limit, before, g.board_id)
+    resp = jsonify(history)
+    if len(history) == limit:
+        last = history[-1]
+        next_cursor = f"{last['completed_at']}|{last['id']}"
+        resp.headers["X-Next-Cursor"] = next_cursor
+        resp.headers["Link"] = (f'<{request.path}?limit={limit}&before={quote(next_cursor)}>; '
+                                'rel="next"')
+    return resp
+
+
+@board_route("/api/tasks/<int:task_id>/stats", methods=["GET"])
+def api_task_stats(task_id):
+    """Completion counts per week/month, streaks and average interval."""
+    stats = get_completion_stats(task_id, g.board_id)
+    if stats is None:
+        return jsonify({"status": "error", "message": "Task not found"}), 404
+    return jsonify(stats)
+
+
+@board_route("/api/export", methods=["GET"])
+def api_export():
+    """Stream the board's tasks and completions as NDJSON."""
+    board = f"-{g.board_slug}" if g.board_slug else ""
+    filename = f"zadania{board}-{date.today().isoformat()}.ndjson"
+    return Response(iter_export(g.board_id), mimetype="application/x-ndjson",
+                    headers={"Content-Disposition": f"attachment; filename={filename}"})
+
+
+@board_route("/api/import", methods=["POST"])
+def api_import():
+    """Append tasks and completions from an NDJSON body (format of /api/export)."""
+    try:
+        counts = import_ndjson(request.stream, board_id=g.board_id)
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+    return jsonify({"status": "ok", **counts, "seq": get_change_seq(g.board_id)})
+
+
+@app.route("/api/boards", methods=["GET"])
+def api_get_boards():
+    """All boards with their URL prefix and number of active tasks."""
+    boards = list_boards()
+    for board in boards:
+        board["api_base"] = "" if board["id"] == DEFAULT_BOARD_ID else f"/b/{board['slug']}"
+    return jsonify(boards)
+
+
+@app.route("/api/boards", methods=["POST"])
+def api_add_board():
+    """Create a board: {"slug": "kuchnia", "name": "Kuchnia"}; served at /b/<slug>/."""
+    data = request.get_json(force=True, silent=True)
+    if not isinstance(data, dict):
+        return jsonify({"status": "error", "message": "Expected a JSON object"}), 400
+    slug, name = data.get("slug"), data.get("name")
+    try:
+        board_id = add_board(slug, name.strip() if isinstance(name, str) else "")
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+    return jsonify({"status": "ok", "id": board_id, "api_base": f"/b/{slug}"}), 201
 
 
 # ──────────────────────────────────────────────
 
 if __name__ == "__main__":
-    init_db()
+    # Development server; production: python3 serve.py
+    startup()
     app.run(host="0.0.0.0", port=5000, debug=False)
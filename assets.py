@@ -0,0 +1,97 @@
+"""Content-hashed static assets.
+
+At startup every file under static/ is read once and fingerprinted with a
+hash of its content. Templates link to /assets/<name>.<hash>.<ext> (see
+asset_url), which is served with a year-long immutable Cache-Control — the
+URL changes whenever the file does, so the kiosk browser never has to
+revalidate. Text assets are gzipped once up front and sent compressed to
+clients that accept it.
+"""
+import gzip
+import hashlib
+import mimetypes
+import os
+
+from flask import abort, request
+
+HASH_LENGTH = 12
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+GZIP_TYPES = ("text/", "application/javascript", "application/json", "image/svg+xml",
+              "image/x-icon", "image/vnd.microsoft.icon")
+GZIP_MIN_SIZE = 512  # smaller files barely shrink
+
+
+def _fingerprint(rel_path, digest):
+    base, ext = os.path.splitext(rel_path)
+    return f"{base}.{digest}{ext}"
+
+
+class AssetManifest:
+    def __init__(self, static_dir):
+        self.static_dir = static_dir
+        self.by_path = {}    # "css/dashboard.css" -> asset
+        self.by_hashed = {}  # "css/dashboard.<hash>.css" -> asset
+        self.build()
+
+    def build(self):
+        by_path, by_hashed = {}, {}
+        for root, _, files in os.walk(self.static_dir):
+            for name in files:
+                full = os.path.join(root, name)
+                rel = os.path.relpath(full, self.static_dir).replace(os.sep, "/")
+                with open(full, "rb") as f:
+                    data = f.read()
+                digest = hashlib.sha256(data).hexdigest()[:HASH_LENGTH]
+                mimetype = mimetypes.guess_type(name)[0] or "application/octet-stream"
+                gz = None
+                if len(data) >= GZIP_MIN_SIZE and mimetype.startswith(GZIP_TYPES):
+                    gz = gzip.compress(data, compresslevel=9, mtime=0)
+                    if len(gz) >= len(data):
+                        gz = None
+                asset = {"path": rel, "hashed": _fingerprint(rel, digest), "hash": digest,
+                         "mimetype": mimetype, "data": data, "gzip": gz}
+                by_path[rel] = asset
+                by_hashed[asset["hashed"]] = asset
+        self.by_path, self.by_hashed = by_path, by_hashed
+
+    def url(self, rel_path):
+        """Fingerprinted URL of a file under static/ (plain /static/ URL if unknown)."""
+        asset = self.by_path.get(rel_path)
+        if asset is None:
+            return f"/static/{rel_path}"
+        return f"/assets/{asset['hashed']}"
+
+    def summary(self):
+        return {a["path"]: {"url": self.url(a["path"]), "size": len(a["data"]),
+                            "gzip_size": len(a["gzip"]) if a["gzip"] else None}
+                for a in self.by_path.values()}
+
+    def response(self, app, hashed):
+        asset = self.by_hashed.get(hashed)
+        if asset is None:
+            abort(404)
+        etag = asset["hash"]
+        if request.if_none_match.contains(etag):
+            resp = app.response_class(status=304)
+        elif asset["gzip"] is not None and "gzip" in request.accept_encodings:
+            resp = app.response_class(asset["gzip"], mimetype=asset["mimetype"])
+            resp.headers["Content-Encoding"] = "gzip"
+        else:
+            resp = app.response_class(asset["data"], mimetype=asset["mimetype"])
+        resp.set_etag(etag)
+        resp.headers["Cache-Control"] = f"public, max-age={IMMUTABLE_MAX_AGE}, immutable"
+        if asset["gzip"] is not None:
+            resp.headers["Vary"] = "Accept-Encoding"
+        return resp
+
+
+def install(app):
+    """Build the manifest for app.static_folder and register /assets/ + asset_url()."""
+    manifest = AssetManifest(app.static_folder)
+
+    @app.route("/assets/<path:hashed>")
+    def hashed_asset(hashed):
+        return manifest.response(app, hashed)
+
+    app.add_template_global(manifest.url, "asset_url")
+    return manifest
@@ -0,0 +1,52 @@
+"""Offline export/import of the task board (NDJSON, same format as /api/export).
+
+    python3 backup.py export kopia.ndjson        # "-" = stdout
+    python3 backup.py import kopia.ndjson        # "-" = stdin
+    python3 backup.py --db /tmp/inna.db import kopia.ndjson
+    python3 backup.py --board kuchnia export kuchnia.ndjson   # one board per file
+"""
+import argparse
+import sys
+
+import database
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Eksport/import zadań (NDJSON)")
+    parser.add_argument("--db", help="database file (default: zadania.db)")
+    parser.add_argument("--board", default="default", help="board slug (default: default)")
+    sub = parser.add_subparsers(dest="command", required=True)
+    exp = sub.add_parser("export", help="write tasks and completions to a file")
+    exp.add_argument("path")
+    imp = sub.add_parser("import", help="append tasks and completions from a file")
+    imp.add_argument("path")
+    imp.add_argument("--batch-size", type=int, default=database.IMPORT_BATCH_SIZE)
+    args = parser.parse_args()
+
+    if args.db:
+        database.DB_PATH = args.db
+    database.init_db()
+    board = database.get_board(args.board)
+    if board is None:
+        sys.exit(f"Nie ma tablicy: {args.board}")
+
+    if args.command == "export":
+        out = sys.stdout if args.path == "-" else open(args.path, "w", encoding="utf-8")
+        with out:
+            for line in database.iter_export(board["id"]):
+                out.write(line)
+    else:
+        src = sys.stdin if args.path == "-" else open(args.path, encoding="utf-8")
+        with src:
+            try:
+                counts = database.import_ndjson(src, batch_size=args.batch_size,
+                                                board_id=board["id"])
+            except ValueError as e:
+                sys.exit(f"Błąd importu: {e}")
+        print(f"Zaimportowano: {counts['tasks']} zadań, {counts['completions']} wykonań, "
+              f"{counts['rollups']} podsumowań (pominięto {counts['skipped']})", file=sys.stderr)
+    database.close_all_db()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,6 @@
+"""Reproducible benchmarks for app.py / database.py on synthetic boards.
+
+    python3 -m benchmarks.run --tasks 500 --years 3 --out wynik.json
+
+Compare two JSON files from different commits to spot regressions.
+"""
@@ -0,0 +1,94 @@
+"""Synthetic board generator: tasks with a recurrence mix and years of completions."""
+import os
+import random
+from datetime import date, datetime, time, timedelta
+
+import database
+
+# Share of each recurrence kind; "once" = one-time task
+DEFAULT_MIX = {"days": 40, "weeks": 25, "months": 10, "weekdays": 15, "once": 10}
+# Last day of generated history; fixed so a seed gives the same board on any day
+DEFAULT_END = date(2026, 1, 1)
+
+
+def parse_mix(text):
+    """'days:40,weeks:20,once:5' -> {"days": 40, "weeks": 20, "once": 5}"""
+    mix = {}
+    for part in text.split(","):
+        kind, _, weight = part.partition(":")
+        kind = kind.strip()
+        if kind not in DEFAULT_MIX:
+            raise ValueError(f"Unknown recurrence kind: {kind}")
+        mix[kind] = int(weight)
+    return mix
+
+
+def _completion_times(rnd, kind, value, days, start, end):
+    """Plausible completion timestamps for one task between start and end."""
+    if kind == "once":
+        return []
+    if kind == "weekdays":
+        step = lambda: timedelta(days=7 / max(1, len(days)))
+    elif kind == "months":
+        step = lambda: timedelta(days=30 * value)
+    else:
+        base = value * (7 if kind == "weeks" else 1)
+        step = lambda: timedelta(days=base + rnd.choice((0, 0, 0, 1, 2)))
+    t = start + timedelta(hours=rnd.randint(0, 23))
+    times = []
+    while t < end:
+        if rnd.random() > 0.1:  # ~10% of occurrences are skipped
+            times.append(t.strftime("%Y-%m-%d %H:%M:%S"))
+        t += step()
+    return times
+
+
+def generate_db(path, tasks=200, years=2, mix=None, seed=0, batch_size=5000, end=DEFAULT_END):
+    """Create a fresh database at `path` filled with a deterministic synthetic board.
+
+    History runs up to the day before `end` (a date), so the same arguments
+    always produce the same rows.
+    """
+    if os.path.exists(path):
+        raise FileExistsError(f"{path} already exists — the generator only creates new files")
+    rnd = random.Random(seed)
+    mix = mix or DEFAULT_MIX
+    kinds = list(mix)
+    weights = [mix[k] for k in kinds]
+
+    database.DB_PATH = path
+    database.init_db()
+    conn = database.get_db()
+    end = datetime.combine(end, time()) - timedelta(days=1)
+    start = end - timedelta(days=int(365 * years))
+
+    completions = []
+    total_completions = 0
+    for idx in range(tasks):
+        kind = rnd.choices(kinds, weights)[0]
+        value = rnd.randint(1, 3)
+        days = sorted(rnd.sample(range(7), rnd.randint(1, 3)))
+        recurrence_days = ",".join(database.WEEKDAY_NAMES[d] for d in days)
+        cur = conn.execute(
+            """INSERT INTO tasks (title, description, is_recurring, recurrence_type,
+               recurrence_value, recurrence_days, weekday_mask, sort_order)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
+            (f"Zadanie {idx}", f"Opis zadania {idx}", int(kind != "once"),
+             None if kind == "once" else kind,
+             None if kind == "once" else 1 if kind == "weekdays" else value,
+             recurrence_days if kind == "weekdays" else None,
+             sum(1 << d for d in days) if kind == "weekdays" else 0,
+             idx * database.SORT_GAP),
+        )
+        for t in _completion_times(rnd, kind, value, days, start, end):
+            completions.append((cur.lastrowid, t))
+        if len(completions) >= batch_size:
+            conn.executemany("INSERT INTO completions (task_id, completed_at) VALUES (?, ?)", completions)
+            total_completions += len(completions)
+            completions.clear()
+    conn.executemany("INSERT INTO completions (task_id, completed_at) VALUES (?, ?)", completions)
+    total_completions += len(completions)
+    database._refresh_all_next_due_dates(conn)
+    database._commit_write(conn)
+    database.release_db()
+    return {"tasks": tasks, "completions": total_completions, "years": years, "seed": seed}
@@ -0,0 +1,167 @@
+"""Time the main API routes on a generated board and print a JSON report.
+
+Latency (p50/p95), SQL statements per request and peak Python memory are
+reported per scenario. Runs are deterministic for a given --seed, so two
+reports can be diffed across commits.
+"""
+import argparse
+import json
+import os
+import platform
+import sqlite3
+import statistics
+import tempfile
+import time
+import tracemalloc
+from datetime import date
+
+import database
+from benchmarks.generate import DEFAULT_END, DEFAULT_MIX, generate_db, parse_mix
+
+_query_count = [0]
+
+
+def _count_query(_sql):
+    _query_count[0] += 1
+
+
+class _CountingConnection(sqlite3.Connection):
+    """Connection that counts every statement it runs (installed as the pool's factory)."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.set_trace_callback(_count_query)
+
+
+def _percentile(sorted_values, pct):
+    idx = max(0, int(round(len(sorted_values) * pct / 100)) - 1)
+    return sorted_values[idx]
+
+
+def _scenarios(client, task_ids, recurring_ids):
+    """(name, callable) pairs; each callable performs one request."""
+    state = {"i": 0, "etag": None}
+
+    def next_id(ids):
+        state["i"] += 1
+        return ids[state["i"] % len(ids)]
+
+    def today_304():
+        if state["etag"] is None:
+            state["etag"] = client.get("/api/tasks/today").headers.get("ETag")
+        return client.get("/api/tasks/today", headers={"If-None-Match": state["etag"]})
+
+    def reorder():
+        ids = list(task_ids)
+        i = state["i"] = state["i"] + 1
+        a = i % (len(ids) - 1)
+        ids[a], ids[a + 1] = ids[a + 1], ids[a]
+        task_ids[:] = ids
+        return client.post("/api/tasks/reorder", json={"task_ids": ids})
+
+    return [
+        ("tasks_today", lambda: client.get("/api/tasks/today")),
+        ("tasks_today_304", today_304),
+        ("tasks_all", lambda: client.get("/api/tasks")),
+        ("reorder", reorder),
+        ("position", lambda: client.post(f"/api/tasks/{next_id(task_ids)}/position",
+                                         json={"position": 1 + state["i"] % len(task_ids)})),
+        ("complete", lambda: client.post(f"/api/tasks/{next_id(recurring_ids)}/complete")),
+        ("history", lambda: client.get(f"/api/tasks/{next_id(recurring_ids)}/history")),
+    ]
+
+
+def run(args):
+    with tempfile.TemporaryDirectory(prefix="dashboard-bench-") as workdir:
+        try:
+            return _run(args, os.path.join(workdir, "bench.db"))
+        finally:
+            database.close_all_db()
+            database.set_connection_factory(sqlite3.Connection)
+
+
+def _run(args, db_path):
+    mix = parse_mix(args.mix) if args.mix else DEFAULT_MIX
+
+    end = date.fromisoformat(args.end)
+
+    t0 = time.perf_counter()
+    board = generate_db(db_path, tasks=args.tasks, years=args.years, mix=mix, seed=args.seed,
+                        end=end)
+    board["generate_s"] = round(time.perf_counter() - t0, 3)
+    # Fold the WAL back into the main file so its size covers all rows
+    database.get_db().execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchall()
+    board["db_bytes"] = os.path.getsize(db_path)
+
+    # Connections pooled by the generator predate the counter — start afresh
+    database.close_all_db()
+    database.set_connection_factory(_CountingConnection)
+    from app import app
+    client = app.test_client()
+    task_ids = [t["id"] for t in database.get_all_tasks()]
+    recurring_ids = [t["id"] for t in database.get_all_tasks() if t["is_recurring"]] or task_ids
+    database.release_db()
+
+    results = {}
+    for name, request in _scenarios(client, task_ids, recurring_ids):
+        if args.only and name not in args.only:
+            continue
+        request()  # warm-up
+        timings, queries = [], []
+        for _ in range(args.requests):
+            _query_count[0] = 0
+            start = time.perf_counter()
+            resp = request()
+            timings.append((time.perf_counter() - start) * 1000)
+            queries.append(_query_count[0])
+            if resp.status_code >= 400:
+                raise RuntimeError(f"{name}: HTTP {resp.status_code}")
+
+        tracemalloc.start()
+        for _ in range(min(args.requests, 5)):
+            request()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        timings.sort()
+        results[name] = {
+            "p50_ms": round(statistics.median(timings), 3),
+            "p95_ms": round(_percentile(timings, 95), 3),
+            "max_ms": round(timings[-1], 3),
+            "queries_per_request": round(statistics.fmean(queries), 2),
+            "peak_kib": round(peak / 1024, 1),
+        }
+
+    return {
+        "environment": {"python": platform.python_version(), "sqlite": sqlite3.sqlite_version,
+                        "machine": platform.machine()},
+        "params": {"tasks": args.tasks, "years": args.years, "mix": mix, "seed": args.seed,
+                   "end": args.end, "requests": args.requests},
+        "board": board,
+        "results": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tasks", type=int, default=200)
+    parser.add_argument("--years", type=float, default=2)
+    parser.add_argument("--mix", help="e.g. days:40,weeks:25,months:10,weekdays:15,once:10")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--end", default=DEFAULT_END.isoformat(),
+                        help="last day of generated history, YYYY-MM-DD (fixed, so runs are reproducible)")
+    parser.add_argument("--requests", type=int, default=100, help="requests per scenario")
+    parser.add_argument("--only", nargs="*", help="run only these scenarios")
+    parser.add_argument("--out", help="write the JSON report here instead of stdout")
+    args = parser.parse_args()
+
+    report = json.dumps(run(args), indent=2)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(report + "\n")
+    else:
+        print(report)
+
+
+if __name__ == "__main__":
+    main()
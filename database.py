@@ -1,42 +1,488 @@
 import sqlite3
 import os
+import json
+import heapq
+import itertools
+import queue
+import re
+import threading
+import time
 from datetime import datetime, date, timedelta
 
+import recurrence
+from recurrence import WEEKDAY_NAMES
+
 DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "zadania.db")
 
-# Monday=0 .. Sunday=6  (Python weekday convention)
-WEEKDAY_NAMES = ["mon", "tue", "wed", "thu", "fri", "sat", "sun"]
+# Distance between neighbouring sort_order values; a move writes a single
+# row by taking the midpoint, until a gap runs out and the list is re-spaced.
+SORT_GAP = 1024
 
+# tasks.next_due_date sentinels: due right away / never due
+DUE_ALWAYS = date.min.isoformat()
+DUE_NEVER = date.max.isoformat()
 
-def get_db():
-    conn = sqlite3.connect(DB_PATH)
+# Board that owns all data from before boards existed and the unprefixed routes
+DEFAULT_BOARD_ID = 1
+BOARD_SLUG_RE = re.compile(r"[a-z0-9][a-z0-9-]{0,31}")
+
+# ─── Connection tuning (override via environment) ───
+# Idle connections kept open for reuse; 0 = close after every request.
+DB_POOL_SIZE = int(os.environ.get("DASHBOARD_DB_POOL_SIZE", "4"))
+# NORMAL is durable enough with WAL and avoids an fsync per commit on the SD card.
+DB_SYNCHRONOUS = os.environ.get("DASHBOARD_DB_SYNCHRONOUS", "NORMAL").upper()
+DB_CACHE_SIZE = int(os.environ.get("DASHBOARD_DB_CACHE_SIZE", "-8000"))  # negative = KiB
+DB_MMAP_SIZE = int(os.environ.get("DASHBOARD_DB_MMAP_SIZE", str(64 * 1024 * 1024)))
+DB_TEMP_STORE = os.environ.get("DASHBOARD_DB_TEMP_STORE", "MEMORY").upper()
+DB_STATEMENT_CACHE = int(os.environ.get("DASHBOARD_DB_STATEMENT_CACHE", "128"))
+
+if DB_SYNCHRONOUS not in ("OFF", "NORMAL", "FULL", "EXTRA"):
+    raise ValueError(f"Invalid DASHBOARD_DB_SYNCHRONOUS: {DB_SYNCHRONOUS}")
+if DB_TEMP_STORE not in ("DEFAULT", "FILE", "MEMORY"):
+    raise ValueError(f"Invalid DASHBOARD_DB_TEMP_STORE: {DB_TEMP_STORE}")
+
+
+_connection_factory = sqlite3.Connection
+
+
+def set_connection_factory(factory):
+    """Use a sqlite3.Connection subclass for new connections (instrumentation)."""
+    global _connection_factory
+    _connection_factory = factory
+
+
+def _connect(path):
+    """Open a new connection and apply all per-connection PRAGMAs once."""
+    conn = sqlite3.connect(path, check_same_thread=False, factory=_connection_factory,
+                           cached_statements=DB_STATEMENT_CACHE)
     conn.row_factory = sqlite3.Row
+    # Must precede journal_mode: only a brand-new file picks it up (existing
+    # ones after one VACUUM, see retention.py --vacuum). Lets compaction hand
+    # freed pages back with incremental_vacuum.
+    conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
     conn.execute("PRAGMA journal_mode=WAL")
     conn.execute("PRAGMA foreign_keys=ON")
+    conn.execute(f"PRAGMA synchronous={DB_SYNCHRONOUS}")
+    conn.execute(f"PRAGMA cache_size={DB_CACHE_SIZE}")
+    conn.execute(f"PRAGMA mmap_size={DB_MMAP_SIZE}")
+    conn.execute(f"PRAGMA temp_store={DB_TEMP_STORE}")
     return conn
 
 
-def _migrate(conn):
-    """Run safe ALTER TABLE migrations for new columns."""
-    migrations = [
-        ("sort_order", "ALTER TABLE tasks ADD COLUMN sort_order INTEGER NOT NULL DEFAULT 0"),
-        ("recurrence_days", "ALTER TABLE tasks ADD COLUMN recurrence_days TEXT DEFAULT NULL"),
-        ("start_date", "ALTER TABLE tasks ADD COLUMN start_date TEXT DEFAULT NULL"),
-        ("end_date", "ALTER TABLE tasks ADD COLUMN end_date TEXT DEFAULT NULL"),
+class ConnectionPool:
+    """Small LIFO pool of open SQLite connections for one database file.
+
+    A connection is used by a single thread at a time: it is checked out by
+    get_db() and handed back by release_db() (at the end of a Flask request).
+    """
+
+    def __init__(self, path, size):
+        self.path = path
+        self.size = size
+        self._idle = queue.LifoQueue()
+
+    def acquire(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            return _connect(self.path)
+
+    def release(self, conn):
+        if conn.in_transaction:
+            conn.rollback()  # never hand out a connection with a half-done write
+        if self._idle.qsize() < self.size:
+            self._idle.put(conn)
+        else:
+            conn.close()
+
+    def close_all(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+_pool = None
+_pool_lock = threading.Lock()
+_local = threading.local()
+
+
+def _get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None or _pool.path != DB_PATH:
+            if _pool is not None:
+                _pool.close_all()
+            _pool = ConnectionPool(DB_PATH, DB_POOL_SIZE)
+        return _pool
+
+
+def get_db():
+    """Return the connection bound to the current thread, checking one out if needed."""
+    conn = getattr(_local, "conn", None)
+    pool = _get_pool()
+    if conn is not None and _local.pool is not pool:
+        release_db()  # DB_PATH was switched (tests, benchmarks)
+        conn = None
+    if conn is None:
+        conn = pool.acquire()
+        _local.conn, _local.pool = conn, pool
+    return conn
+
+
+def release_db():
+    """Return the current thread's connection to the pool (call at request teardown)."""
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        return
+    _local.conn = None
+    _local.pool.release(conn)
+
+
+def close_all_db():
+    """Close every idle pooled connection (e.g. on shutdown)."""
+    release_db()
+    if _pool is not None:
+        _pool.close_all()
+
+
+# ─── Schema migrations ───
+# Each step runs exactly once, in order, inside its own transaction; the
+# number of applied steps is stored in PRAGMA user_version. Append new steps
+# at the end — never reorder or edit ones that have shipped.
+
+def _column_names(conn, table):
+    return {r["name"] for r in conn.execute(f"PRAGMA table_info({table})")}
+
+
+def _m001_task_columns(conn):
+    """Columns added after the first release (no-op on freshly created DBs)."""
+    existing = _column_names(conn, "tasks")
+    columns = [
+        ("sort_order", "INTEGER NOT NULL DEFAULT 0"),
+        ("recurrence_days", "TEXT DEFAULT NULL"),
+        ("start_date", "TEXT DEFAULT NULL"),
+        ("end_date", "TEXT DEFAULT NULL"),
     ]
-    for col, sql in migrations:
+    for col, decl in columns:
+        if col not in existing:
+            conn.execute(f"ALTER TABLE tasks ADD COLUMN {col} {decl}")
+
+
+def _m002_backfill_sort_order(conn):
+    """Back-fill sort_order if all zeros (DBs created before ordering existed)."""
+    rows = conn.execute("SELECT id, sort_order FROM tasks ORDER BY id").fetchall()
+    if rows and all(r["sort_order"] == 0 for r in rows) and len(rows) > 1:
+        conn.executemany("UPDATE tasks SET sort_order = ? WHERE id = ?",
+                         [(idx, row["id"]) for idx, row in enumerate(rows)])
+
+
+def _m003_indexes(conn):
+    """Indexes for latest-completion lookups and the ordered active-task list."""
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_completions_task_completed "
+                 "ON completions (task_id, completed_at)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_tasks_active_sort "
+                 "ON tasks (active, sort_order, id)")
+
+
+def _m004_next_due_date(conn):
+    """Materialized next_due_date, back-filled from completion history."""
+    if "next_due_date" not in _column_names(conn, "tasks"):
+        conn.execute("ALTER TABLE tasks ADD COLUMN next_due_date TEXT DEFAULT NULL")
+    _refresh_all_next_due_dates(conn)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_tasks_active_due "
+                 "ON tasks (active, next_due_date)")
+
+
+def _m005_meta(conn):
+    """Key/value table holding the data version used for HTTP validators."""
+    conn.execute("""CREATE TABLE IF NOT EXISTS meta (
+                        key TEXT PRIMARY KEY,
+                        value INTEGER NOT NULL
+                    ) WITHOUT ROWID""")
+    conn.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('data_version', 0)")
+
+
+def _m006_sparse_sort_order(conn):
+    """Spread sort_order values SORT_GAP apart so moves can use midpoints."""
+    _rebalance_sort_order(conn)
+
+
+def _m007_completion_rollups(conn):
+    """Aggregates of old completions folded in by compact_completions()."""
+    conn.execute("""CREATE TABLE IF NOT EXISTS completion_rollups (
+                        id INTEGER PRIMARY KEY,
+                        task_id INTEGER NOT NULL,
+                        period TEXT NOT NULL,
+                        period_start TEXT NOT NULL,
+                        count INTEGER NOT NULL,
+                        first_at TEXT NOT NULL,
+                        last_at TEXT NOT NULL,
+                        UNIQUE (task_id, period_start),
+                        FOREIGN KEY (task_id) REFERENCES tasks(id) ON DELETE CASCADE
+                    )""")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_rollups_task_last "
+                 "ON completion_rollups (task_id, last_at)")
+
+
+def _m008_completion_client_id(conn):
+    """Client-generated ids that make batched completion uploads idempotent."""
+    if "client_id" not in _column_names(conn, "completions"):
+        conn.execute("ALTER TABLE completions ADD COLUMN client_id TEXT DEFAULT NULL")
+    conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_completions_client_id "
+                 "ON completions (client_id) WHERE client_id IS NOT NULL")
+
+
+def _m009_tasks_fts(conn):
+    """FTS5 index over task titles and descriptions, kept in sync by triggers."""
+    conn.execute("""CREATE VIRTUAL TABLE IF NOT EXISTS tasks_fts USING fts5(
+                        title, description, content='tasks', content_rowid='id',
+                        tokenize='unicode61 remove_diacritics 2'
+                    )""")
+    conn.execute("""CREATE TRIGGER IF NOT EXISTS tasks_fts_insert AFTER INSERT ON tasks BEGIN
+                        INSERT INTO tasks_fts (rowid, title, description)
+                        VALUES (new.id, new.title, new.description);
+                    END""")
+    conn.execute("""CREATE TRIGGER IF NOT EXISTS tasks_fts_delete AFTER DELETE ON tasks BEGIN
+                        INSERT INTO tasks_fts (tasks_fts, rowid, title, description)
+                        VALUES ('delete', old.id, old.title, old.description);
+                    END""")
+    conn.execute("""CREATE TRIGGER IF NOT EXISTS tasks_fts_update
+                    AFTER UPDATE OF title, description ON tasks BEGIN
+                        INSERT INTO tasks_fts (tasks_fts, rowid, title, description)
+                        VALUES ('delete', old.id, old.title, old.description);
+                        INSERT INTO tasks_fts (rowid, title, description)
+                        VALUES (new.id, new.title, new.description);
+                    END""")
+    conn.execute("INSERT INTO tasks_fts (tasks_fts) VALUES ('rebuild')")
+
+
+def _m010_task_changes(conn):
+    """Change log for incremental admin sync, written by triggers.
+
+    Each task keeps only its newest entry, so the log stays one row per task
+    while still answering "what changed since seq N" for any N.
+    """
+    conn.execute("""CREATE TABLE IF NOT EXISTS task_changes (
+                        seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                        task_id INTEGER NOT NULL,
+                        op TEXT NOT NULL
+                    )""")
+    conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_task_changes_task ON task_changes (task_id)")
+    for event, op, ref in (("INSERT", "upsert", "new"), ("UPDATE", "upsert", "new"),
+                           ("DELETE", "delete", "old")):
+        conn.execute(f"""CREATE TRIGGER IF NOT EXISTS task_changes_{event.lower()}
+                         AFTER {event} ON tasks BEGIN
+                             DELETE FROM task_changes WHERE task_id = {ref}.id;
+                             INSERT INTO task_changes (task_id, op) VALUES ({ref}.id, '{op}');
+                         END""")
+
+
+def _m011_compiled_recurrence(conn):
+    """Weekday bitmask and nth columns; stored rules re-normalized once.
+
+    Weekday rules written before intervals existed may carry a stale
+    recurrence_value; it is reset to 1 so they keep meaning "every selected
+    day". Due dates are recomputed because months now clamp to the real end
+    of the month instead of the 28th.
+    """
+    existing = _column_names(conn, "tasks")
+    if "weekday_mask" not in existing:
+        conn.execute("ALTER TABLE tasks ADD COLUMN weekday_mask INTEGER NOT NULL DEFAULT 0")
+    if "recurrence_nth" not in existing:
+        conn.execute("ALTER TABLE tasks ADD COLUMN recurrence_nth INTEGER DEFAULT NULL")
+    rows = conn.execute("SELECT * FROM tasks WHERE is_recurring = 1").fetchall()
+    conn.executemany(
+        """UPDATE tasks SET recurrence_value = :recurrence_value,
+                            recurrence_days = :recurrence_days,
+                            weekday_mask = :weekday_mask, recurrence_nth = :recurrence_nth
+           WHERE id = :id""",
+        [{**recurrence.rule_columns(recurrence.rule_from_task({**dict(r), "weekday_mask": None})),
+          "id": r["id"]} for r in rows]
+    )
+    _refresh_all_next_due_dates(conn)
+
+
+def _m012_boards(conn):
+    """Boards: one server drives several displays, each with its own tasks.
+
+    Existing rows land on the default board. Tasks, completions and the
+    change log carry board_id, and the list/due indexes now lead on it so
+    every board reads only its own index range. idx_completions_task_completed
+    stays for per-task lookups and ON DELETE CASCADE.
+    """
+    conn.execute("""CREATE TABLE IF NOT EXISTS boards (
+                        id INTEGER PRIMARY KEY,
+                        slug TEXT NOT NULL UNIQUE,
+                        name TEXT NOT NULL DEFAULT '',
+                        data_version INTEGER NOT NULL DEFAULT 0,
+                        created_at TEXT NOT NULL DEFAULT (datetime('now', 'localtime'))
+                    )""")
+    conn.execute("INSERT OR IGNORE INTO boards (id, slug, name) VALUES (?, 'default', 'Zadania')",
+                 (DEFAULT_BOARD_ID,))
+    for table in ("tasks", "completions", "task_changes"):
+        if "board_id" not in _column_names(conn, table):
+            conn.execute(f"ALTER TABLE {table} ADD COLUMN board_id INTEGER NOT NULL "
+                         f"DEFAULT {DEFAULT_BOARD_ID}")
+
+    conn.execute("DROP INDEX IF EXISTS idx_tasks_active_sort")
+    conn.execute("DROP INDEX IF EXISTS idx_tasks_active_due")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_tasks_board_active_sort "
+                 "ON tasks (board_id, active, sort_order, id)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_tasks_board_active_due "
+                 "ON tasks (board_id, active, next_due_date)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_completions_board_task "
+                 "ON completions (board_id, task_id, completed_at)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_task_changes_board_seq "
+                 "ON task_changes (board_id, seq)")
+
+    # The change log records the board, so each admin panel syncs its own
+    for event, op, ref in (("INSERT", "upsert", "new"), ("UPDATE", "upsert", "new"),
+                           ("DELETE", "delete", "old")):
+        conn.execute(f"DROP TRIGGER IF EXISTS task_changes_{event.lower()}")
+        conn.execute(f"""CREATE TRIGGER task_changes_{event.lower()}
+                         AFTER {event} ON tasks BEGIN
+                             DELETE FROM task_changes WHERE task_id = {ref}.id;
+                             INSERT INTO task_changes (task_id, op, board_id)
+                             VALUES ({ref}.id, '{op}', {ref}.board_id);
+                         END""")
+
+
+def _m013_rollup_day_mask(conn):
+    """Per-day presence in rollups (exact streaks) and an index for the retention scan.
+
+    Rollups written before only know their first and last day; those two
+    bits are back-filled.
+    """
+    if "day_mask" not in _column_names(conn, "completion_rollups"):
+        conn.execute("ALTER TABLE completion_rollups ADD COLUMN day_mask INTEGER NOT NULL DEFAULT 0")
+    conn.executemany(
+        "UPDATE completion_rollups SET day_mask = ? WHERE id = ?",
+        [(_rollup_day_mask(r["period_start"], r["first_at"], r["last_at"]), r["id"])
+         for r in conn.execute("SELECT id, period_start, first_at, last_at FROM completion_rollups")]
+    )
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_completions_completed_at "
+                 "ON completions (completed_at)")
+
+
+MIGRATIONS = [
+    _m001_task_columns,
+    _m002_backfill_sort_order,
+    _m003_indexes,
+    _m004_next_due_date,
+    _m005_meta,
+    _m006_sparse_sort_order,
+    _m007_completion_rollups,
+    _m008_completion_client_id,
+    _m009_tasks_fts,
+    _m010_task_changes,
+    _m011_compiled_recurrence,
+    _m012_boards,
+    _m013_rollup_day_mask,
+]
+
+
+def _migrate(conn):
+    """Apply pending migrations; a constant-time check when the schema is current."""
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    for number, step in enumerate(MIGRATIONS[version:], start=version + 1):
+        conn.execute("BEGIN")
         try:
-            conn.execute(sql)
+            step(conn)
+            conn.execute(f"PRAGMA user_version = {number}")
             conn.commit()
         except Exception:
-            pass  # column already exists
+            conn.rollback()
+            raise
+    if version < len(MIGRATIONS):
+        # Migrations may change what the API returns — invalidate client caches
+        _commit_write(conn)
 
-    # Back-fill sort_order if all zeros
-    rows = conn.execute("SELECT id, sort_order FROM tasks ORDER BY id").fetchall()
-    if rows and all(r["sort_order"] == 0 for r in rows) and len(rows) > 1:
-        for idx, row in enumerate(rows):
-            conn.execute("UPDATE tasks SET sort_order = ? WHERE id = ?", (idx, row["id"]))
-        conn.commit()
+
+def _bump_data_version(conn, board_id=None):
+    """Advance the global and the board's data version (every board's if None).
+
+    Call inside every write transaction.
+    """
+    conn.execute("UPDATE meta SET value = value + 1 WHERE key = 'data_version'")
+    if board_id is None:
+        conn.execute("UPDATE boards SET data_version = data_version + 1")
+    else:
+        conn.execute("UPDATE boards SET data_version = data_version + 1 WHERE id = ?", (board_id,))
+
+
+_change_listeners = []
+
+
+def add_change_listener(callback):
+    """Register callback(board_id) to be invoked after every committed data change.
+
+    board_id is None when the change may concern every board (migrations).
+    """
+    _change_listeners.append(callback)
+
+
+def _commit_write(conn, board_id=None):
+    """Bump the data version, commit, then notify change listeners.
+
+    Only the given board's today cache and event streams are disturbed;
+    None means all boards.
+    """
+    _bump_data_version(conn, board_id)
+    conn.commit()
+    _invalidate_today_cache(board_id)
+    for callback in _change_listeners:
+        callback(board_id)
+
+
+def get_data_version(board_id=None):
+    """Monotonic counter that changes whenever task or completion data changes.
+
+    With a board_id, the counter of that board only (0 for an unknown board).
+    """
+    conn = get_db()
+    if board_id is None:
+        row = conn.execute("SELECT value FROM meta WHERE key = 'data_version'").fetchone()
+        return row["value"]
+    row = conn.execute("SELECT data_version FROM boards WHERE id = ?", (board_id,)).fetchone()
+    return row["data_version"] if row else 0
+
+
+# --- Boards ---
+
+def get_board(slug):
+    """Board row {"id", "slug", "name", ...} for a slug, or None."""
+    conn = get_db()
+    row = conn.execute("SELECT * FROM boards WHERE slug = ?", (slug,)).fetchone()
+    return dict(row) if row else None
+
+
+def list_boards():
+    """All boards with their number of active tasks, default board first."""
+    conn = get_db()
+    rows = conn.execute(
+        """SELECT b.id, b.slug, b.name, b.created_at,
+                  (SELECT COUNT(*) FROM tasks t
+                   WHERE t.board_id = b.id AND t.active = 1) AS active_tasks
+           FROM boards b ORDER BY b.id"""
+    ).fetchall()
+    return [dict(r) for r in rows]
+
+
+def add_board(slug, name=""):
+    """Create a board; raises ValueError for a malformed or taken slug."""
+    if not isinstance(slug, str) or not BOARD_SLUG_RE.fullmatch(slug):
+        raise ValueError("Board slug must be 1-32 characters: a-z, 0-9 and '-'")
+    conn = get_db()
+    try:
+        cur = conn.execute("INSERT INTO boards (slug, name) VALUES (?, ?)", (slug, name or slug))
+    except sqlite3.IntegrityError:
+        conn.rollback()
+        raise ValueError(f"Board '{slug}' already exists") from None
+    board_id = cur.lastrowid
+    _commit_write(conn, board_id)
+    return board_id
 
 
 def init_db():
@@ -50,56 +496,165 @@ def init_db():
             recurrence_type TEXT DEFAULT NULL,
             recurrence_value INTEGER DEFAULT NULL,
             recurrence_days TEXT DEFAULT NULL,
+            weekday_mask INTEGER NOT NULL DEFAULT 0,
+            recurrence_nth INTEGER DEFAULT NULL,
             sort_order INTEGER NOT NULL DEFAULT 0,
             start_date TEXT DEFAULT NULL,
             end_date TEXT DEFAULT NULL,
+            next_due_date TEXT DEFAULT NULL,
             created_at TEXT NOT NULL DEFAULT (datetime('now', 'localtime')),
-            active INTEGER NOT NULL DEFAULT 1
+            active INTEGER NOT NULL DEFAULT 1,
+            board_id INTEGER NOT NULL DEFAULT 1
         );
 
         CREATE TABLE IF NOT EXISTS completions (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             task_id INTEGER NOT NULL,
             completed_at TEXT NOT NULL DEFAULT (datetime('now', 'localtime')),
+            board_id INTEGER NOT NULL DEFAULT 1,
             FOREIGN KEY (task_id) REFERENCES tasks(id) ON DELETE CASCADE
         );
     """)
     _migrate(conn)
     conn.commit()
-    conn.close()
+    release_db()
 
 
 # --- Task CRUD ---
 
+_TEXT_FIELDS = ("title", "description", "recurrence_type", "recurrence_days")
+_DATE_FIELDS = ("start_date", "end_date")
+_NUMBER_FIELDS = ("recurrence_value", "recurrence_nth", "sort_order")
+
+
+def _whole_number(name, value):
+    """int from a JSON number or numeric string; ValueError naming the field otherwise."""
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if isinstance(value, str):
+        try:
+            return int(value.strip())
+        except ValueError:
+            pass
+    raise ValueError(f"{name} must be a whole number")
+
+
+def _check_task_fields(fields):
+    """Reject task fields of the wrong JSON type before they reach SQLite (ValueError).
+
+    None means "not given"; empty dates clear the date.
+    """
+    for name in _TEXT_FIELDS:
+        if fields.get(name) is not None and not isinstance(fields[name], str):
+            raise ValueError(f"{name} must be a string")
+    for name in _DATE_FIELDS:
+        value = fields.get(name)
+        if value in (None, ""):
+            continue
+        try:
+            date.fromisoformat(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"{name} must be a YYYY-MM-DD date") from None
+    for name in _NUMBER_FIELDS:
+        if fields.get(name) not in (None, ""):
+            _whole_number(name, fields[name])
+
+
+def _recurrence_columns(is_recurring, recurrence_type=None, recurrence_value=None,
+                        recurrence_days=None, recurrence_nth=None):
+    """Normalized recurrence columns of a new task (ValueError if the rule is invalid)."""
+    if not is_recurring:
+        return {"recurrence_type": recurrence_type, "recurrence_value": recurrence_value,
+                "recurrence_days": recurrence_days or None, "weekday_mask": 0,
+                "recurrence_nth": None}
+    return recurrence.rule_columns(recurrence.parse_rule(
+        recurrence_type, recurrence_value, recurrence_days, recurrence_nth))
+
+
+def _recurrence_update(row, recurrence_type=None, recurrence_value=None,
+                       recurrence_days=None, recurrence_nth=None):
+    """Columns to write when some recurrence fields of a stored task change.
+
+    The changes are merged into the stored rule and the result is validated
+    and normalized again (ValueError if invalid). Switching to another type
+    without a new value starts from that type's defaults. One-time tasks keep
+    whatever they are sent, as they never evaluate it.
+    """
+    changes = {"recurrence_type": recurrence_type, "recurrence_value": recurrence_value,
+               "recurrence_days": recurrence_days, "recurrence_nth": recurrence_nth}
+    if all(v is None for v in changes.values()):
+        return {}
+    if row is None or not row["is_recurring"]:
+        if recurrence_value is not None:
+            changes["recurrence_value"] = _whole_number("recurrence_value", recurrence_value)
+        if recurrence_nth is not None:
+            changes["recurrence_nth"] = _whole_number("recurrence_nth", recurrence_nth)
+        if recurrence_days is not None:
+            changes["recurrence_days"] = recurrence_days or None
+        return {k: v for k, v in changes.items() if v is not None}
+    same_type = recurrence_type in (None, row["recurrence_type"])
+    return recurrence.rule_columns(recurrence.parse_rule(
+        recurrence_type or row["recurrence_type"],
+        recurrence_value if recurrence_value is not None
+        else row["recurrence_value"] if same_type else None,
+        recurrence_days if recurrence_days is not None else row["recurrence_days"],
+        recurrence_nth if recurrence_nth is not None
+        else row["recurrence_nth"] if same_type else None,
+    ))
+
+
 def add_task(title, description="", is_recurring=False, recurrence_type=None,
-             recurrence_value=None, recurrence_days=None, start_date=None, end_date=None, sort_order=None):
-    """Add a new task.
-    recurrence_type: 'days', 'weeks', 'months', 'weekdays'
-    recurrence_value: integer (e.g., every 2 days) — ignored when type='weekdays'
+             recurrence_value=None, recurrence_days=None, start_date=None, end_date=None,
+             sort_order=None, recurrence_nth=None, board_id=DEFAULT_BOARD_ID):
+    """Add a new task (at the end of the board's list unless sort_order is given).
+    recurrence_type: 'days', 'weeks', 'months', 'weekdays', 'month_end', 'nth_weekday'
+    recurrence_value: interval N (every N days/weeks/months, every Nth selected weekday)
     recurrence_days: comma-separated weekday codes e.g. 'mon,wed,fri'
+    recurrence_nth: 1-4 or -1 (last) — which weekday of the month for 'nth_weekday'
     start_date: 'YYYY-MM-DD' — task won't appear before this date
     end_date: 'YYYY-MM-DD' — task deactivated after this date
+    Raises ValueError if a field has the wrong type or the recurrence rule is invalid.
     """
+    _check_task_fields(locals())
+    rule = _recurrence_columns(is_recurring, recurrence_type, recurrence_value,
+                               recurrence_days, recurrence_nth)
     conn = get_db()
     if sort_order is None:
-        row = conn.execute("SELECT COALESCE(MAX(sort_order), -1) + 1 AS next_order FROM tasks").fetchone()
-        sort_order = row["next_order"]
+        sort_order = _next_sort_order(conn, board_id)
     cur = conn.execute(
         """INSERT INTO tasks (title, description, is_recurring, recurrence_type,
-           recurrence_value, recurrence_days, start_date, end_date, sort_order)
-           VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""",
-        (title, description, int(is_recurring), recurrence_type,
-         recurrence_value, recurrence_days, start_date, end_date, sort_order)
+           recurrence_value, recurrence_days, weekday_mask, recurrence_nth,
+           start_date, end_date, sort_order, next_due_date, board_id)
+           VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+        (title, description, int(is_recurring), rule["recurrence_type"],
+         rule["recurrence_value"], rule["recurrence_days"], rule["weekday_mask"],
+         rule["recurrence_nth"], start_date, end_date, sort_order,
+         compute_next_due_date({"is_recurring": is_recurring, **rule}, None), board_id)
     )
     task_id = cur.lastrowid
-    conn.commit()
-    conn.close()
+    _commit_write(conn, board_id)
     return task_id
 
 
-def update_task(task_id, title=None, description=None, recurrence_type=None,
-                recurrence_value=None, recurrence_days=None, start_date=None, end_date=None, sort_order=None):
-    conn = get_db()
+def _next_sort_order(conn, board_id):
+    """sort_order that puts a new task after every other task on the board."""
+    row = conn.execute(
+        "SELECT COALESCE(MAX(sort_order), ?) + ? AS next_order FROM tasks WHERE board_id = ?",
+        (-SORT_GAP, SORT_GAP, board_id)
+    ).fetchone()
+    return row["next_order"]
+
+
+def _task_assignments(row, title=None, description=None, recurrence_type=None,
+                      recurrence_value=None, recurrence_days=None, start_date=None,
+                      end_date=None, sort_order=None, recurrence_nth=None):
+    """SET clauses and values for the fields given (None = leave unchanged).
+
+    row is the stored task, needed to re-validate a partially changed rule.
+    """
+    _check_task_fields(locals())
     fields = []
     values = []
     if title is not None:
@@ -108,15 +663,10 @@ def update_task(task_id, title=None, description=None, recurrence_type=None,
     if description is not None:
         fields.append("description = ?")
         values.append(description)
-    if recurrence_type is not None:
-        fields.append("recurrence_type = ?")
-        values.append(recurrence_type)
-    if recurrence_value is not None:
-        fields.append("recurrence_value = ?")
-        values.append(int(recurrence_value))
-    if recurrence_days is not None:
-        fields.append("recurrence_days = ?")
-        values.append(recurrence_days if recurrence_days else None)
+    for column, value in _recurrence_update(row, recurrence_type, recurrence_value,
+                                            recurrence_days, recurrence_nth).items():
+        fields.append(f"{column} = ?")
+        values.append(value)
     if start_date is not None:
         fields.append("start_date = ?")
         values.append(start_date if start_date else None)
@@ -125,206 +675,1084 @@ def update_task(task_id, title=None, description=None, recurrence_type=None,
         values.append(end_date if end_date else None)
     if sort_order is not None:
         fields.append("sort_order = ?")
-        values.append(int(sort_order))
+        values.append(_whole_number("sort_order", sort_order))
+    return fields, values
+
+
+def update_task(task_id, title=None, description=None, recurrence_type=None,
+                recurrence_value=None, recurrence_days=None, start_date=None, end_date=None,
+                sort_order=None, recurrence_nth=None, board_id=DEFAULT_BOARD_ID):
+    """Change the given fields; raises ValueError if the resulting rule is invalid.
+
+    Tasks of other boards are left alone.
+    """
+    conn = get_db()
+    row = conn.execute("SELECT * FROM tasks WHERE id = ? AND board_id = ?",
+                       (task_id, board_id)).fetchone()
+    if row is None:
+        return
+    fields, values = _task_assignments(row, title, description, recurrence_type,
+                                       recurrence_value, recurrence_days, start_date,
+                                       end_date, sort_order, recurrence_nth)
     if not fields:
-        conn.close()
         return
     values.append(task_id)
     conn.execute(f"UPDATE tasks SET {', '.join(fields)} WHERE id = ?", values)
-    conn.commit()
-    conn.close()
+    _refresh_next_due_date(conn, task_id)
+    _commit_write(conn, board_id)
 
 
-def delete_task(task_id):
+def delete_task(task_id, board_id=DEFAULT_BOARD_ID):
     conn = get_db()
-    conn.execute("DELETE FROM tasks WHERE id = ?", (task_id,))
-    conn.commit()
-    conn.close()
+    conn.execute("DELETE FROM tasks WHERE id = ? AND board_id = ?", (task_id, board_id))
+    _commit_write(conn, board_id)
+
+
+def apply_task_batch(ops, board_id=DEFAULT_BOARD_ID):
+    """Apply create/update/delete operations in one transaction — all or nothing.
+
+    ops: {"op": "create", "fields": add_task kwargs},
+         {"op": "update", "id": n, "fields": update_task kwargs} or
+         {"op": "delete", "id": n}.
+    Creates share one sort_order allocation and go in with a single
+    executemany, as do deletes and updates touching the same columns.
+    Returns one {"status", "id"} per op; if any op targets a task missing
+    from the board ("not_found"), a task already used by another op ("duplicate") or
+    carries a malformed field or recurrence rule ("invalid", with a "message"),
+    nothing is written.
+    """
+    conn = get_db()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        targets = [op["id"] for op in ops if op["op"] != "create"]
+        existing = {r["id"]: r for r in conn.execute(
+            "SELECT * FROM tasks WHERE board_id = ? AND id IN (SELECT value FROM json_each(?))",
+            (board_id, json.dumps(targets))
+        )}
+        results, seen, prepared = [], set(), []
+        for op in ops:
+            task_id = op.get("id")
+            result = {"status": "ok", "id": task_id}
+            prep = None
+            try:
+                if op["op"] == "create":
+                    f = op["fields"]
+                    _check_task_fields(f)
+                    prep = _recurrence_columns(
+                        f.get("is_recurring"), f.get("recurrence_type"), f.get("recurrence_value"),
+                        f.get("recurrence_days"), f.get("recurrence_nth"))
+                elif task_id in seen:
+                    result["status"] = "duplicate"
+                elif task_id not in existing:
+                    result["status"] = "not_found"
+                elif op["op"] == "update":
+                    prep = _task_assignments(existing[task_id], **op["fields"])
+            except ValueError as e:
+                result.update(status="invalid", message=str(e))
+            if op["op"] != "create":
+                seen.add(task_id)
+            results.append(result)
+            prepared.append(prep)
+        if any(r["status"] != "ok" for r in results):
+            conn.rollback()
+            return results
+
+        creates = [i for i, op in enumerate(ops) if op["op"] == "create"]
+        if creates:
+            first = _next_sort_order(conn, board_id)
+            rows = []
+            for n, i in enumerate(creates):
+                f, rule = ops[i]["fields"], prepared[i]
+                rows.append((
+                    f["title"], f.get("description", ""), int(bool(f.get("is_recurring"))),
+                    rule["recurrence_type"], rule["recurrence_value"], rule["recurrence_days"],
+                    rule["weekday_mask"], rule["recurrence_nth"],
+                    f.get("start_date"), f.get("end_date"), first + n * SORT_GAP,
+                    compute_next_due_date({"is_recurring": f.get("is_recurring"), **rule}, None),
+                    board_id,
+                ))
+            conn.executemany(
+                """INSERT INTO tasks (title, description, is_recurring, recurrence_type,
+                   recurrence_value, recurrence_days, weekday_mask, recurrence_nth,
+                   start_date, end_date, sort_order, next_due_date, board_id)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                rows
+            )
+            # The new rows are exactly the board's ones at or above the allocated start
+            new_ids = [r["id"] for r in conn.execute(
+                """SELECT id FROM tasks WHERE board_id = ? AND active = 1 AND sort_order >= ?
+                   ORDER BY sort_order""",
+                (board_id, first)
+            )]
+            for i, task_id in zip(creates, new_ids):
+                results[i]["id"] = task_id
+
+        groups = {}
+        updated = []
+        for op, prep in zip(ops, prepared):
+            if op["op"] == "update":
+                fields, values = prep
+                if fields:
+                    groups.setdefault(tuple(fields), []).append(values + [op["id"]])
+                    updated.append(op["id"])
+        for fields, rows in groups.items():
+            conn.executemany(f"UPDATE tasks SET {', '.join(fields)} WHERE id = ?", rows)
+        for task_id in updated:
+            _refresh_next_due_date(conn, task_id)
+
+        deletes = [(op["id"],) for op in ops if op["op"] == "delete"]
+        if deletes:
+            conn.executemany("DELETE FROM tasks WHERE id = ?", deletes)
+    except Exception:
+        conn.rollback()
+        raise
+    _commit_write(conn, board_id)
+    return results
 
 
-def get_all_tasks():
+def get_all_tasks(board_id=DEFAULT_BOARD_ID):
     conn = get_db()
-    rows = conn.execute("SELECT * FROM tasks WHERE active = 1 ORDER BY sort_order, id").fetchall()
-    conn.close()
+    rows = conn.execute("SELECT * FROM tasks WHERE board_id = ? AND active = 1 ORDER BY sort_order, id",
+                        (board_id,)).fetchall()
     return [dict(r) for r in rows]
 
 
-def get_recurring_tasks():
+def get_change_seq(board_id=DEFAULT_BOARD_ID):
+    """Sequence number of the board's newest task change (0 if none yet)."""
+    conn = get_db()
+    return conn.execute("SELECT COALESCE(MAX(seq), 0) FROM task_changes WHERE board_id = ?",
+                        (board_id,)).fetchone()[0]
+
+
+def get_task_changes(since, board_id=DEFAULT_BOARD_ID):
+    """Active-list diff since change `since`.
+
+    Returns {"seq": newest, "tasks": [rows created or updated], "deleted": [ids]};
+    tasks that were deleted or deactivated (completed one-time) count as deleted.
+    """
+    conn = get_db()
+    conn.execute("BEGIN")  # one snapshot for seq and rows
+    try:
+        seq = conn.execute("SELECT COALESCE(MAX(seq), 0) FROM task_changes WHERE board_id = ?",
+                           (board_id,)).fetchone()[0]
+        rows = conn.execute(
+            """SELECT c.task_id, t.* FROM task_changes c
+               LEFT JOIN tasks t ON t.id = c.task_id
+               WHERE c.board_id = ? AND c.seq > ?
+               ORDER BY c.seq""",
+            (board_id, since)
+        ).fetchall()
+    finally:
+        conn.rollback()
+    tasks, deleted = [], []
+    for row in rows:
+        if row["id"] is None or not row["active"]:
+            deleted.append(row["task_id"])
+        else:
+            task = dict(row)
+            del task["task_id"]
+            tasks.append(task)
+    return {"seq": seq, "tasks": tasks, "deleted": deleted}
+
+
+def get_recurring_tasks(board_id=DEFAULT_BOARD_ID):
     conn = get_db()
     rows = conn.execute(
-        "SELECT * FROM tasks WHERE active = 1 AND is_recurring = 1 ORDER BY sort_order, id"
+        """SELECT * FROM tasks WHERE board_id = ? AND active = 1 AND is_recurring = 1
+           ORDER BY sort_order, id""",
+        (board_id,)
     ).fetchall()
-    conn.close()
     return [dict(r) for r in rows]
 
 
-def reorder_tasks(task_ids):
-    """Set sort_order for tasks based on the order of IDs provided."""
+def reorder_tasks(task_ids, board_id=DEFAULT_BOARD_ID):
+    """Set sort_order for tasks based on the order of IDs provided.
+
+    Rows already holding their target value are not rewritten, so swapping
+    two neighbours in a full list only touches those two rows.
+    """
     conn = get_db()
-    for idx, tid in enumerate(task_ids):
-        conn.execute("UPDATE tasks SET sort_order = ? WHERE id = ?", (idx, tid))
-    conn.commit()
-    conn.close()
+    conn.executemany(
+        "UPDATE tasks SET sort_order = ? WHERE id = ? AND board_id = ? AND sort_order != ?",
+        [(idx * SORT_GAP, tid, board_id, idx * SORT_GAP) for idx, tid in enumerate(task_ids)],
+    )
+    _commit_write(conn, board_id)
+
+
+def _rebalance_sort_order(conn, board_id=None):
+    """Re-space active tasks SORT_GAP apart, keeping their current order.
+
+    board_id None re-spaces the whole table (as before boards existed).
+    """
+    board = "" if board_id is None else "AND board_id = ?"
+    rows = conn.execute(f"SELECT id FROM tasks WHERE active = 1 {board} ORDER BY sort_order, id",
+                        () if board_id is None else (board_id,)).fetchall()
+    conn.executemany(
+        "UPDATE tasks SET sort_order = ? WHERE id = ? AND sort_order != ?",
+        [(idx * SORT_GAP, r["id"], idx * SORT_GAP) for idx, r in enumerate(rows)],
+    )
+
+
+def _sort_key_at(conn, task_id, pos, board_id):
+    """sort_order that puts task_id at 0-based pos among the board's other active tasks.
+
+    Returns None when the neighbours have no free value between them.
+    """
+    if pos == 0:
+        row = conn.execute(
+            "SELECT sort_order FROM tasks WHERE board_id = ? AND active = 1 AND id != ? "
+            "ORDER BY sort_order, id LIMIT 1", (board_id, task_id)
+        ).fetchone()
+        return row["sort_order"] - SORT_GAP if row else 0
+    rows = conn.execute(
+        "SELECT sort_order FROM tasks WHERE board_id = ? AND active = 1 AND id != ? "
+        "ORDER BY sort_order, id LIMIT 2 OFFSET ?", (board_id, task_id, pos - 1)
+    ).fetchall()
+    if len(rows) < 2:
+        # Past the end — go after the last one
+        row = conn.execute(
+            "SELECT MAX(sort_order) AS last FROM tasks WHERE board_id = ? AND active = 1 AND id != ?",
+            (board_id, task_id)
+        ).fetchone()
+        return 0 if row["last"] is None else row["last"] + SORT_GAP
+    prev, nxt = rows[0]["sort_order"], rows[1]["sort_order"]
+    if nxt - prev < 2:
+        return None
+    return (prev + nxt) // 2
 
 
-def set_task_position(task_id, new_position):
-    """Move a task to a specific position (1-based). Shifts other tasks accordingly."""
+def set_task_position(task_id, new_position, board_id=DEFAULT_BOARD_ID):
+    """Move a task to a specific position (1-based). Shifts other tasks accordingly.
+
+    Only the moved row is written, unless its neighbours have to be re-spaced.
+    """
     conn = get_db()
     pos = max(0, new_position - 1)  # convert to 0-based
-    rows = conn.execute("SELECT id FROM tasks WHERE active = 1 ORDER BY sort_order, id").fetchall()
-    ids = [r["id"] for r in rows]
-    if task_id not in ids:
-        conn.close()
+    if not conn.execute("SELECT 1 FROM tasks WHERE id = ? AND board_id = ? AND active = 1",
+                        (task_id, board_id)).fetchone():
         return
-    ids.remove(task_id)
-    pos = min(pos, len(ids))
-    ids.insert(pos, task_id)
-    for idx, tid in enumerate(ids):
-        conn.execute("UPDATE tasks SET sort_order = ? WHERE id = ?", (idx, tid))
-    conn.commit()
-    conn.close()
+    new_order = _sort_key_at(conn, task_id, pos, board_id)
+    if new_order is None:
+        _rebalance_sort_order(conn, board_id)
+        new_order = _sort_key_at(conn, task_id, pos, board_id)
+    conn.execute("UPDATE tasks SET sort_order = ? WHERE id = ?", (new_order, task_id))
+    _commit_write(conn, board_id)
+
+
+SEARCH_TITLE_WEIGHT = 10.0  # bm25 weight of a title hit relative to a description hit
+
+
+def _fts_query(text):
+    """User input -> FTS5 query: every word must match, each as a prefix."""
+    words = re.findall(r"\w+", text)
+    return " ".join(f'"{w}"*' for w in words)
 
 
-def get_task(task_id):
+def search_tasks(text, limit=20, offset=0, recurring=None, board_id=DEFAULT_BOARD_ID):
+    """Active tasks whose title or description matches `text`, best first.
+
+    Words are prefix-matched (diacritics ignored) and all must occur; title
+    hits outrank description hits. recurring: True/False to narrow by kind.
+    """
+    query = _fts_query(text)
+    if not query:
+        return []
     conn = get_db()
-    row = conn.execute("SELECT * FROM tasks WHERE id = ?", (task_id,)).fetchone()
-    conn.close()
+    kind, args = "", [query, board_id]
+    if recurring is not None:
+        kind = "AND t.is_recurring = ?"
+        args.append(int(recurring))
+    rows = conn.execute(
+        f"""SELECT t.* FROM tasks_fts
+            JOIN tasks t ON t.id = tasks_fts.rowid
+            WHERE tasks_fts MATCH ? AND t.board_id = ? AND t.active = 1 {kind}
+            ORDER BY bm25(tasks_fts, ?, 1.0), t.sort_order, t.id
+            LIMIT ? OFFSET ?""",
+        args + [SEARCH_TITLE_WEIGHT, limit, offset]
+    ).fetchall()
+    return [dict(r) for r in rows]
+
+
+def get_task(task_id, board_id=DEFAULT_BOARD_ID):
+    conn = get_db()
+    row = conn.execute("SELECT * FROM tasks WHERE id = ? AND board_id = ?",
+                       (task_id, board_id)).fetchone()
     return dict(row) if row else None
 
 
 # --- Completions ---
 
-def complete_task(task_id):
+def complete_task(task_id, board_id=DEFAULT_BOARD_ID):
     """Mark a task as completed. For one-time tasks, deactivate them."""
     conn = get_db()
-    task = conn.execute("SELECT * FROM tasks WHERE id = ?", (task_id,)).fetchone()
+    task = conn.execute("SELECT * FROM tasks WHERE id = ? AND board_id = ?",
+                        (task_id, board_id)).fetchone()
     if not task:
-        conn.close()
         return False
 
-    conn.execute("INSERT INTO completions (task_id) VALUES (?)", (task_id,))
+    conn.execute("INSERT INTO completions (task_id, board_id) VALUES (?, ?)", (task_id, board_id))
 
     if not task["is_recurring"]:
         conn.execute("UPDATE tasks SET active = 0 WHERE id = ?", (task_id,))
+    else:
+        _refresh_next_due_date(conn, task_id)
 
-    conn.commit()
-    conn.close()
+    _commit_write(conn, board_id)
     return True
 
 
-def get_last_completion(task_id):
+COMPLETION_CLOCK_SKEW = timedelta(minutes=5)  # client clocks may run a little ahead
+
+
+def _parse_completed_at(value):
+    """datetime of a "YYYY-MM-DD HH:MM:SS" completion timestamp, None if malformed."""
+    try:
+        return datetime.strptime(value, "%Y-%m-%d %H:%M:%S")
+    except (TypeError, ValueError):
+        return None
+
+
+def _is_task_id(value):
+    """JSON true/false are ints to Python but never task ids."""
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def complete_tasks(items, board_id=DEFAULT_BOARD_ID):
+    """Apply a batch of completions in one transaction (one commit, one fsync).
+
+    items: dicts with "client_id", "task_id" and optionally "completed_at"
+    ("YYYY-MM-DD HH:MM:SS", local time; default now, at most
+    COMPLETION_CLOCK_SKEW in the future). A client_id already
+    stored is acknowledged as "duplicate" without a second insert, so a
+    client may resend a batch whose response it never saw.
+    Returns one {"client_id", "status"} per item, status being "ok",
+    "duplicate", "not_found" (also for tasks of other boards) or "invalid".
+    """
+    conn = get_db()
+    task_ids = {item.get("task_id") for item in items if _is_task_id(item.get("task_id"))}
+    tasks = {r["id"]: r for r in conn.execute(
+        """SELECT id, is_recurring FROM tasks
+           WHERE board_id = ? AND id IN (SELECT value FROM json_each(?))""",
+        (board_id, json.dumps(sorted(task_ids)))
+    )}
+    now = datetime.now()
+    now_text, latest = now.strftime("%Y-%m-%d %H:%M:%S"), now + COMPLETION_CLOCK_SKEW
+    results = []
+    touched = set()
+    try:
+        for item in items:
+            client_id, task_id = item.get("client_id"), item.get("task_id")
+            completed_at = item.get("completed_at") or now_text
+            if not isinstance(client_id, str) or not client_id or not _is_task_id(task_id):
+                results.append({"client_id": client_id, "status": "invalid"})
+                continue
+            when = _parse_completed_at(completed_at)
+            if when is None or when > latest:
+                results.append({"client_id": client_id, "status": "invalid"})
+                continue
+            if task_id not in tasks:
+                results.append({"client_id": client_id, "status": "not_found"})
+                continue
+            cur = conn.execute(
+                """INSERT OR IGNORE INTO completions (task_id, completed_at, client_id, board_id)
+                   VALUES (?, ?, ?, ?)""",
+                (task_id, completed_at, client_id, board_id)
+            )
+            if cur.rowcount:
+                touched.add(task_id)
+                results.append({"client_id": client_id, "status": "ok"})
+            else:
+                results.append({"client_id": client_id, "status": "duplicate"})
+
+        for task_id in touched:
+            if not tasks[task_id]["is_recurring"]:
+                conn.execute("UPDATE tasks SET active = 0 WHERE id = ?", (task_id,))
+            else:
+                _refresh_next_due_date(conn, task_id)
+    except Exception:
+        conn.rollback()
+        raise
+    if touched:
+        _commit_write(conn, board_id)
+    else:
+        conn.rollback()
+    return results
+
+
+def get_completion_history(task_id, limit=50, before=None, board_id=DEFAULT_BOARD_ID):
+    """Newest-first completions of a task, raw rows merged with rollups.
+
+    before: (completed_at, id) of the last row already seen — keyset cursor,
+    so every page is an index range scan no matter how deep it goes.
+    Rolled-up periods appear as one row each with a negative id, "count",
+    "period", "period_start" and "first_completed_at"; their completed_at is
+    the last completion in the period. Empty for a task of another board.
+    """
+    conn = get_db()
+    if not conn.execute("SELECT 1 FROM tasks WHERE id = ? AND board_id = ?",
+                        (task_id, board_id)).fetchone():
+        return []
+    keyset = "" if before is None else "AND (completed_at, id) < (?, ?)"
+    rollup_keyset = "" if before is None else "AND (last_at, -id) < (?, ?)"
+    args = (task_id,) + (tuple(before) if before is not None else ()) + (limit,)
+    raw = conn.execute(
+        f"""SELECT * FROM completions WHERE board_id = ? AND task_id = ? {keyset}
+            ORDER BY completed_at DESC, id DESC LIMIT ?""",
+        (board_id,) + args
+    ).fetchall()
+    rolled = conn.execute(
+        f"""SELECT -id AS id, task_id, last_at AS completed_at, count, period, period_start,
+                   first_at AS first_completed_at
+            FROM completion_rollups WHERE task_id = ? {rollup_keyset}
+            ORDER BY last_at DESC, id ASC LIMIT ?""",
+        args
+    ).fetchall()
+    merged = heapq.merge(raw, rolled, key=lambda r: (r["completed_at"], r["id"]), reverse=True)
+    return [dict(r) for r in itertools.islice(merged, limit)]
+
+
+def _streak_max_gap(task):
+    """Largest gap in days between completions that still keeps a streak going."""
+    return recurrence.max_gap_days(recurrence.rule_from_task(task))
+
+
+def get_completion_stats(task_id, board_id=DEFAULT_BOARD_ID):
+    """Completion statistics computed in SQL (window functions), or None if no such task.
+
+    Streaks count completion days in a row where each followed the previous
+    within the task's recurrence interval; the current streak is 0 once the
+    task is overdue by more than one interval.
+    """
     conn = get_db()
+    task = conn.execute("SELECT * FROM tasks WHERE id = ? AND board_id = ?",
+                        (task_id, board_id)).fetchone()
+    if not task:
+        return None
+    max_gap = _streak_max_gap(dict(task))
+    today = date.today().isoformat()
+
+    # Raw completions and rollups as (first_at, last_at, n) spans; a raw row
+    # is a span of one. Rollups never cross a week or month boundary, so
+    # per-period counts stay exact.
+    spans = """SELECT completed_at AS first_at, completed_at AS last_at, 1 AS n
+               FROM completions WHERE board_id = :board AND task_id = :task
+               UNION ALL
+               SELECT first_at, last_at, count FROM completion_rollups WHERE task_id = :task"""
+
+    # The mean gap between consecutive completions is (last - first) / (n - 1)
+    summary = conn.execute(
+        f"""WITH spans AS ({spans})
+            SELECT SUM(n) AS total, MIN(first_at) AS first, MAX(last_at) AS last,
+                   CASE WHEN SUM(n) > 1
+                        THEN (julianday(MAX(last_at)) - julianday(MIN(first_at))) / (SUM(n) - 1)
+                   END AS avg_interval_days
+            FROM spans""",
+        {"task": task_id, "board": board_id}
+    ).fetchone()
+
+    # Streaks need every completion day: raw rows give theirs, rollups
+    # expand their day_mask (bit k = period_start + k days).
+    streaks = conn.execute(
+        f"""WITH RECURSIVE offsets(k) AS (
+               SELECT 0 UNION ALL SELECT k + 1 FROM offsets WHERE k < {ROLLUP_MAX_DAYS - 1}
+           ), days AS (
+               SELECT date(completed_at) AS d
+               FROM completions WHERE board_id = :board AND task_id = :task
+               UNION
+               SELECT date(r.period_start, '+' || o.k || ' days')
+               FROM completion_rollups r JOIN offsets o ON (r.day_mask >> o.k) & 1
+               WHERE r.task_id = :task
+           ), gaps AS (
+               SELECT d, julianday(d) - julianday(LAG(d) OVER (ORDER BY d)) AS gap FROM days
+           ), runs AS (
+               SELECT d, SUM(CASE WHEN gap IS NULL OR gap > :max_gap THEN 1 ELSE 0 END)
+                           OVER (ORDER BY d) AS run
+               FROM gaps
+           ), islands AS (
+               SELECT run, COUNT(*) AS length, MAX(d) AS last_day FROM runs GROUP BY run
+           )
+           SELECT COALESCE(MAX(length), 0) AS longest,
+                  (SELECT CASE WHEN julianday(:today) - julianday(last_day) <= :max_gap
+                               THEN length ELSE 0 END
+                   FROM islands ORDER BY run DESC LIMIT 1) AS current
+           FROM islands""",
+        {"task": task_id, "board": board_id, "max_gap": max_gap, "today": today}
+    ).fetchone()
+
+    def per_period(fmt):
+        rows = conn.execute(
+            f"""WITH spans AS ({spans})
+                SELECT strftime(:fmt, first_at) AS period, SUM(n) AS count
+                FROM spans GROUP BY period ORDER BY period""",
+            {"task": task_id, "board": board_id, "fmt": fmt}
+        ).fetchall()
+        return [dict(r) for r in rows]
+
+    avg = summary["avg_interval_days"]
+    return {
+        "task_id": task_id,
+        "total": summary["total"] or 0,
+        "first_completed_at": summary["first"],
+        "last_completed_at": summary["last"],
+        "avg_interval_days": round(avg, 2) if avg is not None else None,
+        "current_streak": streaks["current"] or 0,
+        "longest_streak": streaks["longest"],
+        "per_week": per_period("%Y-W%W"),
+        "per_month": per_period("%Y-%m"),
+    }
+
+
+# --- Dashboard logic ---
+
+def _in_date_window(task, today):
+    """Check start_date / end_date bounds (malformed dates are ignored)."""
+    if task.get("start_date"):
+        try:
+            if today < date.fromisoformat(task["start_date"]):
+                return False
+        except ValueError:
+            pass
+    if task.get("end_date"):
+        try:
+            if today > date.fromisoformat(task["end_date"]):
+                return False
+        except ValueError:
+            pass
+    return True
+
+
+def compute_next_due_date(task, last_completed_at):
+    """Return the ISO date from which a task is due, given its latest completion.
+
+    This is the single place where the due date is derived (the arithmetic
+    itself is in recurrence.next_due): it is stored in tasks.next_due_date on
+    every write and read back by get_tasks_for_today. Weekday tasks are
+    additionally only shown on selected weekdays.
+    """
+    rule = recurrence.rule_from_task(task)
+    if rule is None:
+        # One-time task — due until completed (then deactivated)
+        return DUE_ALWAYS
+    if rule.kind == "weekdays" and not rule.mask:
+        return DUE_NEVER
+
+    if last_completed_at is None:
+        if rule.kind not in ("month_end", "nth_weekday"):
+            return DUE_ALWAYS
+        # Calendar rules first fall due on their first date since creation
+        created = _parse_date((task.get("created_at") or "")[:10]) or date.today()
+        due = recurrence.next_due(rule._replace(interval=1), created - timedelta(days=1))
+    else:
+        # Użyj daty (nie datetime) — zadanie ma pojawić się o północy,
+        # niezależnie od godziny ukończenia
+        last_date = datetime.strptime(last_completed_at, "%Y-%m-%d %H:%M:%S").date()
+        due = recurrence.next_due(rule, last_date)
+    return due.isoformat() if due else DUE_NEVER
+
+
+def _refresh_next_due_date(conn, task_id):
+    """Recompute tasks.next_due_date inside the caller's transaction."""
     row = conn.execute(
-        "SELECT completed_at FROM completions WHERE task_id = ? ORDER BY completed_at DESC LIMIT 1",
+        """SELECT t.*, (SELECT MAX(completed_at) FROM completions c
+                        WHERE c.task_id = t.id) AS last_completed_at
+           FROM tasks t WHERE t.id = ?""",
         (task_id,)
     ).fetchone()
-    conn.close()
     if row:
-        return datetime.strptime(row["completed_at"], "%Y-%m-%d %H:%M:%S")
-    return None
+        conn.execute("UPDATE tasks SET next_due_date = ? WHERE id = ?",
+                     (compute_next_due_date(dict(row), row["last_completed_at"]), task_id))
+
+
+def _refresh_all_next_due_dates(conn, board_id=None):
+    """Recompute next_due_date for every active task (of one board) with one bulk read."""
+    conn.executemany(
+        "UPDATE tasks SET next_due_date = ? WHERE id = ?",
+        [(compute_next_due_date(dict(r), r["last_completed_at"]), r["id"])
+         for r in _load_tasks_with_last_completion(conn, board_id)],
+    )
+
+
+def _is_shown_on(task, day):
+    """Checks not captured by next_due_date: date window and weekday schedule."""
+    if not _in_date_window(task, day):
+        return False
+    return recurrence.shows_on(recurrence.rule_from_task(task), day)
 
 
-def get_completion_history(task_id, limit=50):
+def _load_tasks_with_last_completion(conn, board_id=None):
+    """Load active tasks plus their latest completion in a single query.
+
+    board_id None loads every board (migrations, which may run before the
+    column exists).
+    """
+    if board_id is None:
+        completions, tasks, args = "", "", ()
+    else:
+        completions, tasks, args = "WHERE board_id = ?", "AND t.board_id = ?", (board_id, board_id)
+    return conn.execute(
+        f"""SELECT t.*, lc.last_completed_at
+            FROM tasks t
+            LEFT JOIN (
+                SELECT task_id, MAX(completed_at) AS last_completed_at
+                FROM completions {completions}
+                GROUP BY task_id
+            ) lc ON lc.task_id = t.id
+            WHERE t.active = 1 {tasks}
+            ORDER BY t.sort_order, t.id""",
+        args
+    ).fetchall()
+
+
+# ─── Today-view cache ───
+# Every display of a board polls the same list, so it is built once per
+# (board, board data_version, date). Writes in this process clear only their
+# board's entry right away; the data_version in the key also catches writes
+# from other processes (CLI import). start_date, end_date and next_due_date
+# all switch at midnight, so the date in the key doubles as expiry at local
+# midnight and at every task's date boundary.
+
+_today_cache = {}  # board_id -> {"key": (data_version, date), "tasks": [...]}
+_today_cache_stats = {}  # board_id -> {"hits", "misses", "invalidations"}
+_today_cache_lock = threading.Lock()
+
+
+def _board_cache_stats(board_id):
+    return _today_cache_stats.setdefault(board_id, {"hits": 0, "misses": 0, "invalidations": 0})
+
+
+def _invalidate_today_cache(board_id=None):
+    """Drop one board's cached today-view, or every board's if board_id is None."""
+    with _today_cache_lock:
+        boards = list(_today_cache) if board_id is None else [board_id]
+        for board in boards:
+            if _today_cache.pop(board, None) is not None:
+                _board_cache_stats(board)["invalidations"] += 1
+
+
+def get_today_cache_stats():
+    """Hit/miss/invalidation counters of the today-view cache, in total and per board."""
+    with _today_cache_lock:
+        boards = {board: dict(stats) for board, stats in _today_cache_stats.items()}
+    total = {name: sum(stats[name] for stats in boards.values())
+             for name in ("hits", "misses", "invalidations")}
+    return {**total, "boards": boards}
+
+
+def get_tasks_for_today(board_id=DEFAULT_BOARD_ID):
+    """Get tasks that should be displayed today on the board's dashboard (memoized).
+
+    The returned list is shared between callers — treat it as read-only.
+    """
+    key = (get_data_version(board_id), date.today())
+    with _today_cache_lock:
+        entry = _today_cache.get(board_id)
+        if entry is not None and entry["key"] == key:
+            _board_cache_stats(board_id)["hits"] += 1
+            return entry["tasks"]
+        _board_cache_stats(board_id)["misses"] += 1
+    tasks = _build_tasks_for_today(key[1], board_id)
+    with _today_cache_lock:
+        _today_cache[board_id] = {"key": key, "tasks": tasks}
+    return tasks
+
+
+def _build_tasks_for_today(today, board_id=DEFAULT_BOARD_ID):
     conn = get_db()
     rows = conn.execute(
-        "SELECT * FROM completions WHERE task_id = ? ORDER BY completed_at DESC LIMIT ?",
-        (task_id, limit)
+        """SELECT * FROM tasks
+           WHERE board_id = ? AND active = 1 AND next_due_date <= ?
+           ORDER BY sort_order, id""",
+        (board_id, today.isoformat())
     ).fetchall()
-    conn.close()
-    return [dict(r) for r in rows]
+    tasks = [dict(r) for r in rows]
+    return [{**t, "completed_today": False} for t in tasks if _is_shown_on(t, today)]
 
 
-# --- Dashboard logic ---
+# --- Schedule projection ---
 
-def _is_today_weekday_match(recurrence_days):
-    """Check if today's weekday is in the comma-separated list (mon,tue,wed,thu,fri,sat,sun)."""
-    if not recurrence_days:
-        return False
-    today_code = WEEKDAY_NAMES[datetime.now().weekday()]
-    days = [d.strip().lower() for d in recurrence_days.split(",")]
-    return today_code in days
+SCHEDULE_MAX_DAYS = 366
 
 
-def _was_completed_today(task_id):
-    """Check if task was already completed today."""
-    conn = get_db()
-    today_str = date.today().isoformat()
-    row = conn.execute(
-        "SELECT id FROM completions WHERE task_id = ? AND completed_at >= ? LIMIT 1",
-        (task_id, today_str)
-    ).fetchone()
-    conn.close()
-    return row is not None
+def _parse_date(value):
+    """date from 'YYYY-MM-DD', or None when empty or malformed."""
+    if not value:
+        return None
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        return None
 
 
-def get_tasks_for_today():
-    """Get tasks that should be displayed today on the dashboard."""
-    all_tasks = get_all_tasks()
-    today_tasks = []
-    now = datetime.now()
+def iter_occurrences(task, first, last, today):
+    """Dates in [first, last] on which the task would be on the dashboard.
+
+    Projection starts today from the stored next_due_date and assumes the
+    task is done on the day it shows up, exactly like get_tasks_for_today
+    would see it day by day.
+    """
+    start_bound = _parse_date(task.get("start_date"))
+    end_bound = _parse_date(task.get("end_date"))
+    first = max(first, today, start_bound or first)
+    last = min(last, end_bound or last)
+    due = _parse_date(task.get("next_due_date")) or date.min
+    if first > last or due == date.max:
+        return
+
+    if not task["is_recurring"]:
+        shows_on = max(today, start_bound or today)
+        if first <= shows_on <= last:
+            yield shows_on
+        return
+
+    rule = recurrence.rule_from_task(task)
+    if rule.kind == "weekdays" and not rule.mask:
+        return
+
+    # Overdue tasks show today, the rest on their due date; weekday tasks
+    # on the first selected weekday from then on
+    day = recurrence.first_on_or_after(rule, max(due, today, start_bound or today))
+    step = {"days": 1, "weeks": 7}.get(rule.kind)
+    if step is not None:
+        step *= rule.interval
+        if day < first:
+            day += timedelta(days=-(-(first - day).days // step) * step)
+    elif rule.kind == "weekdays" and rule.interval == 1 and day < first:
+        day = recurrence.first_on_or_after(rule, first)  # every selected day shows
+    while day is not None and day <= last:
+        if day >= first:
+            yield day
+        day = recurrence.next_due(rule, day)
+
+
+def get_schedule(first, last, board_id=DEFAULT_BOARD_ID):
+    """Project every active task of the board onto the dates first..last (inclusive).
+
+    Returns {"days": {"YYYY-MM-DD": [task_id, ...]}, "tasks": {task_id: task}}
+    with every date present and ids in dashboard order.
+    """
     today = date.today()
+    conn = get_db()
+    rows = conn.execute("SELECT * FROM tasks WHERE board_id = ? AND active = 1 ORDER BY sort_order, id",
+                        (board_id,)).fetchall()
+    days = {}
+    day = first
+    while day <= last:
+        days[day.isoformat()] = []
+        day += timedelta(days=1)
+    tasks = {}
+    for row in rows:
+        task = dict(row)
+        for day in iter_occurrences(task, first, last, today):
+            days[day.isoformat()].append(task["id"])
+            tasks[task["id"]] = task
+    return {"from": first.isoformat(), "to": last.isoformat(), "days": days, "tasks": tasks}
 
-    for task in all_tasks:
-        # ── Check start_date: don't show task before its start date ──
-        if task.get("start_date"):
-            try:
-                start = date.fromisoformat(task["start_date"])
-                if today < start:
-                    continue
-            except ValueError:
-                pass
 
-        # ── Check end_date: don't show task after its end date ──
-        if task.get("end_date"):
-            try:
-                end = date.fromisoformat(task["end_date"])
-                if today > end:
-                    continue
-            except ValueError:
-                pass
+# --- Retention: roll old completions up into per-period aggregates ---
 
-        if not task["is_recurring"]:
-            # One-time task — show if active
-            today_tasks.append({**task, "completed_today": False})
-            continue
+# Raw completions older than this many days are folded into
+# completion_rollups (0 = keep everything). The newest completion of every
+# task always stays raw — recurrence and the dashboard only look at that one.
+RETENTION_DAYS = int(os.environ.get("DASHBOARD_RETENTION_DAYS", "365"))
+# "week" is ~7x smaller for daily tasks; "day" also keeps old streaks exact
+ROLLUP_PERIOD = os.environ.get("DASHBOARD_ROLLUP_PERIOD", "week")
+RETENTION_BATCH_SIZE = 500
+RETENTION_BATCH_PAUSE_S = 0.05  # let dashboard writes in between batches
+VACUUM_STEP_PAGES = 256
 
-        # ── Recurring: weekdays mode (e.g. every Tuesday) ──
-        rec_type = task["recurrence_type"]
-        if rec_type == "weekdays":
-            if not _is_today_weekday_match(task.get("recurrence_days")):
-                continue  # not scheduled for today
-            completed = _was_completed_today(task["id"])
-            if not completed:
-                today_tasks.append({**task, "completed_today": False})
-            # if completed today — hide it (already done)
-            continue
+if ROLLUP_PERIOD not in ("day", "week"):
+    raise ValueError(f"Invalid DASHBOARD_ROLLUP_PERIOD: {ROLLUP_PERIOD}")
+
+# Bucket start for a completion; weeks are cut at month boundaries so that
+# per-week and per-month stats stay exact.
+_ROLLUP_BUCKETS = {
+    "day": "date(completed_at)",
+    "week": "MAX(date(completed_at, '-6 days', 'weekday 1'), date(completed_at, 'start of month'))",
+}
+
+# Longest bucket in days; a rollup's day_mask has one bit per day from period_start
+ROLLUP_MAX_DAYS = 7
+
+# day_mask bit of a completion within its bucket (SUM(DISTINCT ...) of these ORs them)
+_ROLLUP_DAY_BIT = "1 << CAST(julianday(date(completed_at)) - julianday({bucket}) AS INTEGER)"
+
+_ROLLUP_UPSERT = """
+    ON CONFLICT (task_id, period_start) DO UPDATE SET
+        count = count + excluded.count,
+        first_at = MIN(first_at, excluded.first_at),
+        last_at = MAX(last_at, excluded.last_at),
+        day_mask = day_mask | excluded.day_mask,
+        period = CASE WHEN excluded.period = 'week' THEN 'week' ELSE period END"""
+
+
+def _rollup_day_mask(period_start, first_at, last_at):
+    """day_mask from what a rollup without one still knows: its first and last day."""
+    start = date.fromisoformat(period_start[:10])
+    return sum({1 << (date.fromisoformat(at[:10]) - start).days for at in (first_at, last_at)})
+
+
+def _compact_batch(conn, cutoff, period, batch_size):
+    """Fold up to batch_size old completions into rollups; returns how many.
+
+    Candidates are read oldest first from idx_completions_completed_at, so the
+    write lock covers an index range of about one batch, not a table scan.
+    """
+    bucket = _ROLLUP_BUCKETS[period]
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        ids = [r["id"] for r in conn.execute(
+            """SELECT c.id FROM completions c
+               WHERE c.completed_at < ?
+                 AND EXISTS (SELECT 1 FROM completions n WHERE n.task_id = c.task_id
+                             AND (n.completed_at, n.id) > (c.completed_at, c.id))
+               ORDER BY c.completed_at LIMIT ?""",
+            (cutoff, batch_size)
+        )]
+        if ids:
+            id_list = json.dumps(ids)
+            conn.execute(
+                f"""INSERT INTO completion_rollups
+                        (task_id, period, period_start, count, first_at, last_at, day_mask)
+                    SELECT task_id, ?, {bucket} AS bucket, COUNT(*),
+                           MIN(completed_at), MAX(completed_at),
+                           SUM(DISTINCT {_ROLLUP_DAY_BIT.format(bucket=bucket)})
+                    FROM completions WHERE id IN (SELECT value FROM json_each(?))
+                    GROUP BY task_id, bucket
+                    {_ROLLUP_UPSERT}""",
+                (period, id_list)
+            )
+            conn.execute("DELETE FROM completions WHERE id IN (SELECT value FROM json_each(?))",
+                         (id_list,))
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return len(ids)
+
+
+def compact_completions(retention_days=RETENTION_DAYS, period=ROLLUP_PERIOD,
+                        batch_size=RETENTION_BATCH_SIZE, pause=RETENTION_BATCH_PAUSE_S):
+    """Roll completions older than retention_days up, then reclaim space.
+
+    Works in short batches (one small write transaction each), so requests
+    are never held up for long. Afterwards freed pages are returned to the
+    filesystem with incremental_vacuum (when the file has auto_vacuum =
+    INCREMENTAL) and the WAL is checkpointed without waiting on readers.
+    History and stats read raw rows and rollups alike, so the data version
+    is left alone.
+    """
+    if period not in _ROLLUP_BUCKETS:
+        raise ValueError(f"Unknown rollup period: {period}")
+    result = {"rolled_up": 0, "batches": 0, "freed_pages": 0, "checkpoint": None}
+    if retention_days <= 0:
+        return result
+    conn = get_db()
+    cutoff = (date.today() - timedelta(days=retention_days)).isoformat()
+    while True:
+        n = _compact_batch(conn, cutoff, period, batch_size)
+        if not n:
+            break
+        result["rolled_up"] += n
+        result["batches"] += 1
+        if pause:
+            time.sleep(pause)
+
+    if conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2:
+        while True:
+            free = conn.execute("PRAGMA freelist_count").fetchone()[0]
+            if not free:
+                break
+            conn.execute(f"PRAGMA incremental_vacuum({min(free, VACUUM_STEP_PAGES)})").fetchall()
+            result["freed_pages"] += min(free, VACUUM_STEP_PAGES)
+            if pause:
+                time.sleep(pause)
+    busy, log, checkpointed = conn.execute("PRAGMA wal_checkpoint(PASSIVE)").fetchone()
+    result["checkpoint"] = {"busy": bool(busy), "wal_frames": log, "checkpointed": checkpointed}
+    return result
+
+
+# --- Export / import (NDJSON) ---
+
+EXPORT_FORMAT = 1
+EXPORT_FETCH_SIZE = 500
+IMPORT_BATCH_SIZE = 500
 
-        # ── Recurring: interval mode (days/weeks/months) ──
-        last = get_last_completion(task["id"])
-        if last is None:
-            today_tasks.append({**task, "completed_today": False})
+# Task columns carried over on import; ids, sort_order and next_due_date are
+# assigned by the target database.
+_TASK_IMPORT_FIELDS = ["title", "description", "is_recurring", "recurrence_type",
+                       "recurrence_value", "recurrence_days", "weekday_mask", "recurrence_nth",
+                       "start_date", "end_date", "created_at", "active"]
+_TASK_IMPORT_DEFAULTS = {
+    "description": lambda: "",
+    "is_recurring": lambda: 0,
+    "weekday_mask": lambda: 0,
+    "created_at": lambda: datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+    "active": lambda: 1,
+}
+
+
+def iter_export(board_id=DEFAULT_BOARD_ID):
+    """Yield one board as NDJSON lines: a header, tasks, completions, rollups.
+
+    Uses its own connection and one read transaction, so the dump is a
+    consistent snapshot and memory stays flat however long the history is.
+    """
+    conn = _connect(DB_PATH)
+    try:
+        conn.execute("BEGIN")
+        yield json.dumps({"type": "header", "format": EXPORT_FORMAT,
+                          "exported_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S")}) + "\n"
+        queries = [
+            ("task", "SELECT * FROM tasks WHERE board_id = ? ORDER BY sort_order, id"),
+            ("completion", """SELECT id, task_id, completed_at FROM completions
+                              WHERE board_id = ? ORDER BY id"""),
+            ("rollup", """SELECT task_id, period, period_start, count, first_at, last_at,
+                                 day_mask
+                          FROM completion_rollups
+                          WHERE task_id IN (SELECT id FROM tasks WHERE board_id = ?)
+                          ORDER BY id"""),
+        ]
+        for record_type, sql in queries:
+            cur = conn.execute(sql, (board_id,))
+            while True:
+                rows = cur.fetchmany(EXPORT_FETCH_SIZE)
+                if not rows:
+                    break
+                for row in rows:
+                    yield json.dumps({"type": record_type, **dict(row)}, ensure_ascii=False) + "\n"
+    finally:
+        conn.rollback()
+        conn.close()
+
+
+def _task_import_values(record):
+    """Column values of an imported task (ValueError if a field or the rule is invalid)."""
+    _check_task_fields(record)
+    value = record.get("recurrence_value")
+    if record.get("recurrence_type") == "weekdays" and record.get("weekday_mask") is None:
+        value = None  # exported before intervals existed: every selected day, like _m011
+    # Compiled columns are rebuilt from the rule text, never trusted from the file
+    record = {**record, **_recurrence_columns(
+        record.get("is_recurring"), record.get("recurrence_type"), value,
+        record.get("recurrence_days"), record.get("recurrence_nth"))}
+    values = []
+    for field in _TASK_IMPORT_FIELDS:
+        value = record.get(field)
+        if value is None and field in _TASK_IMPORT_DEFAULTS:
+            value = _TASK_IMPORT_DEFAULTS[field]()
+        values.append(value)
+    return values
+
+
+def _parse_ndjson(lines):
+    for lineno, line in enumerate(lines, start=1):
+        if isinstance(line, bytes):
+            line = line.decode("utf-8")
+        line = line.strip()
+        if not line:
             continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            raise ValueError(f"Line {lineno}: invalid JSON ({e})") from None
+        if not isinstance(record, dict) or "type" not in record:
+            raise ValueError(f"Line {lineno}: expected an object with a 'type' field")
+        yield lineno, record
 
-        # Użyj daty (nie datetime) — zadanie ma pojawić się o północy,
-        # niezależnie od godziny ukończenia
-        last_date = last.date()
-        rec_val = task["recurrence_value"] or 1
-
-        if rec_type == "days":
-            next_due = last_date + timedelta(days=rec_val)
-        elif rec_type == "weeks":
-            next_due = last_date + timedelta(weeks=rec_val)
-        elif rec_type == "months":
-            month = last_date.month + rec_val
-            year = last_date.year + (month - 1) // 12
-            month = ((month - 1) % 12) + 1
-            day = min(last_date.day, 28)
-            next_due = last_date.replace(year=year, month=month, day=day)
-        else:
-            next_due = last_date + timedelta(days=1)
 
-        if today >= next_due:
-            today_tasks.append({**task, "completed_today": False})
-        # else: not due yet — hide
+def import_ndjson(lines, batch_size=IMPORT_BATCH_SIZE, board_id=DEFAULT_BOARD_ID):
+    """Import records produced by iter_export(), appending to the given board.
+
+    Task ids are remapped and completions and rollups follow their task. Work
+    is committed every `batch_size` records, each batch with its tasks'
+    next_due_date refreshed and the board's data version bumped, so displays
+    pick up a long import as it goes. A malformed line, including a task with
+    an invalid recurrence rule or a completion with a bad completed_at, raises
+    ValueError naming the line; the batches committed so far are kept.
+    Returns counts: {"tasks": n, "completions": n, "rollups": n, "skipped": n}.
+    """
+    conn = get_db()
+    counts = {"tasks": 0, "completions": 0, "rollups": 0, "skipped": 0}
+    id_map = {}
+    completions = []
+    rollups = []
+    touched = set()  # tasks whose next_due_date this batch may change
+    pending = 0
+    next_order = _next_sort_order(conn, board_id)
+    placeholders = ", ".join("?" for _ in _TASK_IMPORT_FIELDS)
+
+    def flush():
+        nonlocal pending
+        if not pending:
+            return
+        conn.executemany("INSERT INTO completions (task_id, completed_at, board_id) VALUES (?, ?, ?)",
+                         completions)
+        conn.executemany(
+            f"""INSERT INTO completion_rollups
+                    (task_id, period, period_start, count, first_at, last_at, day_mask)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                {_ROLLUP_UPSERT}""",
+            rollups
+        )
+        for task_id in touched:
+            _refresh_next_due_date(conn, task_id)
+        completions.clear()
+        rollups.clear()
+        touched.clear()
+        pending = 0
+        _commit_write(conn, board_id)
+
+    try:
+        for lineno, record in _parse_ndjson(lines):
+            if record["type"] == "task":
+                if not record.get("title"):
+                    raise ValueError(f"Line {lineno}: task without title")
+                try:
+                    values = _task_import_values(record)
+                except ValueError as e:
+                    raise ValueError(f"Line {lineno}: {e}") from None
+                cur = conn.execute(
+                    f"""INSERT INTO tasks ({", ".join(_TASK_IMPORT_FIELDS)}, sort_order, board_id)
+                        VALUES ({placeholders}, ?, ?)""",
+                    values + [next_order, board_id],
+                )
+                next_order += SORT_GAP
+                id_map[record.get("id")] = cur.lastrowid
+                touched.add(cur.lastrowid)
+                counts["tasks"] += 1
+            elif record["type"] == "completion":
+                task_id = id_map.get(record.get("task_id"))
+                if task_id is None or not record.get("completed_at"):
+                    counts["skipped"] += 1
+                    continue
+                if _parse_completed_at(record["completed_at"]) is None:
+                    raise ValueError(f"Line {lineno}: completed_at must be YYYY-MM-DD HH:MM:SS")
+                completions.append((task_id, record["completed_at"], board_id))
+                touched.add(task_id)
+                counts["completions"] += 1
+            elif record["type"] == "rollup":
+                task_id = id_map.get(record.get("task_id"))
+                values = [record.get(f) for f in ("period", "period_start", "count",
+                                                  "first_at", "last_at")]
+                if task_id is None or None in values or values[0] not in _ROLLUP_BUCKETS:
+                    counts["skipped"] += 1
+                    continue
+                day_mask = record.get("day_mask")
+                if not isinstance(day_mask, int) or not day_mask:
+                    try:  # exported before day_mask existed
+                        day_mask = _rollup_day_mask(values[1], values[3], values[4])
+                    except (TypeError, ValueError):
+                        counts["skipped"] += 1
+                        continue
+                rollups.append((task_id, *values, day_mask))
+                counts["rollups"] += 1
+            else:
+                continue  # header and unknown record types
+            pending += 1
+            if pending >= batch_size:
+                flush()
+        flush()
+    finally:
+        conn.rollback()  # drop a partial batch after an error
+    return counts
 
-    return today_tasks
@@ -0,0 +1,194 @@
+"""Background control of the RPi display (backlight + screen/USB power).
+
+Available methods are probed once: the sysfs backlight paths are cached and
+the helper binaries (vcgencmd, xset, uhubctl) are looked up on PATH. Requests
+return immediately with a job id; a single worker thread applies them in
+order. A request that is still waiting when a newer one arrives is marked
+"superseded" and folded into it, so rapid sleep/wake toggles collapse into
+the latest state (a pending USB power change is kept when a backlight-only
+request supersedes it).
+"""
+import glob
+import itertools
+import os
+import shutil
+import subprocess
+import threading
+import time
+from collections import OrderedDict
+
+ACTIONS = ("backlight_on", "backlight_off", "screen_on", "screen_off")
+MAX_JOBS_KEPT = 50
+SCREEN_POWER_UP_S = 2  # give the screen time to power up after USB power returns
+
+
+class DisplayController:
+    def __init__(self, backlight_root="/sys/class/backlight", which=shutil.which,
+                 run=subprocess.run, sleep=time.sleep):
+        self._run = run
+        self._sleep = sleep
+        self._probe(backlight_root, which)
+
+        self._cond = threading.Condition()
+        self._ids = itertools.count(1)
+        self._jobs = OrderedDict()
+        self._pending = None
+        self._worker = None
+
+    # ─── Probing ───
+
+    def _probe(self, backlight_root, which):
+        self.brightness_path = None
+        self.max_brightness = 255
+        self.bl_power_path = None
+        devices = sorted(glob.glob(os.path.join(backlight_root, "*")))
+        bri = [d for d in devices if os.path.exists(os.path.join(d, "brightness"))]
+        if bri:
+            self.brightness_path = os.path.join(bri[0], "brightness")
+            try:
+                with open(os.path.join(bri[0], "max_brightness")) as f:
+                    self.max_brightness = int(f.read().strip())
+            except (OSError, ValueError):
+                pass
+        bl = [d for d in devices if os.path.exists(os.path.join(d, "bl_power"))]
+        if bl:
+            self.bl_power_path = os.path.join(bl[0], "bl_power")
+        self.tools = {name: which(name) for name in ("vcgencmd", "xset", "uhubctl")}
+
+    def capabilities(self):
+        return {
+            "brightness": self.brightness_path,
+            "max_brightness": self.max_brightness,
+            "bl_power": self.bl_power_path,
+            "tools": {name: path for name, path in self.tools.items() if path},
+        }
+
+    # ─── Jobs ───
+
+    def submit(self, action):
+        """Queue an action and return its job record (a copy)."""
+        if action not in ACTIONS:
+            raise ValueError(f"Unknown display action: {action}")
+        usb = {"screen_on": True, "screen_off": False}.get(action)
+        panel = action.endswith("_on")
+        with self._cond:
+            if self._pending is not None:
+                old_job, old_usb, _ = self._pending
+                old_job["status"] = "superseded"
+                if usb is None:
+                    usb = old_usb
+            job = {"id": next(self._ids), "action": action, "status": "queued",
+                   "methods": {}, "error": None}
+            self._jobs[job["id"]] = job
+            while len(self._jobs) > MAX_JOBS_KEPT:
+                self._jobs.popitem(last=False)
+            self._pending = (job, usb, panel)
+            self._ensure_worker()
+            self._cond.notify()
+            return dict(job)
+
+    def get_job(self, job_id):
+        with self._cond:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def wait_idle(self, timeout=None):
+        """Block until no job is queued or running."""
+        with self._cond:
+            return self._cond.wait_for(
+                lambda: self._pending is None
+                and all(j["status"] not in ("queued", "running") for j in self._jobs.values()),
+                timeout)
+
+    def _ensure_worker(self):
+        if self._worker is None or not self._worker.is_alive():
+            self._worker = threading.Thread(target=self._work, name="display-worker", daemon=True)
+            self._worker.start()
+
+    def _work(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._pending is not None)
+                (job, usb, panel), self._pending = self._pending, None
+                job["status"] = "running"
+            try:
+                methods = self._apply(usb, panel)
+                status, error = "done", None
+            except Exception as e:  # keep the worker alive whatever a tool does
+                methods, status, error = {}, "failed", str(e)
+            with self._cond:
+                job.update(methods=methods, status=status, error=error)
+                self._cond.notify_all()
+
+    def _apply(self, usb, panel):
+        """usb: True/False to switch USB power, None to leave it; panel: backlight on/off."""
+        results = {}
+        if usb:
+            # Restore USB power first (so screen has power before we set backlight)
+            results["uhubctl"] = self._usb_power(True)
+            if results["uhubctl"]:
+                self._sleep(SCREEN_POWER_UP_S)
+        results.update(self.display_power(panel))
+        if usb is False:
+            results["uhubctl"] = self._usb_power(False)
+        return results
+
+    # ─── Methods ───
+
+    def _call(self, args, timeout, env=None):
+        self._run(args, capture_output=True, timeout=timeout, env=env)
+
+    def display_power(self, on):
+        """Turn RPi display on/off using every available method."""
+        results = {}
+        env = {**os.environ, "DISPLAY": os.environ.get("DISPLAY", ":0")}
+
+        # 1) sysfs brightness
+        if self.brightness_path:
+            try:
+                with open(self.brightness_path, "w") as f:
+                    f.write(str(self.max_brightness if on else 0))
+                results["brightness"] = True
+            except OSError as e:
+                results["brightness"] = str(e)
+
+        # 2) sysfs bl_power (0 = on, 1 = off on most panels)
+        if self.bl_power_path:
+            try:
+                with open(self.bl_power_path, "w") as f:
+                    f.write("0" if on else "1")
+                results["bl_power"] = True
+            except OSError as e:
+                results["bl_power"] = str(e)
+
+        # 3) vcgencmd display_power (works for DSI & HDMI on RPi)
+        if self.tools["vcgencmd"]:
+            try:
+                self._call([self.tools["vcgencmd"], "display_power", "1" if on else "0"], 5, env)
+                results["vcgencmd"] = True
+            except (OSError, subprocess.TimeoutExpired):
+                results["vcgencmd"] = False
+
+        # 4) xset dpms (X11)
+        if self.tools["xset"]:
+            try:
+                self._call([self.tools["xset"], "dpms", "force", "on" if on else "off"], 5, env)
+                results["xset"] = True
+            except (OSError, subprocess.TimeoutExpired):
+                results["xset"] = False
+
+        return results
+
+    def _usb_power(self, on):
+        """Switch USB power with uhubctl (port 2, then all ports as a fallback)."""
+        uhubctl = self.tools["uhubctl"]
+        if not uhubctl:
+            return False
+        state = "on" if on else "off"
+        for args in ([uhubctl, "-a", state, "-p", "2"], [uhubctl, "-a", state]):
+            try:
+                self._call(args, 10)
+                return True
+            except (OSError, subprocess.TimeoutExpired):
+                continue
+        return False
@@ -0,0 +1,127 @@
+"""Server-Sent Events push channel for the kiosk displays.
+
+Displays keep one /api/events stream open and refetch tasks when they get a
+"tasks" (data changed) or "day" (midnight rollover) event. Streams follow one
+board and only wake for its changes. The event id is "<board data_version>-
+<date>", so a client reconnecting with Last-Event-ID — even after a server
+restart — is told immediately if it missed anything.
+
+Streams end after SSE_MAX_STREAM_S and the browser reconnects on its own, so
+no worker thread is held by one client forever; above SSE_MAX_CLIENTS the
+endpoint answers 503 and the dashboard falls back to polling.
+"""
+import os
+import threading
+import time
+from datetime import date, datetime, timedelta
+
+from database import add_change_listener, get_data_version, release_db, DEFAULT_BOARD_ID
+
+SSE_MAX_CLIENTS = int(os.environ.get("DASHBOARD_SSE_MAX_CLIENTS", "8"))
+SSE_MAX_STREAM_S = int(os.environ.get("DASHBOARD_SSE_MAX_STREAM_S", "300"))
+SSE_KEEPALIVE_S = 15
+SSE_RETRY_MS = 3000
+
+
+class EventBroker:
+    """Wakes waiting streams whenever task data of their board changes."""
+
+    def __init__(self, max_clients):
+        self.max_clients = max_clients
+        self._cond = threading.Condition()
+        self._all = 0          # publishes concerning every board
+        self._boards = {}      # board_id -> publishes concerning that board
+        self._clients = 0
+
+    def publish(self, board_id=None):
+        """Announce a change of one board (None: every board)."""
+        with self._cond:
+            if board_id is None:
+                self._all += 1
+            else:
+                self._boards[board_id] = self._boards.get(board_id, 0) + 1
+            self._cond.notify_all()
+
+    def _generation(self, board_id):
+        return self._all, self._boards.get(board_id, 0)
+
+    def generation(self, board_id):
+        with self._cond:
+            return self._generation(board_id)
+
+    def wait(self, board_id, generation, timeout):
+        """Block until the board moves past `generation` or timeout; return the new one.
+
+        Streams of other boards are woken too but go straight back to sleep.
+        """
+        with self._cond:
+            self._cond.wait_for(lambda: self._generation(board_id) != generation, timeout)
+            return self._generation(board_id)
+
+    def try_register(self):
+        with self._cond:
+            if self._clients >= self.max_clients:
+                return False
+            self._clients += 1
+            return True
+
+    def unregister(self):
+        with self._cond:
+            self._clients -= 1
+
+    @property
+    def clients(self):
+        with self._cond:
+            return self._clients
+
+
+broker = EventBroker(SSE_MAX_CLIENTS)
+add_change_listener(broker.publish)
+
+
+def _state_id(board_id):
+    return f"{get_data_version(board_id)}-{date.today().isoformat()}"
+
+
+def _seconds_to_midnight():
+    now = datetime.now()
+    midnight = datetime.combine(now.date() + timedelta(days=1), datetime.min.time())
+    return (midnight - now).total_seconds()
+
+
+def _event(name, event_id):
+    return f"event: {name}\nid: {event_id}\ndata: {event_id}\n\n"
+
+
+def stream_events(last_event_id=None, board_id=DEFAULT_BOARD_ID):
+    """Generator of SSE frames about one board for one registered client."""
+    try:
+        deadline = time.monotonic() + SSE_MAX_STREAM_S
+        generation = broker.generation(board_id)
+        state = _state_id(board_id)
+        yield f"retry: {SSE_RETRY_MS}\n\n"
+        if last_event_id and last_event_id != state:
+            yield _event("tasks", state)  # missed changes while disconnected
+        else:
+            yield f"id: {state}\n\n"
+        release_db()  # don't hold a pooled connection while idle
+
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return  # browser reconnects with Last-Event-ID
+            timeout = min(SSE_KEEPALIVE_S, remaining, _seconds_to_midnight() + 0.5)
+            new_generation = broker.wait(board_id, generation, timeout)
+            if new_generation == generation and state.endswith(date.today().isoformat()):
+                yield ": keepalive\n\n"
+                continue
+            generation = new_generation
+            new_state = _state_id(board_id)
+            release_db()
+            if new_state == state:
+                continue
+            day_changed = new_state.split("-", 1)[1] != state.split("-", 1)[1]
+            state = new_state
+            yield _event("day" if day_changed else "tasks", state)
+    finally:
+        release_db()
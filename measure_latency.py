@@ -0,0 +1,53 @@
+"""Measure API request latency through the Flask test client.
+
+Run it on two commits (e.g. before/after a database change) against the same
+database copy and compare the output:
+
+    python3 measure_latency.py --db /tmp/kopia.db --requests 200
+"""
+import argparse
+import statistics
+import time
+
+import database
+
+
+ENDPOINTS = ["/api/tasks/today", "/api/tasks"]
+
+
+def measure(client, url, n):
+    timings = []
+    for _ in range(n):
+        t0 = time.perf_counter()
+        resp = client.get(url)
+        timings.append((time.perf_counter() - t0) * 1000)
+        assert resp.status_code in (200, 304), resp.status_code
+    timings.sort()
+    return {
+        "p50_ms": round(statistics.median(timings), 3),
+        "p95_ms": round(timings[int(len(timings) * 0.95) - 1], 3),
+        "mean_ms": round(statistics.fmean(timings), 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--db", help="database file to use (default: zadania.db)")
+    parser.add_argument("--requests", type=int, default=200, help="requests per endpoint")
+    parser.add_argument("--board", help="board slug (default: the unprefixed routes)")
+    args = parser.parse_args()
+
+    if args.db:
+        database.DB_PATH = args.db
+    from app import app  # imported after DB_PATH is set
+
+    database.init_db()
+    client = app.test_client()
+    prefix = f"/b/{args.board}" if args.board else ""
+    for url in (prefix + endpoint for endpoint in ENDPOINTS):
+        client.get(url)  # warm-up
+        print(f"{url:<20} {measure(client, url, args.requests)}")
+
+
+if __name__ == "__main__":
+    main()
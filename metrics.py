@@ -0,0 +1,232 @@
+"""Request timing, SQL query accounting and Prometheus metrics.
+
+Enabled with DASHBOARD_METRICS=1. When disabled nothing is installed: no
+connection subclass, no trace callback and no request hooks, so the cost is
+a single flag check at startup.
+
+Per request it records latency, the number of SQL statements (via the
+SQLite trace callback), time spent executing/fetching and rows returned.
+API responses get a Server-Timing header and /metrics exposes everything in
+the Prometheus text format, including time spent in display-control
+subprocesses.
+"""
+import os
+import sqlite3
+import subprocess
+import threading
+import time
+
+import database
+
+METRICS_ENABLED = os.environ.get("DASHBOARD_METRICS", "0") == "1"
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+ROW_BUCKETS = (0, 1, 10, 100, 1000, 10000, 100000)
+
+
+# ─── Minimal Prometheus primitives ───
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names, values):
+    if not names:
+        return ""
+    return "{" + ",".join(f'{n}="{_escape(v)}"' for n, v in zip(names, values)) + "}"
+
+
+class Counter:
+    def __init__(self, name, help_text, labelnames=()):
+        self.name, self.help, self.labelnames = name, help_text, labelnames
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labels=(), amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for labels, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {value}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, help_text, buckets, labelnames=()):
+        self.name, self.help, self.labelnames = name, help_text, labelnames
+        self.buckets = tuple(buckets)
+        self._series = {}  # labels -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value, labels=()):
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        names = self.labelnames + ("le",)
+        with self._lock:
+            for labels, series in sorted(self._series.items()):
+                for bound, count in zip(self.buckets, series):
+                    lines.append(f"{self.name}_bucket{_format_labels(names, labels + (bound,))} {count}")
+                lines.append(f"{self.name}_bucket{_format_labels(names, labels + ('+Inf',))} {series[-1]}")
+                label_str = _format_labels(self.labelnames, labels)
+                lines.append(f"{self.name}_sum{label_str} {series[-2]}")
+                lines.append(f"{self.name}_count{label_str} {series[-1]}")
+        return lines
+
+
+REQUESTS = Counter("dashboard_http_requests_total", "HTTP requests",
+                   ("route", "method", "status"))
+REQUEST_SECONDS = Histogram("dashboard_http_request_duration_seconds", "Request latency",
+                            LATENCY_BUCKETS, ("route",))
+QUERIES = Histogram("dashboard_db_queries_per_request", "SQL statements per request",
+                    COUNT_BUCKETS, ("route",))
+ROWS = Histogram("dashboard_db_rows_per_request", "Rows returned to Python per request",
+                 ROW_BUCKETS, ("route",))
+DB_SECONDS = Counter("dashboard_db_seconds_total", "Time spent executing and fetching SQL",
+                     ("route",))
+SUBPROCESS_SECONDS = Histogram("dashboard_display_subprocess_seconds",
+                               "Display-control subprocess run time", LATENCY_BUCKETS, ("tool",))
+ALL_METRICS = [REQUESTS, REQUEST_SECONDS, QUERIES, ROWS, DB_SECONDS, SUBPROCESS_SECONDS]
+
+
+def render_prometheus():
+    lines = []
+    for metric in ALL_METRICS:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+# ─── SQL accounting ───
+
+_local = threading.local()
+
+
+def _stats():
+    return getattr(_local, "stats", None)
+
+
+def _on_statement(_sql):
+    stats = _stats()
+    if stats is not None:
+        stats["queries"] += 1
+
+
+class _Timed:
+    __slots__ = ("stats", "start")
+
+    def __enter__(self):
+        self.stats = _stats()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        if self.stats is not None:
+            self.stats["db_time"] += time.perf_counter() - self.start
+
+
+class InstrumentedCursor(sqlite3.Cursor):
+    """Times fetches (SQLite steps lazily) and counts rows handed to Python."""
+
+    def _rows(self, n):
+        stats = _stats()
+        if stats is not None:
+            stats["rows"] += n
+
+    def fetchone(self):
+        with _Timed():
+            row = super().fetchone()
+        self._rows(row is not None)
+        return row
+
+    def fetchmany(self, size=None):
+        with _Timed():
+            rows = super().fetchmany(self.arraysize if size is None else size)
+        self._rows(len(rows))
+        return rows
+
+    def fetchall(self):
+        with _Timed():
+            rows = super().fetchall()
+        self._rows(len(rows))
+        return rows
+
+    def __next__(self):
+        with _Timed():
+            row = super().__next__()
+        self._rows(1)
+        return row
+
+
+class InstrumentedConnection(sqlite3.Connection):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.set_trace_callback(_on_statement)
+
+    def cursor(self, factory=InstrumentedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        with _Timed():
+            return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        with _Timed():
+            return self.cursor().executemany(sql, seq_of_parameters)
+
+
+# ─── Subprocess timing (display control) ───
+
+def timed_run(args, **kwargs):
+    """subprocess.run that records its duration per tool."""
+    start = time.perf_counter()
+    try:
+        return subprocess.run(args, **kwargs)
+    finally:
+        SUBPROCESS_SECONDS.observe(time.perf_counter() - start, (os.path.basename(args[0]),))
+
+
+# ─── Flask wiring ───
+
+def install(app):
+    """Instrument database connections and every request of `app`."""
+    from flask import request
+
+    database.set_connection_factory(InstrumentedConnection)
+
+    @app.before_request
+    def _start_request_stats():
+        _local.stats = {"start": time.perf_counter(), "queries": 0, "db_time": 0.0, "rows": 0}
+
+    @app.after_request
+    def _finish_request_stats(response):
+        stats = _stats()
+        if stats is None:
+            return response
+        _local.stats = None
+        elapsed = time.perf_counter() - stats["start"]
+        route = request.url_rule.rule if request.url_rule else "unmatched"
+        REQUESTS.inc((route, request.method, str(response.status_code)))
+        REQUEST_SECONDS.observe(elapsed, (route,))
+        QUERIES.observe(stats["queries"], (route,))
+        ROWS.observe(stats["rows"], (route,))
+        DB_SECONDS.inc((route,), stats["db_time"])
+        if request.path.startswith("/api/"):
+            response.headers["Server-Timing"] = (
+                f'app;dur={elapsed * 1000:.2f}, '
+                f'db;dur={stats["db_time"] * 1000:.2f};desc="{stats["queries"]} queries, '
+                f'{stats["rows"]} rows"'
+            )
+        return response
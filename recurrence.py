@@ -0,0 +1,206 @@
+"""Compiled recurrence rules.
+
+A task's recurrence columns are parsed and validated once, when the task is
+written, into a normalized form: canonical recurrence_days, an integer
+weekday_mask (bit 0 = Monday) and recurrence_nth. Evaluating a rule against a
+date is then constant time — no string splitting on the hot path.
+
+Rule kinds (recurrence_type):
+    days, weeks, months   every N days / weeks / months after the last completion
+    weekdays              every Nth selected weekday (N = 1: each selected day)
+    month_end             last day of the month, every N months
+    nth_weekday           nth (1-4, or -1 = last) given weekday of the month, every N months
+"""
+import calendar
+from collections import namedtuple
+from datetime import date, timedelta
+
+# Monday=0 .. Sunday=6  (Python weekday convention)
+WEEKDAY_NAMES = ["mon", "tue", "wed", "thu", "fri", "sat", "sun"]
+KINDS = ("days", "weeks", "months", "weekdays", "month_end", "nth_weekday")
+MONTHLY_KINDS = ("months", "month_end", "nth_weekday")
+
+Rule = namedtuple("Rule", "kind interval mask nth")
+
+# _NEXT_MATCH[mask][weekday]: days from a day with that weekday to the next
+# selected weekday strictly after it (0 when the mask is empty)
+_NEXT_MATCH = [[next((k for k in range(1, 8) if m >> ((wd + k) % 7) & 1), 0)
+                for wd in range(7)] for m in range(128)]
+_POPCOUNT = [bin(m).count("1") for m in range(128)]
+
+
+def weekday_mask(days):
+    """'mon,wed' -> 0b101; unknown codes raise ValueError."""
+    if days is not None and not isinstance(days, str):
+        raise ValueError("recurrence_days must be a string like 'mon,wed'")
+    mask = 0
+    for code in (days or "").split(","):
+        code = code.strip().lower()
+        if not code:
+            continue
+        if code not in WEEKDAY_NAMES:
+            raise ValueError(f"Unknown weekday: {code}")
+        mask |= 1 << WEEKDAY_NAMES.index(code)
+    return mask
+
+
+def mask_to_days(mask):
+    """0b101 -> 'mon,wed' (canonical order)."""
+    return ",".join(name for i, name in enumerate(WEEKDAY_NAMES) if mask >> i & 1)
+
+
+def parse_rule(kind, value=None, days=None, nth=None):
+    """Validate user input and return the normalized Rule (ValueError if invalid)."""
+    if kind not in KINDS:
+        raise ValueError(f"Unknown recurrence type: {kind}")
+    try:
+        interval = int(value) if value not in (None, "") else 1
+    except (TypeError, ValueError):
+        raise ValueError("recurrence_value must be a whole number") from None
+    if interval < 1:
+        raise ValueError("recurrence_value must be at least 1")
+
+    mask = weekday_mask(days) if kind in ("weekdays", "nth_weekday") else 0
+    if kind == "weekdays" and not mask:
+        raise ValueError("Select at least one weekday")
+    if kind == "nth_weekday":
+        if _POPCOUNT[mask] != 1:
+            raise ValueError("nth_weekday needs exactly one weekday")
+        try:
+            nth = int(nth)
+        except (TypeError, ValueError):
+            raise ValueError("recurrence_nth must be 1-4 or -1 (last)") from None
+        if nth not in (1, 2, 3, 4, -1):
+            raise ValueError("recurrence_nth must be 1-4 or -1 (last)")
+    else:
+        nth = None
+    return Rule(kind, interval, mask, nth)
+
+
+def rule_columns(rule):
+    """Column values storing a normalized rule."""
+    return {
+        "recurrence_type": rule.kind,
+        "recurrence_value": rule.interval,
+        "recurrence_days": mask_to_days(rule.mask) or None,
+        "weekday_mask": rule.mask,
+        "recurrence_nth": rule.nth,
+    }
+
+
+def rule_from_task(task):
+    """Rule of a stored task row/dict without re-validating (None if not recurring).
+
+    Rows written before weekday_mask existed fall back to parsing
+    recurrence_days; unknown codes there are ignored, as they always were.
+    """
+    if not task.get("is_recurring"):
+        return None
+    kind = task.get("recurrence_type")
+    mask = task.get("weekday_mask") or 0
+    if not mask and kind in ("weekdays", "nth_weekday") and task.get("recurrence_days"):
+        for code in task["recurrence_days"].split(","):
+            code = code.strip().lower()
+            if code in WEEKDAY_NAMES:
+                mask |= 1 << WEEKDAY_NAMES.index(code)
+    # weekday rules written before intervals existed carry a stale value
+    interval = task.get("recurrence_value") or 1
+    if kind == "weekdays" and task.get("weekday_mask") is None:
+        interval = 1
+    return Rule(kind, interval, mask, task.get("recurrence_nth"))
+
+
+# ─── Date arithmetic ───
+
+def _month_index(d):
+    return d.year * 12 + d.month - 1
+
+
+def _month_end(index):
+    year, month = divmod(index, 12)
+    return date(year, month + 1, calendar.monthrange(year, month + 1)[1])
+
+
+def _nth_weekday(index, weekday, nth):
+    """nth (1-4, -1 = last) `weekday` of the month with the given index."""
+    year, month = divmod(index, 12)
+    month += 1
+    if nth == -1:
+        last = date(year, month, calendar.monthrange(year, month)[1])
+        return last - timedelta(days=(last.weekday() - weekday) % 7)
+    first = date(year, month, 1)
+    return first + timedelta(days=(weekday - first.weekday()) % 7 + 7 * (nth - 1))
+
+
+def add_months(d, months):
+    """Same day `months` later, clamped to the end of a shorter month."""
+    year, month = divmod(_month_index(d) + months, 12)
+    return date(year, month + 1, min(d.day, calendar.monthrange(year, month + 1)[1]))
+
+
+def shows_on(rule, day):
+    """Weekday rules only show on selected weekdays; everything else whenever due."""
+    if rule is None or rule.kind != "weekdays":
+        return True
+    return bool(rule.mask >> day.weekday() & 1)
+
+
+def next_due(rule, last_date):
+    """First date the task is due again after being done on last_date (None = never)."""
+    kind, n = rule.kind, rule.interval
+    if kind == "days":
+        return last_date + timedelta(days=n)
+    if kind == "weeks":
+        return last_date + timedelta(weeks=n)
+    if kind == "months":
+        return add_months(last_date, n)
+    if kind == "weekdays":
+        per_week = _POPCOUNT[rule.mask]
+        if not per_week:
+            return None
+        weeks, rest = divmod(n - 1, per_week)
+        day = last_date + timedelta(weeks=weeks)
+        for _ in range(rest + 1):  # at most 7 steps
+            day += timedelta(days=_NEXT_MATCH[rule.mask][day.weekday()])
+        return day
+    # Calendar rules: N months after the latest occurrence on or before last_date
+    if kind == "month_end":
+        index = _month_index(last_date)
+        if last_date < _month_end(index):
+            index -= 1
+        return _month_end(index + n)
+    if kind == "nth_weekday":
+        if not rule.mask:
+            return None
+        weekday = rule.mask.bit_length() - 1  # the single selected weekday
+        index = _month_index(last_date)
+        if last_date < _nth_weekday(index, weekday, rule.nth):
+            index -= 1
+        return _nth_weekday(index + n, weekday, rule.nth)
+    return last_date + timedelta(days=1)
+
+
+def first_on_or_after(rule, day):
+    """First day >= `day` on which a weekday rule shows (day itself otherwise)."""
+    if rule.kind != "weekdays" or not rule.mask or rule.mask >> day.weekday() & 1:
+        return day
+    return day + timedelta(days=_NEXT_MATCH[rule.mask][day.weekday()])
+
+
+def max_gap_days(rule):
+    """Largest gap in days between completions that keeps a streak going."""
+    if rule is None:
+        return 1
+    kind, n = rule.kind, rule.interval
+    if kind == "days":
+        return n
+    if kind == "weeks":
+        return n * 7
+    if kind in ("months", "month_end"):
+        return n * 31
+    if kind == "nth_weekday":
+        return n * 35
+    if kind == "weekdays":
+        per_week = _POPCOUNT[rule.mask] or 1
+        return 7 * -(-n // per_week)
+    return 1
@@ -0,0 +1,94 @@
+"""Periodic compaction of old completions (see database.compact_completions).
+
+The web server runs RetentionWorker in a background thread; this file can
+also be run by hand:
+
+    python3 retention.py                        # one pass with the configured policy
+    python3 retention.py --days 180 --period week
+    python3 retention.py --vacuum               # one-time: enable incremental_vacuum
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+
+import database
+
+RETENTION_INTERVAL_S = int(os.environ.get("DASHBOARD_RETENTION_INTERVAL_S", str(6 * 3600)))
+RETENTION_FIRST_RUN_S = 60  # stay out of the way while the kiosk starts up
+
+
+class RetentionWorker:
+    def __init__(self, interval=RETENTION_INTERVAL_S, first_run=RETENTION_FIRST_RUN_S,
+                 compact=database.compact_completions):
+        self.interval = interval
+        self.first_run = first_run
+        self._compact = compact
+        self._stop = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+        self._status = {"runs": 0, "last_run_at": None, "last_result": None, "last_error": None}
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._work, name="retention-worker", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def status(self):
+        with self._lock:
+            return {**self._status, "interval_s": self.interval,
+                    "retention_days": database.RETENTION_DAYS,
+                    "period": database.ROLLUP_PERIOD}
+
+    def run_once(self):
+        try:
+            result, error = self._compact(), None
+        except Exception as e:  # keep the worker alive, report on the next status()
+            result, error = None, str(e)
+        finally:
+            database.release_db()
+        with self._lock:
+            self._status.update(runs=self._status["runs"] + 1,
+                                last_run_at=time.strftime("%Y-%m-%d %H:%M:%S"),
+                                last_result=result, last_error=error)
+
+    def _work(self):
+        delay = self.first_run
+        while not self._stop.wait(delay):
+            self.run_once()
+            delay = self.interval
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Kompaktowanie starej historii wykonań")
+    parser.add_argument("--db", help="database file (default: zadania.db)")
+    parser.add_argument("--days", type=int, default=database.RETENTION_DAYS,
+                        help="keep raw completions this many days (0 = keep all)")
+    parser.add_argument("--period", choices=("day", "week"), default=database.ROLLUP_PERIOD)
+    parser.add_argument("--vacuum", action="store_true",
+                        help="rebuild the file once so freed pages can be reclaimed incrementally")
+    args = parser.parse_args()
+
+    if args.db:
+        database.DB_PATH = args.db
+    database.init_db()
+    conn = database.get_db()
+    if args.vacuum and conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+        conn.execute("VACUUM")  # picks up auto_vacuum=INCREMENTAL set on connect
+
+    result = database.compact_completions(args.days, args.period)
+    print(f"Zwinięto {result['rolled_up']} wykonań w {result['batches']} partiach, "
+          f"zwolniono {result['freed_pages']} stron", file=sys.stderr)
+    if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+        print("Uwaga: plik bazy nie ma auto_vacuum=INCREMENTAL – uruchom raz z --vacuum",
+              file=sys.stderr)
+    database.close_all_db()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""Production entry point: the dashboard on waitress (threaded, pure-Python WSGI).
+
+    python3 serve.py
+
+The database is initialised before the socket is opened, so once the port
+answers /healthz the app is ready. Every open event stream (/api/events)
+occupies one worker thread, hence the default of SSE_MAX_CLIENTS + 4.
+
+Without waitress installed (an old venv that predates requirements.txt) the
+kiosk still comes up on Flask's threaded development server, with a warning.
+"""
+import os
+import sys
+
+try:
+    from waitress import serve
+except ImportError:
+    serve = None
+
+from app import app, startup
+from events import SSE_MAX_CLIENTS
+
+HOST = os.environ.get("DASHBOARD_HOST", "0.0.0.0")
+PORT = int(os.environ.get("DASHBOARD_PORT", "5000"))
+THREADS = int(os.environ.get("DASHBOARD_THREADS", str(SSE_MAX_CLIENTS + 4)))
+# Idle keep-alive connections (and clients stalling mid-request) are closed after this
+CHANNEL_TIMEOUT_S = int(os.environ.get("DASHBOARD_CHANNEL_TIMEOUT_S", "30"))
+CONNECTION_LIMIT = int(os.environ.get("DASHBOARD_CONNECTION_LIMIT", "100"))
+
+
+def main():
+    startup()
+    if serve is None:
+        print("⚠  Brak pakietu waitress – uruchamiam serwer deweloperski Flaska. "
+              "Zainstaluj: pip install -r requirements.txt", file=sys.stderr)
+        app.run(host=HOST, port=PORT, threaded=True, debug=False)
+        return
+    serve(app, host=HOST, port=PORT, threads=THREADS,
+          channel_timeout=CHANNEL_TIMEOUT_S, connection_limit=CONNECTION_LIMIT,
+          ident="dashboard")
+
+
+if __name__ == "__main__":
+    main()
@@ -10,6 +10,7 @@ VENV_DIR="$SCRIPT_DIR/venv"
 KIOSK_PROFILE="$SCRIPT_DIR/.chromium-kiosk"
 SERVER_PORT=5000
 DASHBOARD_URL="http://localhost:${SERVER_PORT}/"
+HEALTH_URL="http://localhost:${SERVER_PORT}/healthz"  # 200 dopiero gdy baza gotowa
 
 # ─── Blokada wielu instancji (flock) ───
 LOCKFILE="/tmp/dashboard-kiosk.lock"
@@ -26,7 +27,7 @@ if [ ! -d "$VENV_DIR" ]; then
     exit 1
 fi
 
-echo "▶ Uruchamianie serwera Flask..."
+echo "▶ Uruchamianie serwera (waitress, bez niego serwer Flaska)..."
 cd "$SCRIPT_DIR"
 
 # Przy starcie systemu poczekaj na stabilizację (sieć, ekran, usługi)
@@ -36,7 +37,7 @@ if [ "$(cat /proc/uptime | cut -d. -f1)" -lt 60 ] 2>/dev/null; then
 fi
 
 # Zabij poprzednie instancje serwera
-pkill -f "python.*app.py" 2>/dev/null || true
+pkill -f "python.*(app|serve)\.py" 2>/dev/null || true
 
 # Zabij KAŻDĄ instancję Chromium — inaczej nowy --kiosk
 # otworzy URL w istniejącej sesji i natychmiast zakończy proces
@@ -46,7 +47,7 @@ pkill -f chromium 2>/dev/null || true
 sleep 3
 
 # Uruchom serwer z venv Python
-"$VENV_DIR/bin/python" app.py &
+"$VENV_DIR/bin/python" serve.py &
 SERVER_PID=$!
 echo "  Serwer PID: $SERVER_PID"
 
@@ -54,7 +55,7 @@ echo "  Serwer PID: $SERVER_PID"
 echo "  Czekam na serwer..."
 SERVER_READY=0
 for i in $(seq 1 60); do
-    if curl -s -o /dev/null -w '' "http://localhost:${SERVER_PORT}/" 2>/dev/null; then
+    if curl -fs -o /dev/null "$HEALTH_URL" 2>/dev/null; then
         echo "  Serwer gotowy! (po ${i}s)"
         SERVER_READY=1
         break
@@ -66,12 +67,12 @@ if [ "$SERVER_READY" -eq 0 ]; then
     echo "⚠  Serwer nie odpowiada po 60s. Sprawdzam czy proces żyje..."
     if ! kill -0 $SERVER_PID 2>/dev/null; then
         echo "✖  Proces serwera nie żyje. Próbuję ponownie..."
-        "$VENV_DIR/bin/python" app.py &
+        "$VENV_DIR/bin/python" serve.py &
         SERVER_PID=$!
     fi
     # Czekaj kolejne 60s
     for i in $(seq 1 60); do
-        if curl -s -o /dev/null -w '' "http://localhost:${SERVER_PORT}/" 2>/dev/null; then
+        if curl -fs -o /dev/null "$HEALTH_URL" 2>/dev/null; then
             echo "  Serwer gotowy! (po dodatkowych ${i}s)"
             SERVER_READY=1
             break
@@ -84,7 +85,7 @@ if [ "$SERVER_READY" -eq 0 ]; then
     echo "✖  Serwer nie odpowiada po 120s. Restartuję..."
     kill $SERVER_PID 2>/dev/null || true
     sleep 2
-    "$VENV_DIR/bin/python" app.py &
+    "$VENV_DIR/bin/python" serve.py &
     SERVER_PID=$!
     sleep 5
 fi
@@ -7,22 +7,36 @@
 
     let currentFilter = "all";
     let allTasks = [];
+    let tasksEtag = null;
+    let changeSeq = null;     // last change-log position allTasks reflects
+    let searchResults = null; // server-side search hits, null when the search box is empty
+    let searchController = null;
+    let searchTimer = null;
+
+    const SEARCH_DEBOUNCE_MS = 200;
+    const SEARCH_LIMIT = 100;
+    // Board being edited: "" or "/b/<slug>", prefixed to every API call
+    const API_BASE = document.body.dataset.apiBase || "";
 
     const WEEKDAY_LABELS = {
         mon: "Pn", tue: "Wt", wed: "Śr", thu: "Cz", fri: "Pt", sat: "Sb", sun: "Nd"
     };
+    const NTH_LABELS = { 1: "1.", 2: "2.", 3: "3.", 4: "4.", "-1": "ost." };
+    // Recurrence types that use the weekday picker
+    const WEEKDAY_TYPES = ["weekdays", "nth_weekday"];
 
     // ─── DOM refs ───
     const addForm = document.getElementById("add-form");
     const isRecurring = document.getElementById("is-recurring");
     const recurrenceFields = document.getElementById("recurrence-fields");
     const recurrenceType = document.getElementById("recurrence-type");
-    const intervalFields = document.getElementById("interval-fields");
     const weekdayFields = document.getElementById("weekday-fields");
+    const nthFields = document.getElementById("nth-fields");
     const tasksList = document.getElementById("tasks-list");
     const editModal = document.getElementById("edit-modal");
     const editForm = document.getElementById("edit-form");
     const toast = document.getElementById("toast");
+    const searchInput = document.getElementById("task-search");
 
     // ─── Tabs ───
     document.querySelectorAll(".tab").forEach(tab => {
@@ -30,38 +44,77 @@
             document.querySelectorAll(".tab").forEach(t => t.classList.remove("active"));
             tab.classList.add("active");
             currentFilter = tab.dataset.filter;
-            renderTasks();
+            if (searchResults !== null) runSearch();
+            else renderTasks();
         });
     });
 
+    // ─── Search (server-side, FTS) ───
+    searchInput.addEventListener("input", () => {
+        clearTimeout(searchTimer);
+        searchTimer = setTimeout(runSearch, SEARCH_DEBOUNCE_MS);
+    });
+
+    async function runSearch() {
+        const q = searchInput.value.trim();
+        if (searchController) searchController.abort();
+        if (!q) {
+            searchResults = null;
+            renderTasks();
+            return;
+        }
+        searchController = new AbortController();
+        const params = new URLSearchParams({ q, limit: SEARCH_LIMIT });
+        if (currentFilter !== "all") params.set("type", currentFilter);
+        try {
+            const resp = await fetch(`${API_BASE}/api/tasks/search?${params}`, { signal: searchController.signal });
+            if (!resp.ok) throw new Error("HTTP " + resp.status);
+            searchResults = await resp.json();
+            renderTasks();
+        } catch (err) {
+            if (err.name !== "AbortError") showToast("Błąd wyszukiwania", true);
+        }
+    }
+
     // ─── Recurring checkbox toggle ───
     isRecurring.addEventListener("change", () => {
         recurrenceFields.classList.toggle("hidden", !isRecurring.checked);
     });
 
-    // ─── Recurrence type toggle (interval vs weekdays) ───
+    // ─── Recurrence type toggle (weekday picker, nth of month) ───
+    function toggleRecurrenceFields(type, weekdayEl, nthEl) {
+        weekdayEl.classList.toggle("hidden", !WEEKDAY_TYPES.includes(type));
+        nthEl.classList.toggle("hidden", type !== "nth_weekday");
+    }
+
     recurrenceType.addEventListener("change", () => {
-        const isWeekdays = recurrenceType.value === "weekdays";
-        intervalFields.classList.toggle("hidden", isWeekdays);
-        weekdayFields.classList.toggle("hidden", !isWeekdays);
+        toggleRecurrenceFields(recurrenceType.value, weekdayFields, nthFields);
     });
 
-    // ─── Weekday buttons toggle ───
-    document.querySelectorAll("#weekday-fields .weekday-btn").forEach(btn => {
-        btn.addEventListener("click", () => btn.classList.toggle("active"));
-    });
-    document.querySelectorAll("#edit-weekday-fields .weekday-btn").forEach(btn => {
-        btn.addEventListener("click", () => btn.classList.toggle("active"));
-    });
+    // ─── Weekday buttons toggle (a single day for "nth weekday of month") ───
+    function bindWeekdayButtons(container, typeSelect) {
+        container.querySelectorAll(".weekday-btn").forEach(btn => {
+            btn.addEventListener("click", () => {
+                if (typeSelect.value === "nth_weekday") {
+                    container.querySelectorAll(".weekday-btn").forEach(b => {
+                        if (b !== btn) b.classList.remove("active");
+                    });
+                }
+                btn.classList.toggle("active");
+            });
+        });
+    }
 
     // ─── Edit modal recurrence type toggle ───
     const editRecurrenceType = document.getElementById("edit-recurrence-type");
     editRecurrenceType.addEventListener("change", () => {
-        const isWeekdays = editRecurrenceType.value === "weekdays";
-        document.getElementById("edit-interval-fields").classList.toggle("hidden", isWeekdays);
-        document.getElementById("edit-weekday-fields").classList.toggle("hidden", !isWeekdays);
+        toggleRecurrenceFields(editRecurrenceType.value,
+            document.getElementById("edit-weekday-fields"), document.getElementById("edit-nth-fields"));
     });
 
+    bindWeekdayButtons(weekdayFields, recurrenceType);
+    bindWeekdayButtons(document.getElementById("edit-weekday-fields"), editRecurrenceType);
+
     // ─── Helper: get selected weekdays ───
     function getSelectedWeekdays(container) {
         return Array.from(container.querySelectorAll(".weekday-btn.active"))
@@ -79,6 +132,22 @@
         });
     }
 
+    // Recurrence fields of a create/update payload; shows a toast and returns null if incomplete
+    function recurrenceBody(type, interval, weekdayEl, nthSelect) {
+        const body = { recurrence_type: type, recurrence_value: interval };
+        if (WEEKDAY_TYPES.includes(type)) {
+            body.recurrence_days = getSelectedWeekdays(weekdayEl);
+            if (!body.recurrence_days) {
+                showToast("Wybierz przynajmniej jeden dzień tygodnia", true);
+                return null;
+            }
+        }
+        if (type === "nth_weekday") {
+            body.recurrence_nth = parseInt(nthSelect.value);
+        }
+        return body;
+    }
+
     // ─── Add task ───
     addForm.addEventListener("submit", async (e) => {
         e.preventDefault();
@@ -101,20 +170,14 @@
         };
 
         if (recurring) {
-            body.recurrence_type = recType;
-            if (recType === "weekdays") {
-                body.recurrence_days = getSelectedWeekdays(weekdayFields);
-                if (!body.recurrence_days) {
-                    showToast("Wybierz przynajmniej jeden dzień tygodnia", true);
-                    return;
-                }
-            } else {
-                body.recurrence_value = recurrenceValue;
-            }
+            const rec = recurrenceBody(recType, recurrenceValue, weekdayFields,
+                document.getElementById("recurrence-nth"));
+            if (!rec) return;
+            Object.assign(body, rec);
         }
 
         try {
-            const resp = await fetch("/api/tasks", {
+            const resp = await fetch(`${API_BASE}/api/tasks`, {
                 method: "POST",
                 headers: { "Content-Type": "application/json" },
                 body: JSON.stringify(body),
@@ -126,9 +189,8 @@
                 addForm.reset();
                 recurrenceFields.classList.add("hidden");
                 weekdayFields.querySelectorAll(".weekday-btn").forEach(b => b.classList.remove("active"));
-                intervalFields.classList.remove("hidden");
-                weekdayFields.classList.add("hidden");
-                fetchTasks();
+                toggleRecurrenceFields(recurrenceType.value, weekdayFields, nthFields);
+                syncChanges(data.seq);
             } else {
                 showToast(data.message || "Błąd", true);
             }
@@ -140,69 +202,124 @@
     // ─── Fetch tasks ───
     async function fetchTasks() {
         try {
-            const resp = await fetch("/api/tasks");
+            const headers = tasksEtag ? { "If-None-Match": tasksEtag } : {};
+            const resp = await fetch(`${API_BASE}/api/tasks`, { headers });
+            if (resp.status === 304) return; // list unchanged
+            if (!resp.ok) throw new Error("HTTP " + resp.status);
+            tasksEtag = resp.headers.get("ETag");
+            changeSeq = parseInt(resp.headers.get("X-Change-Seq"), 10);
+            if (isNaN(changeSeq)) changeSeq = null;
             allTasks = await resp.json();
-            renderTasks();
+            if (searchResults !== null) runSearch(); // hits may have changed too
+            else renderTasks();
         } catch (err) {
+            taskRows.update([]);
             tasksList.innerHTML = '<div class="loading">Błąd ładowania</div>';
         }
     }
 
+    // ─── Apply only what changed (after our own writes) ───
+    // seq: change-log position reported by the write; nothing to fetch if
+    // the list already reflects it.
+    async function syncChanges(seq) {
+        if (changeSeq === null) return fetchTasks();
+        if (seq !== undefined && seq === changeSeq) return;
+        try {
+            const resp = await fetch(`${API_BASE}/api/tasks/changes?since=${changeSeq}`);
+            if (!resp.ok) throw new Error("HTTP " + resp.status);
+            const diff = await resp.json();
+            const byId = new Map(allTasks.map(t => [t.id, t]));
+            diff.deleted.forEach(id => byId.delete(id));
+            diff.tasks.forEach(t => byId.set(t.id, t));
+            allTasks = [...byId.values()].sort((a, b) => a.sort_order - b.sort_order || a.id - b.id);
+            changeSeq = diff.seq;
+            if (searchResults !== null) runSearch();
+            else renderTasks();
+        } catch (err) {
+            changeSeq = null;
+            tasksEtag = null;
+            fetchTasks();
+        }
+    }
+
     // ─── Render tasks ───
+    // Rows are keyed by task id and only touched when their markup changes
+    // (a move re-numbers just the rows in between).
+    const taskRows = new KeyedList(tasksList, {
+        key: row => row.task.id,
+        create: row => {
+            const el = document.createElement("div");
+            el.className = "admin-task";
+            el.dataset.taskId = row.task.id;
+            updateTaskRow(el, row);
+            return el;
+        },
+        update: updateTaskRow,
+    });
+
+    function updateTaskRow(el, row) {
+        if (el._html !== row.html) {
+            el.innerHTML = row.html;
+            el._html = row.html;
+        }
+    }
+
+    function taskRowHtml(task, posInAll) {
+        const metaText = buildMetaBadge(task);
+        const isFirst = posInAll === 0;
+        const isLast = posInAll === allTasks.length - 1;
+
+        let startInfo = "";
+        if (task.start_date) {
+            startInfo = ` · <span class="badge schedule">📅 od ${task.start_date}</span>`;
+        }
+        let endInfo = "";
+        if (task.end_date) {
+            endInfo = ` · <span class="badge schedule">🏁 do ${task.end_date}</span>`;
+        }
+
+        return `
+            <div class="admin-task-order">
+                <button class="btn-order" ${isFirst ? 'disabled' : ''} onclick="moveTask(${task.id}, 'up')" title="Przesuń wyżej">▲</button>
+                <span class="order-num order-clickable" onclick="promptPosition(${task.id}, ${posInAll + 1})" title="Kliknij aby ustawić pozycję">${posInAll + 1}</span>
+                <button class="btn-order" ${isLast ? 'disabled' : ''} onclick="moveTask(${task.id}, 'down')" title="Przesuń niżej">▼</button>
+            </div>
+            <div class="admin-task-info">
+                <div class="admin-task-title">${escHtml(task.title)}</div>
+                <div class="admin-task-meta">
+                    ${metaText}${startInfo}${endInfo}
+                    ${task.description ? ' · ' + escHtml(task.description) : ''}
+                </div>
+            </div>
+            <div class="admin-task-actions">
+                <button class="btn btn-edit" onclick="openEdit(${task.id})">Edytuj</button>
+                <button class="btn btn-danger" onclick="deleteTask(${task.id})">Usuń</button>
+            </div>
+        `;
+    }
+
     function renderTasks() {
         let filtered = allTasks;
-        if (currentFilter === "recurring") {
+        if (searchResults !== null) {
+            filtered = searchResults; // already narrowed to the tab by the server
+        } else if (currentFilter === "recurring") {
             filtered = allTasks.filter(t => t.is_recurring);
         } else if (currentFilter === "one-time") {
             filtered = allTasks.filter(t => !t.is_recurring);
         }
 
         if (filtered.length === 0) {
-            tasksList.innerHTML = '<div class="empty-state">Brak zadań w tej kategorii</div>';
+            const msg = searchResults !== null ? "Brak wyników wyszukiwania" : "Brak zadań w tej kategorii";
+            taskRows.update([]);
+            tasksList.innerHTML = `<div class="empty-state">${msg}</div>`;
             return;
         }
 
-        tasksList.innerHTML = "";
-        filtered.forEach((task, index) => {
-            const el = document.createElement("div");
-            el.className = "admin-task";
-            el.dataset.taskId = task.id;
-
-            const metaText = buildMetaBadge(task);
-
-            const posInAll = allTasks.findIndex(t => t.id === task.id);
-            const isFirst = posInAll === 0;
-            const isLast = posInAll === allTasks.length - 1;
-
-            let startInfo = "";
-            if (task.start_date) {
-                startInfo = ` · <span class="badge schedule">📅 od ${task.start_date}</span>`;
-            }
-            let endInfo = "";
-            if (task.end_date) {
-                endInfo = ` · <span class="badge schedule">🏁 do ${task.end_date}</span>`;
-            }
-
-            el.innerHTML = `
-                <div class="admin-task-order">
-                    <button class="btn-order" ${isFirst ? 'disabled' : ''} onclick="moveTask(${task.id}, 'up')" title="Przesuń wyżej">▲</button>
-                    <span class="order-num order-clickable" onclick="promptPosition(${task.id}, ${posInAll + 1})" title="Kliknij aby ustawić pozycję">${posInAll + 1}</span>
-                    <button class="btn-order" ${isLast ? 'disabled' : ''} onclick="moveTask(${task.id}, 'down')" title="Przesuń niżej">▼</button>
-                </div>
-                <div class="admin-task-info">
-                    <div class="admin-task-title">${escHtml(task.title)}</div>
-                    <div class="admin-task-meta">
-                        ${metaText}${startInfo}${endInfo}
-                        ${task.description ? ' · ' + escHtml(task.description) : ''}
-                    </div>
-                </div>
-                <div class="admin-task-actions">
-                    <button class="btn btn-edit" onclick="openEdit(${task.id})">Edytuj</button>
-                    <button class="btn btn-danger" onclick="deleteTask(${task.id})">Usuń</button>
-                </div>
-            `;
-            tasksList.appendChild(el);
-        });
+        const positions = new Map(allTasks.map((t, i) => [t.id, i]));
+        taskRows.update(filtered.map(task => {
+            const pos = positions.has(task.id) ? positions.get(task.id) : -1;
+            return { task, html: taskRowHtml(task, pos) };
+        }));
     }
 
     function buildMetaBadge(task) {
@@ -210,10 +327,19 @@
             return '<span class="badge one-time">📌 Jednorazowe</span>';
         }
         const recLabels = { days: "dni", weeks: "tyg.", months: "mies." };
+        const n = task.recurrence_value || 1;
+        const everyMonths = n > 1 ? `, co ${n} mies.` : "";
         if (task.recurrence_type === "weekdays" && task.recurrence_days) {
             const dayLabels = task.recurrence_days.split(",")
                 .map(d => WEEKDAY_LABELS[d.trim()] || d).join(", ");
-            return `<span class="badge recurring">🔄 ${dayLabels}</span>`;
+            return `<span class="badge recurring">🔄 ${dayLabels}${n > 1 ? ` (co ${n}.)` : ""}</span>`;
+        }
+        if (task.recurrence_type === "month_end") {
+            return `<span class="badge recurring">🔄 Ostatni dzień mies.${everyMonths}</span>`;
+        }
+        if (task.recurrence_type === "nth_weekday" && task.recurrence_days) {
+            const day = WEEKDAY_LABELS[task.recurrence_days] || task.recurrence_days;
+            return `<span class="badge recurring">🔄 ${NTH_LABELS[task.recurrence_nth] || ""} ${day} mies.${everyMonths}</span>`;
         }
         return `<span class="badge recurring">🔄 Co ${task.recurrence_value} ${recLabels[task.recurrence_type] || ""}</span>`;
     }
@@ -229,14 +355,14 @@
         }
         if (newPos === currentPos) return;
         try {
-            const resp = await fetch(`/api/tasks/${taskId}/position`, {
+            const resp = await fetch(`${API_BASE}/api/tasks/${taskId}/position`, {
                 method: "POST",
                 headers: { "Content-Type": "application/json" },
                 body: JSON.stringify({ position: newPos }),
             });
             if (resp.ok) {
                 showToast(`Pozycja zmieniona na ${newPos} ✓`);
-                fetchTasks();
+                syncChanges((await resp.json()).seq);
             } else {
                 showToast("Błąd zmiany pozycji", true);
             }
@@ -257,14 +383,16 @@
 
         const taskIds = allTasks.map(t => t.id);
         try {
-            await fetch("/api/tasks/reorder", {
+            const resp = await fetch(`${API_BASE}/api/tasks/reorder`, {
                 method: "POST",
                 headers: { "Content-Type": "application/json" },
                 body: JSON.stringify({ task_ids: taskIds }),
             });
             renderTasks();
+            if (resp.ok) syncChanges((await resp.json()).seq); // pick up new sort_order values
         } catch (err) {
             showToast("Błąd zmiany kolejności", true);
+            tasksEtag = null; // local list was already swapped — force a full reload
             fetchTasks();
         }
     };
@@ -273,9 +401,9 @@
     window.deleteTask = async function (taskId) {
         if (!confirm("Czy na pewno chcesz usunąć to zadanie?")) return;
         try {
-            await fetch(`/api/tasks/${taskId}`, { method: "DELETE" });
+            const resp = await fetch(`${API_BASE}/api/tasks/${taskId}`, { method: "DELETE" });
             showToast("Zadanie usunięte");
-            fetchTasks();
+            syncChanges(resp.ok ? (await resp.json()).seq : undefined);
         } catch (err) {
             showToast("Błąd", true);
         }
@@ -293,21 +421,17 @@
         document.getElementById("edit-end-date").value = task.end_date || "";
         document.getElementById("edit-recurrence-value").value = task.recurrence_value || 1;
         document.getElementById("edit-recurrence-type").value = task.recurrence_type || "days";
+        document.getElementById("edit-recurrence-nth").value = task.recurrence_nth || 1;
 
         const recFields = document.getElementById("edit-recurrence-fields");
-        const editIntervalFields = document.getElementById("edit-interval-fields");
         const editWeekdayFieldsEl = document.getElementById("edit-weekday-fields");
 
         if (task.is_recurring) {
             recFields.classList.remove("hidden");
-            if (task.recurrence_type === "weekdays") {
-                editIntervalFields.classList.add("hidden");
-                editWeekdayFieldsEl.classList.remove("hidden");
-                setSelectedWeekdays(editWeekdayFieldsEl, task.recurrence_days);
-            } else {
-                editIntervalFields.classList.remove("hidden");
-                editWeekdayFieldsEl.classList.add("hidden");
-            }
+            toggleRecurrenceFields(task.recurrence_type, editWeekdayFieldsEl,
+                document.getElementById("edit-nth-fields"));
+            setSelectedWeekdays(editWeekdayFieldsEl,
+                WEEKDAY_TYPES.includes(task.recurrence_type) ? task.recurrence_days : null);
         } else {
             recFields.classList.add("hidden");
         }
@@ -328,37 +452,32 @@
         const taskId = document.getElementById("edit-id").value;
         const recType = document.getElementById("edit-recurrence-type").value;
 
+        const rec = recurrenceBody(recType,
+            parseInt(document.getElementById("edit-recurrence-value").value) || 1,
+            document.getElementById("edit-weekday-fields"), document.getElementById("edit-recurrence-nth"));
+        if (!rec) return;
+
         const body = {
             title: document.getElementById("edit-title").value.trim(),
             description: document.getElementById("edit-description").value.trim(),
             start_date: document.getElementById("edit-start-date").value || "",
             end_date: document.getElementById("edit-end-date").value || "",
-            recurrence_type: recType,
+            ...rec,
         };
 
-        if (recType === "weekdays") {
-            const editWeekdayFieldsEl = document.getElementById("edit-weekday-fields");
-            body.recurrence_days = getSelectedWeekdays(editWeekdayFieldsEl);
-            if (!body.recurrence_days) {
-                showToast("Wybierz przynajmniej jeden dzień", true);
-                return;
-            }
-        } else {
-            body.recurrence_value = parseInt(document.getElementById("edit-recurrence-value").value) || 1;
-        }
-
         try {
-            const resp = await fetch(`/api/tasks/${taskId}`, {
+            const resp = await fetch(`${API_BASE}/api/tasks/${taskId}`, {
                 method: "PUT",
                 headers: { "Content-Type": "application/json" },
                 body: JSON.stringify(body),
             });
+            const data = await resp.json().catch(() => ({}));
             if (resp.ok) {
                 showToast("Zmiany zapisane ✓");
                 closeModal();
-                fetchTasks();
+                syncChanges(data.seq);
             } else {
-                showToast("Błąd zapisu", true);
+                showToast(data.message || "Błąd zapisu", true);
             }
         } catch (err) {
             showToast("Błąd połączenia", true);
@@ -379,7 +498,32 @@
         return div.innerHTML;
     }
 
+    // ─── Board picker (only when the server has several boards) ───
+    async function loadBoards() {
+        try {
+            const resp = await fetch("/api/boards");
+            if (!resp.ok) return;
+            const boards = await resp.json();
+            if (boards.length < 2) return;
+            const select = document.getElementById("board-select");
+            boards.forEach(b => {
+                const option = document.createElement("option");
+                option.value = b.api_base;
+                option.textContent = `${b.name} (${b.active_tasks})`;
+                option.selected = b.api_base === API_BASE;
+                select.appendChild(option);
+            });
+            select.addEventListener("change", () => {
+                window.location.href = `${select.value}/admin`;
+            });
+            document.getElementById("board-picker").classList.remove("hidden");
+        } catch (err) {
+            // Picker stays hidden; this board works without it
+        }
+    }
+
     // ─── Init ───
     fetchTasks();
+    loadBoards();
 
 })();
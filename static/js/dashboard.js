@@ -10,9 +10,17 @@
     const SLEEP_TIMEOUT_MS = 30000;      // 30 seconds
     const NIGHT_START_HOUR = 23;          // 23:00
     const NIGHT_END_HOUR = 5;             // 05:00
-    const REFRESH_INTERVAL_MS = 30000;    // Refresh tasks every 30s
+    const REFRESH_INTERVAL_MS = 30000;    // Polling fallback when event stream is down
+    const EVENTS_RETRY_MS = 60000;        // Re-open a closed event stream after 60s
     const SWIPE_THRESHOLD = 100;          // px needed to count as swipe
     const HOLD_DURATION_MS = 500;         // hold time before drag starts
+    const QUEUE_FLUSH_DELAY_MS = 400;     // gather a swipe burst into one request
+    const QUEUE_RETRY_MS = 5000;          // retry sending completions while server is down
+    const QUEUE_BATCH_MAX = 500;          // server limit per request
+    // Board of this display: "" or "/b/<slug>", prefixed to every API call
+    const API_BASE = document.body.dataset.apiBase || "";
+    // Saved state of other boards in the same browser must not mix
+    const STORAGE_SUFFIX = API_BASE ? ":" + API_BASE.slice(3) : "";
 
     // ─── DOM refs ───
     const tasksList = document.getElementById("tasks-list");
@@ -62,12 +70,12 @@
             isNightActive = true;
             nightOverlay.classList.remove("hidden");
             if (sleepTimer) clearTimeout(sleepTimer);
-            fetch("/api/screen/off", { method: "POST" }).catch(() => {});
+            fetch(`${API_BASE}/api/screen/off`, { method: "POST" }).catch(() => {});
         } else if (!isNight && isNightActive) {
             // Leaving night mode → restore screen power
             isNightActive = false;
             nightOverlay.classList.add("hidden");
-            fetch("/api/screen/on", { method: "POST" }).catch(() => {});
+            fetch(`${API_BASE}/api/screen/on`, { method: "POST" }).catch(() => {});
             // Also make sure sleep overlay is gone and timer resets
             if (isSleeping) {
                 isSleeping = false;
@@ -91,14 +99,14 @@
         isSleeping = true;
         sleepOverlay.classList.remove("hidden");
         // Turn off RPi backlight (screen goes truly dark)
-        fetch("/api/backlight/off", { method: "POST" }).catch(() => {});
+        fetch(`${API_BASE}/api/backlight/off`, { method: "POST" }).catch(() => {});
     }
 
     function wakeUp() {
         if (!isSleeping) return;
         isSleeping = false;
         // Turn on RPi backlight first
-        fetch("/api/backlight/on", { method: "POST" }).catch(() => {});
+        fetch(`${API_BASE}/api/backlight/on`, { method: "POST" }).catch(() => {});
         sleepOverlay.classList.add("hidden");
         resetSleepTimer();
     }
@@ -153,10 +161,18 @@
     // ════════════════════════════════════════════
 
     let fetchFailCount = 0;
+    let tasksEtag = null;
 
     async function fetchTasks() {
         try {
-            const resp = await fetch("/api/tasks/today");
+            const headers = tasksEtag ? { "If-None-Match": tasksEtag } : {};
+            const resp = await fetch(`${API_BASE}/api/tasks/today`, { headers });
+            if (resp.status === 304) {
+                fetchFailCount = 0;
+                return; // nothing changed since last render
+            }
+            if (!resp.ok) throw new Error("HTTP " + resp.status);
+            tasksEtag = resp.headers.get("ETag");
             tasks = applyLocalOrder(await resp.json());
             fetchFailCount = 0;
             renderTasks();
@@ -177,20 +193,38 @@
         return tasks;
     }
 
+    // Cards are keyed by task id: a refresh only inserts, removes or moves
+    // the cards that changed, so an in-progress touch is never cut off.
+    const taskList = new KeyedList(tasksList, {
+        key: task => task.id,
+        create: createTaskElement,
+        update: fillTaskElement,
+        skip: el => el.classList.contains("swiping") || el.classList.contains("dragging"),
+    });
+    let renderPending = false;
+
     function renderTasks() {
-        tasksList.innerHTML = "";
+        // Moving cards under a finger would break the drag — render when it ends
+        if (dragState.active) {
+            renderPending = true;
+            return;
+        }
+        renderPending = false;
 
+        // Swiped tasks stay hidden until the server has the completion
+        const queued = queuedTaskIds();
         const filtered = getFilteredTasks();
-        const pending = filtered.filter(t => !t.completed_today);
-        const allPending = tasks.filter(t => !t.completed_today);
+        const pending = filtered.filter(t => !t.completed_today && !queued.has(t.id));
 
         if (tasks.length === 0) {
+            taskList.update([]);
             allDone.classList.add("hidden");
             noTasks.classList.remove("hidden");
             return;
         }
 
         noTasks.classList.add("hidden");
+        taskList.update(pending);
 
         if (pending.length === 0) {
             allDone.classList.remove("hidden");
@@ -208,19 +242,32 @@
         }
 
         allDone.classList.add("hidden");
-
-        pending.forEach(task => {
-            const el = createTaskElement(task);
-            tasksList.appendChild(el);
-        });
     }
 
     function createTaskElement(task) {
         const el = document.createElement("div");
-        el.className = "task-item" +
-            (task.is_recurring ? " recurring" : " one-time") +
-            (task.completed_today ? " completed-today" : "");
         el.dataset.taskId = task.id;
+        fillTaskElement(el, task);
+        // Attach swipe + drag handling (once — the element is reused across renders)
+        attachSwipeAndDrag(el, task);
+        return el;
+    }
+
+    // Everything a card shows; the card is rebuilt only when one of these changes
+    function taskSignature(task) {
+        return JSON.stringify([task.title, task.description, task.is_recurring, task.recurrence_type,
+            task.recurrence_value, task.recurrence_days, task.recurrence_nth]);
+    }
+
+    function fillTaskElement(el, task) {
+        const signature = taskSignature(task);
+        if (el.dataset.signature === signature) return;
+        el.dataset.signature = signature;
+        // classList, not className: keep expanded / swiping / dragging state
+        el.classList.add("task-item");
+        el.classList.toggle("recurring", !!task.is_recurring);
+        el.classList.toggle("one-time", !task.is_recurring);
+        el.textContent = "";
 
         // Drag handle
         const handle = document.createElement("div");
@@ -245,10 +292,17 @@
         const badge = document.createElement("span");
         badge.className = "task-badge " + (task.is_recurring ? "recurring" : "one-time");
         if (task.is_recurring) {
+            const dayLabels = { mon: "Pn", tue: "Wt", wed: "Śr", thu: "Cz", fri: "Pt", sat: "Sb", sun: "Nd" };
+            const n = task.recurrence_value || 1;
+            const everyMonths = n > 1 ? `, co ${n} mies.` : "";
             if (task.recurrence_type === "weekdays" && task.recurrence_days) {
-                const dayLabels = { mon: "Pn", tue: "Wt", wed: "Śr", thu: "Cz", fri: "Pt", sat: "Sb", sun: "Nd" };
                 const days = task.recurrence_days.split(",").map(d => dayLabels[d.trim()] || d).join(", ");
-                badge.textContent = `🔄 ${days}`;
+                badge.textContent = `🔄 ${days}${n > 1 ? ` (co ${n}.)` : ""}`;
+            } else if (task.recurrence_type === "month_end") {
+                badge.textContent = `🔄 Ostatni dzień mies.${everyMonths}`;
+            } else if (task.recurrence_type === "nth_weekday" && task.recurrence_days) {
+                const nth = { 1: "1.", 2: "2.", 3: "3.", 4: "4.", "-1": "ost." }[task.recurrence_nth] || "";
+                badge.textContent = `🔄 ${nth} ${dayLabels[task.recurrence_days] || task.recurrence_days} mies.${everyMonths}`;
             } else {
                 const labels = { days: "dni", weeks: "tyg.", months: "mies." };
                 badge.textContent = `🔄 Co ${task.recurrence_value} ${labels[task.recurrence_type] || task.recurrence_type}`;
@@ -258,18 +312,11 @@
         }
         el.appendChild(badge);
 
-        // Swipe hint
-        if (!task.completed_today) {
-            const hint = document.createElement("div");
-            hint.className = "swipe-hint";
-            hint.textContent = "⟵";
-            el.appendChild(hint);
-
-            // Attach swipe + drag handling
-            attachSwipeAndDrag(el, task);
-        }
-
-        return el;
+        // Swipe hint (only pending tasks are rendered)
+        const hint = document.createElement("div");
+        hint.className = "swipe-hint";
+        hint.textContent = "⟵";
+        el.appendChild(hint);
     }
 
     // ════════════════════════════════════════════
@@ -327,6 +374,7 @@
                 directionDecided = true;
                 if (Math.abs(dx) > Math.abs(dy)) {
                     isSwiping = true;
+                    el.classList.add("swiping");
                     clearTimeout(dragState.holdTimer);
                 } else {
                     isScrolling = true;
@@ -367,12 +415,13 @@
             }
 
             if (isSwiping) {
+                el.classList.remove("swiping");
                 const diff = currentX - startX;
                 if (diff < -SWIPE_THRESHOLD) {
                     el.style.transition = "transform 0.3s ease, opacity 0.3s ease";
                     el.classList.add("completing");
                     completeTask(task.id);
-                    setTimeout(() => fetchTasks(), 350);
+                    setTimeout(renderTasks, 350);
                 } else {
                     el.style.transition = "transform 0.2s ease";
                     el.style.transform = "translateX(0)";
@@ -388,6 +437,7 @@
         el.addEventListener("touchcancel", () => {
             clearTimeout(dragState.holdTimer);
             if (dragState.active && dragState.el === el) cancelDrag();
+            el.classList.remove("swiping");
             el.style.transition = "transform 0.2s ease";
             el.style.transform = "translateX(0)";
         });
@@ -405,6 +455,10 @@
                 startDrag(el, e);
             }, HOLD_DURATION_MS);
 
+            // Listen on the document only while the button is down, so cards
+            // do not pile up global listeners over their lifetime
+            document.addEventListener("mousemove", onMouseMove);
+            document.addEventListener("mouseup", onMouseUp);
             e.preventDefault();
         });
 
@@ -421,6 +475,7 @@
                 directionDecided = true;
                 if (Math.abs(dx) > Math.abs(dy)) {
                     isSwiping = true;
+                    el.classList.add("swiping");
                     clearTimeout(dragState.holdTimer);
                 } else {
                     clearTimeout(dragState.holdTimer);
@@ -432,16 +487,19 @@
         };
 
         const onMouseUp = () => {
+            document.removeEventListener("mousemove", onMouseMove);
+            document.removeEventListener("mouseup", onMouseUp);
             clearTimeout(dragState.holdTimer);
             if (dragState.active && dragState.el === el) { endDrag(); return; }
             if (isSwiping) {
                 isSwiping = false;
+                el.classList.remove("swiping");
                 const diff = currentX - startX;
                 if (diff < -SWIPE_THRESHOLD) {
                     el.style.transition = "transform 0.3s ease, opacity 0.3s ease";
                     el.classList.add("completing");
                     completeTask(task.id);
-                    setTimeout(() => fetchTasks(), 350);
+                    setTimeout(renderTasks, 350);
                 } else {
                     el.style.transition = "transform 0.2s ease";
                     el.style.transform = "translateX(0)";
@@ -451,9 +509,6 @@
                 el.classList.toggle("expanded");
             }
         };
-
-        document.addEventListener("mousemove", onMouseMove);
-        document.addEventListener("mouseup", onMouseUp);
     }
 
     // ═══ Drag reorder logic ═══
@@ -530,6 +585,7 @@
         dragState.placeholder = null;
 
         saveOrder();
+        if (renderPending) renderTasks();
     }
 
     function cancelDrag() {
@@ -549,8 +605,11 @@
         dragState.active = false;
         dragState.el = null;
         dragState.placeholder = null;
+        if (renderPending) renderTasks();
     }
 
+    const ORDER_KEY = "dashboard_order" + STORAGE_SUFFIX;
+
     function saveOrder() {
         // Temporary reorder — saved in localStorage, resets daily
         const orderedIds = Array.from(tasksList.querySelectorAll(".task-item"))
@@ -559,23 +618,24 @@
 
         const today = new Date().toISOString().slice(0, 10);
         try {
-            localStorage.setItem("dashboard_order", JSON.stringify({
+            localStorage.setItem(ORDER_KEY, JSON.stringify({
                 date: today,
                 ids: orderedIds
             }));
         } catch (e) {
             console.error("Error saving temp order:", e);
         }
+        tasks = applyLocalOrder(tasks);  // later renders keep the dragged order
     }
 
     function applyLocalOrder(taskList) {
         try {
-            const raw = localStorage.getItem("dashboard_order");
+            const raw = localStorage.getItem(ORDER_KEY);
             if (!raw) return taskList;
             const stored = JSON.parse(raw);
             const today = new Date().toISOString().slice(0, 10);
             if (stored.date !== today) {
-                localStorage.removeItem("dashboard_order");
+                localStorage.removeItem(ORDER_KEY);
                 return taskList;
             }
             const orderMap = new Map();
@@ -590,14 +650,117 @@
         }
     }
 
-    async function completeTask(taskId) {
+    // ─── Completion queue ───
+    // Swipes are stored in localStorage first and sent in batches to
+    // /api/tasks/complete, so a burst costs one commit and nothing is lost
+    // while the server restarts. client_id makes resending safe.
+
+    const QUEUE_KEY = "dashboard_completion_queue" + STORAGE_SUFFIX;
+    let flushTimer = null;
+    let flushing = false;
+
+    function loadQueue() {
+        try {
+            return JSON.parse(localStorage.getItem(QUEUE_KEY)) || [];
+        } catch (e) {
+            return [];
+        }
+    }
+
+    function saveQueue(queue) {
+        localStorage.setItem(QUEUE_KEY, JSON.stringify(queue));
+    }
+
+    function queuedTaskIds() {
+        return new Set(loadQueue().map(c => c.task_id));
+    }
+
+    function newClientId() {
+        if (window.crypto && crypto.randomUUID) return crypto.randomUUID();
+        return Date.now().toString(36) + "-" + Math.random().toString(36).slice(2);
+    }
+
+    function localTimestamp(d) {
+        const p = n => String(n).padStart(2, "0");
+        return `${d.getFullYear()}-${p(d.getMonth() + 1)}-${p(d.getDate())} ` +
+            `${p(d.getHours())}:${p(d.getMinutes())}:${p(d.getSeconds())}`;
+    }
+
+    function completeTask(taskId) {
+        const queue = loadQueue();
+        queue.push({ client_id: newClientId(), task_id: taskId, completed_at: localTimestamp(new Date()) });
+        saveQueue(queue);
+        scheduleFlush(QUEUE_FLUSH_DELAY_MS);
+    }
+
+    function scheduleFlush(delay) {
+        if (flushTimer) clearTimeout(flushTimer);
+        flushTimer = setTimeout(flushQueue, delay);
+    }
+
+    async function flushQueue() {
+        flushTimer = null;
+        if (flushing) return;
+        const batch = loadQueue().slice(0, QUEUE_BATCH_MAX);
+        if (batch.length === 0) return;
+        flushing = true;
         try {
-            await fetch(`/api/tasks/${taskId}/complete`, { method: "POST" });
+            const resp = await fetch(`${API_BASE}/api/tasks/complete`, {
+                method: "POST",
+                headers: { "Content-Type": "application/json" },
+                body: JSON.stringify({ completions: batch }),
+            });
+            if (resp.status >= 500) throw new Error("HTTP " + resp.status);
+            // 4xx will not get better by retrying — drop the batch either way
+            const sent = new Set(batch.map(c => c.client_id));
+            saveQueue(loadQueue().filter(c => !sent.has(c.client_id)));
+            if (loadQueue().length > 0) scheduleFlush(0);
+            fetchTasks();
         } catch (e) {
-            console.error("Error completing task:", e);
+            console.error("Error sending completions (will retry):", e);
+            scheduleFlush(QUEUE_RETRY_MS);
+        } finally {
+            flushing = false;
         }
     }
 
+    // ════════════════════════════════════════════
+    //  Live updates (Server-Sent Events, polling fallback)
+    // ════════════════════════════════════════════
+
+    let pollTimer = null;
+
+    function startPolling() {
+        if (!pollTimer) pollTimer = setInterval(fetchTasks, REFRESH_INTERVAL_MS);
+    }
+
+    function stopPolling() {
+        if (pollTimer) clearInterval(pollTimer);
+        pollTimer = null;
+    }
+
+    function connectEvents() {
+        if (!window.EventSource) {
+            startPolling();
+            return;
+        }
+        const source = new EventSource(`${API_BASE}/api/events`);
+        source.addEventListener("open", () => {
+            stopPolling();
+            fetchTasks(); // catch up on anything missed while disconnected (cheap 304)
+            scheduleFlush(0); // server is back — send completions queued meanwhile
+        });
+        source.addEventListener("tasks", fetchTasks);
+        source.addEventListener("day", fetchTasks);
+        source.addEventListener("error", () => {
+            // Browser reconnects by itself (with Last-Event-ID) unless the stream was refused
+            startPolling();
+            if (source.readyState === EventSource.CLOSED) {
+                setTimeout(connectEvents, EVENTS_RETRY_MS);
+            }
+        });
+    }
+
     // ════════════════════════════════════════════
     //  Prevent context menu & other exits
     // ════════════════════════════════════════════
@@ -650,7 +813,8 @@
         setInterval(checkNightMode, 30000);
 
         fetchTasks();
-        setInterval(fetchTasks, REFRESH_INTERVAL_MS);
+        connectEvents();
+        scheduleFlush(0); // completions queued before a reload
 
         resetSleepTimer();
     }
@@ -0,0 +1,138 @@
+// ════════════════════════════════════════════════
+//  KeyedList – keyed DOM updates with FLIP move animations
+//  Shared by the dashboard, the admin panel and the render benchmark
+// ════════════════════════════════════════════════
+
+(function () {
+    "use strict";
+
+    const FLIP_DURATION_MS = 220;
+    const FLIP_MAX_ITEMS = 300;   // measuring every card costs more than the animation is worth
+
+    // Positions in seq (values >= 0 only) forming a longest increasing run;
+    // those nodes are already in order relative to each other and stay put.
+    function longestIncreasing(seq) {
+        const tails = [];          // tails[k]: index in seq ending the best run of length k + 1
+        const prev = new Array(seq.length).fill(-1);
+        for (let i = 0; i < seq.length; i++) {
+            if (seq[i] < 0) continue;
+            let lo = 0, hi = tails.length;
+            while (lo < hi) {
+                const mid = (lo + hi) >> 1;
+                if (seq[tails[mid]] < seq[i]) lo = mid + 1;
+                else hi = mid;
+            }
+            if (lo > 0) prev[i] = tails[lo - 1];
+            tails[lo] = i;
+        }
+        const keep = new Set();
+        for (let i = tails.length ? tails[tails.length - 1] : -1; i >= 0; i = prev[i]) keep.add(i);
+        return keep;
+    }
+
+    function prefersReducedMotion() {
+        return !!(window.matchMedia && window.matchMedia("(prefers-reduced-motion: reduce)").matches);
+    }
+
+    class KeyedList {
+        // options.key(item)        -> stable key (task id)
+        // options.create(item)     -> new element for an item
+        // options.update(el, item) -> bring an existing element up to date (optional)
+        // options.skip(el)         -> true while an element must not be animated (optional)
+        // options.animate          -> FLIP moves (default true)
+        constructor(container, options) {
+            this.container = container;
+            this.key = options.key;
+            this.create = options.create;
+            this.patch = options.update || null;
+            this.skip = options.skip || null;
+            this.animate = options.animate !== false;
+            this.els = new Map();
+        }
+
+        // Make the container hold exactly one element per item, in order.
+        // Existing elements (and their listeners, classes, touch state) are
+        // reused; only new, removed and out-of-order ones touch the DOM.
+        // Nodes the list does not own (loading/empty messages) are removed.
+        update(items) {
+            const container = this.container;
+            const animate = this.animate && items.length <= FLIP_MAX_ITEMS && !prefersReducedMotion();
+            const stats = { created: 0, removed: 0, moved: 0 };
+
+            // FLIP "first": where every card is before anything changes
+            const first = new Map();
+            if (animate) {
+                this.els.forEach(el => {
+                    if (el.isConnected) first.set(el, el.getBoundingClientRect().top);
+                });
+            }
+
+            const next = new Map();
+            const order = [];
+            for (const item of items) {
+                const key = this.key(item);
+                let el = this.els.get(key);
+                if (!el) {
+                    el = this.create(item);
+                    stats.created++;
+                } else if (this.patch) {
+                    this.patch(el, item);
+                }
+                next.set(key, el);
+                order.push(el);
+            }
+
+            this.els.forEach((el, key) => {
+                if (!next.has(key)) {
+                    el.remove();
+                    stats.removed++;
+                }
+            });
+            const owned = new Set(order);
+            Array.from(container.childNodes).forEach(node => {
+                if (!owned.has(node)) node.remove();
+            });
+
+            // Move only the elements outside the longest already-ordered run
+            const index = new Map();
+            Array.from(container.children).forEach((el, i) => index.set(el, i));
+            const keep = longestIncreasing(order.map(el => (index.has(el) ? index.get(el) : -1)));
+            let ref = null;
+            for (let i = order.length - 1; i >= 0; i--) {
+                if (!keep.has(i)) {
+                    container.insertBefore(order[i], ref);
+                    if (index.has(order[i])) stats.moved++;
+                }
+                ref = order[i];
+            }
+            this.els = next;
+
+            if (animate && first.size) this.flip(first);
+            return stats;
+        }
+
+        // FLIP: read all new positions, invert with a transform, then play
+        // back to zero — one layout for the reads, compositor-only animation.
+        flip(first) {
+            const shifted = [];
+            first.forEach((top, el) => {
+                if (!el.isConnected || (this.skip && this.skip(el))) return;
+                const dy = top - el.getBoundingClientRect().top;
+                if (Math.abs(dy) >= 1) shifted.push([el, dy]);
+            });
+            if (!shifted.length) return;
+            shifted.forEach(([el, dy]) => {
+                el.style.transition = "none";
+                el.style.transform = `translateY(${dy}px)`;
+            });
+            void this.container.offsetHeight;  // commit the inverted positions
+            shifted.forEach(([el]) => {
+                el.style.transition = `transform ${FLIP_DURATION_MS}ms ease`;
+                el.style.transform = "";
+                el.addEventListener("transitionend", () => { el.style.transition = ""; }, { once: true });
+            });
+        }
+    }
+
+    window.KeyedList = KeyedList;
+})();
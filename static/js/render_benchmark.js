@@ -0,0 +1,179 @@
+// ════════════════════════════════════════════════
+//  Render benchmark – frame times of the task list
+//  innerHTML wipe-and-rebuild vs keyed updates (KeyedList)
+// ════════════════════════════════════════════════
+
+(function () {
+    "use strict";
+
+    const FRAME_BUDGET_MS = 1000 / 60;
+
+    const tasksList = document.getElementById("tasks-list");
+    const results = document.getElementById("bench-results");
+    const status = document.getElementById("bench-status");
+    const startBtn = document.getElementById("bench-start");
+
+    // ─── Synthetic board ───
+    let nextId = 1;
+
+    function makeTask(i) {
+        const id = nextId++;
+        const recurring = i % 3 !== 0;
+        return {
+            id,
+            title: `Zadanie ${id}`,
+            description: i % 2 ? `Opis zadania ${id} – kilka słów więcej` : "",
+            is_recurring: recurring ? 1 : 0,
+            recurrence_type: recurring ? "days" : null,
+            recurrence_value: recurring ? 1 + (i % 4) : null,
+        };
+    }
+
+    // Same markup as a dashboard card
+    function buildCard(task) {
+        const el = document.createElement("div");
+        el.dataset.taskId = task.id;
+        fillCard(el, task);
+        return el;
+    }
+
+    function fillCard(el, task) {
+        const signature = JSON.stringify([task.title, task.description, task.is_recurring, task.recurrence_value]);
+        if (el.dataset.signature === signature) return;
+        el.dataset.signature = signature;
+        el.className = "task-item " + (task.is_recurring ? "recurring" : "one-time");
+        el.innerHTML = `
+            <div class="drag-handle">⠿</div>
+            <div class="task-title"></div>
+            ${task.description ? '<div class="task-desc"></div>' : ""}
+            <span class="task-badge ${task.is_recurring ? "recurring" : "one-time"}"></span>
+            <div class="swipe-hint">⟵</div>`;
+        el.querySelector(".task-title").textContent = task.title;
+        if (task.description) el.querySelector(".task-desc").textContent = task.description;
+        el.querySelector(".task-badge").textContent =
+            task.is_recurring ? `🔄 Co ${task.recurrence_value} dni` : "📌 Jednorazowe";
+    }
+
+    // ─── Strategies ───
+    function rebuildStrategy() {
+        return {
+            name: "innerHTML (przebudowa)",
+            render(tasks) {
+                tasksList.innerHTML = "";
+                tasks.forEach(t => tasksList.appendChild(buildCard(t)));
+            },
+        };
+    }
+
+    function keyedStrategy(animate) {
+        const list = new KeyedList(tasksList, {
+            key: t => t.id, create: buildCard, update: fillCard, animate,
+        });
+        return { name: animate ? "KeyedList + FLIP" : "KeyedList", render: tasks => list.update(tasks) };
+    }
+
+    // ─── Scenarios: next list from the current one (fresh objects, like a fetch) ───
+    function pick(n) {
+        return Math.floor(Math.random() * n);
+    }
+
+    const SCENARIOS = [
+        ["odświeżenie bez zmian", tasks => tasks.map(t => ({ ...t }))],
+        ["wykonanie (−1, +1 na końcu)", tasks => {
+            const next = tasks.map(t => ({ ...t }));
+            next.splice(pick(next.length), 1);
+            next.push(makeTask(next.length));
+            return next;
+        }],
+        ["przeniesienie 1 zadania", tasks => {
+            const next = tasks.map(t => ({ ...t }));
+            const [moved] = next.splice(pick(next.length), 1);
+            next.splice(pick(next.length + 1), 0, moved);
+            return next;
+        }],
+        ["edycja 1 zadania", tasks => {
+            const next = tasks.map(t => ({ ...t }));
+            const i = pick(next.length);
+            next[i].title += " ✎";
+            return next;
+        }],
+    ];
+
+    function nextFrame() {
+        return new Promise(resolve => requestAnimationFrame(resolve));
+    }
+
+    function summarize(values) {
+        const sorted = [...values].sort((a, b) => a - b);
+        const mean = values.reduce((a, b) => a + b, 0) / values.length;
+        return {
+            mean: +mean.toFixed(2),
+            p95: +sorted[Math.min(sorted.length - 1, Math.floor(sorted.length * 0.95))].toFixed(2),
+            max: +sorted[sorted.length - 1].toFixed(2),
+        };
+    }
+
+    // One update per frame: "update" is script + forced layout, "frame" is
+    // the time until the next frame starts (includes style, paint, composite).
+    async function measure(strategy, makeNext, initial, frames) {
+        let tasks = initial;
+        strategy.render(tasks);
+        await nextFrame();
+        const update = [], frame = [];
+        for (let i = 0; i < frames; i++) {
+            const next = makeNext(tasks);
+            const t0 = await nextFrame();
+            const start = performance.now();
+            strategy.render(next);
+            void tasksList.offsetHeight;
+            update.push(performance.now() - start);
+            frame.push((await nextFrame()) - t0);
+            tasks = next;
+        }
+        return {
+            update: summarize(update),
+            frame: summarize(frame),
+            dropped: frame.filter(ms => ms > FRAME_BUDGET_MS * 1.5).length,
+        };
+    }
+
+    function formatRow(cells, widths) {
+        return cells.map((c, i) => String(c).padEnd(widths[i])).join(" ");
+    }
+
+    async function run() {
+        const count = Math.max(10, parseInt(document.getElementById("bench-tasks").value) || 300);
+        const frames = Math.max(10, parseInt(document.getElementById("bench-frames").value) || 60);
+        const flip = document.getElementById("bench-flip").checked;
+        startBtn.disabled = true;
+
+        const strategies = [rebuildStrategy, () => keyedStrategy(false)];
+        if (flip) strategies.push(() => keyedStrategy(true));
+
+        const widths = [30, 26, 20, 20, 8];
+        const lines = [formatRow(["scenariusz", "metoda", "aktualizacja śr/p95", "klatka śr/p95", "zgubione"], widths)];
+        const report = { tasks: count, frames, userAgent: navigator.userAgent, results: [] };
+
+        for (const [scenario, makeNext] of SCENARIOS) {
+            nextId = 1;
+            const initial = Array.from({ length: count }, (_, i) => makeTask(i));
+            for (const makeStrategy of strategies) {
+                tasksList.innerHTML = "";
+                const strategy = makeStrategy();
+                status.textContent = `${scenario} · ${strategy.name}`;
+                const r = await measure(strategy, makeNext, initial, frames);
+                report.results.push({ scenario, method: strategy.name, ...r });
+                lines.push(formatRow([scenario, strategy.name, `${r.update.mean} / ${r.update.p95}`,
+                    `${r.frame.mean} / ${r.frame.p95}`, r.dropped], widths));
+                results.textContent = lines.join("\n");
+            }
+        }
+        results.textContent = lines.join("\n") + "\n\n" + JSON.stringify(report, null, 2);
+        results.classList.add("expanded");
+        status.textContent = "gotowe";
+        startBtn.disabled = false;
+    }
+
+    startBtn.addEventListener("click", run);
+    results.addEventListener("click", () => results.classList.toggle("expanded"));
+})();
@@ -0,0 +1,17 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database  # noqa: E402
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    """A fresh, fully migrated database in a temporary directory."""
+    monkeypatch.setattr(database, "DB_PATH", str(tmp_path / "zadania.db"))
+    database.init_db()
+    yield database
+    database.close_all_db()
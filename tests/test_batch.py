@@ -0,0 +1,74 @@
+"""apply_task_batch: malformed fields come back as per-item "invalid", nothing is written."""
+import pytest
+
+
+@pytest.mark.parametrize("sort_order", [[1], {"a": 1}, "abc", "1.5"])
+def test_bad_sort_order_is_invalid_not_error(db, sort_order):
+    first = db.add_task("Pierwsze")
+    second = db.add_task("Drugie")
+    before = db.get_db().execute("SELECT id, sort_order FROM tasks ORDER BY id").fetchall()
+
+    results = db.apply_task_batch([
+        {"op": "update", "id": first, "fields": {"title": "Zmienione"}},
+        {"op": "update", "id": second, "fields": {"sort_order": sort_order}},
+    ])
+
+    assert results[0]["status"] == "ok"
+    assert results[1]["status"] == "invalid"
+    assert results[1]["message"] == "sort_order must be a whole number"
+    conn = db.get_db()
+    assert conn.execute("SELECT id, sort_order FROM tasks ORDER BY id").fetchall() == before
+    assert conn.execute("SELECT title FROM tasks WHERE id = ?", (first,)).fetchone()[0] == "Pierwsze"
+
+
+def test_numeric_string_sort_order_is_accepted(db):
+    task = db.add_task("Zadanie")
+    assert db.apply_task_batch(
+        [{"op": "update", "id": task, "fields": {"sort_order": "7"}}])[0]["status"] == "ok"
+    assert db.get_db().execute(
+        "SELECT sort_order FROM tasks WHERE id = ?", (task,)).fetchone()[0] == 7
+
+
+BAD_FIELDS = [
+    ("recurrence_value", [1], "recurrence_value must be a whole number"),
+    ("recurrence_value", {"n": 1}, "recurrence_value must be a whole number"),
+    ("recurrence_value", "abc", "recurrence_value must be a whole number"),
+    ("recurrence_nth", [2], "recurrence_nth must be a whole number"),
+    ("recurrence_days", ["mon"], "recurrence_days must be a string"),
+    ("recurrence_type", {"kind": "days"}, "recurrence_type must be a string"),
+    ("start_date", ["2026-01-01"], "start_date must be a YYYY-MM-DD date"),
+    ("end_date", {"d": 1}, "end_date must be a YYYY-MM-DD date"),
+    ("end_date", "next week", "end_date must be a YYYY-MM-DD date"),
+    ("title", ["Tytuł"], "title must be a string"),
+    ("description", {"a": 1}, "description must be a string"),
+]
+
+
+@pytest.mark.parametrize("recurring", [False, True])
+@pytest.mark.parametrize("field, value, message", BAD_FIELDS)
+def test_bad_field_types_are_invalid_on_update(db, recurring, field, value, message):
+    kwargs = {"is_recurring": True, "recurrence_type": "days", "recurrence_value": 2} if recurring else {}
+    task = db.add_task("Zadanie", **kwargs)
+    before = dict(db.get_task(task))
+
+    results = db.apply_task_batch([{"op": "update", "id": task, "fields": {field: value}}])
+
+    assert results[0]["status"] == "invalid"
+    assert results[0]["message"] == message
+    assert db.get_task(task) == before
+    with pytest.raises(ValueError, match=message):
+        db.update_task(task, **{field: value})
+
+
+@pytest.mark.parametrize("field, value, message", BAD_FIELDS)
+def test_bad_field_types_are_invalid_on_create(db, field, value, message):
+    fields = {"title": "Nowe", "is_recurring": True, "recurrence_type": "days",
+              "recurrence_value": 1, field: value}
+
+    results = db.apply_task_batch([{"op": "create", "fields": fields}])
+
+    assert results[0]["status"] == "invalid"
+    assert results[0]["message"] == message
+    assert db.get_db().execute("SELECT COUNT(*) FROM tasks").fetchone()[0] == 0
+    with pytest.raises(ValueError, match=message):
+        db.add_task(**fields)
@@ -0,0 +1,43 @@
+"""complete_tasks: malformed items are "invalid" and leave the task untouched."""
+from datetime import datetime, timedelta
+
+import pytest
+
+
+def _stamp(delta):
+    return (datetime.now() + delta).strftime("%Y-%m-%d %H:%M:%S")
+
+
+@pytest.fixture
+def task(db):
+    return db.add_task("Podlać kwiaty", is_recurring=True, recurrence_type="days",
+                       recurrence_value=2)
+
+
+@pytest.mark.parametrize("task_id", [True, False])
+def test_bool_task_id_is_invalid(db, task, task_id):
+    assert task == 1  # `true == 1` is what used to complete it
+    results = db.complete_tasks([{"client_id": "c1", "task_id": task_id}])
+
+    assert results == [{"client_id": "c1", "status": "invalid"}]
+    assert db.get_db().execute("SELECT COUNT(*) FROM completions").fetchone()[0] == 0
+
+
+@pytest.mark.parametrize("completed_at", ["2099-01-01 00:00:00", _stamp(timedelta(hours=1))])
+def test_future_completion_is_invalid(db, task, completed_at):
+    before = db.get_task(task)["next_due_date"]
+    results = db.complete_tasks([{"client_id": "c1", "task_id": task,
+                                  "completed_at": completed_at}])
+
+    assert results == [{"client_id": "c1", "status": "invalid"}]
+    assert db.get_task(task)["next_due_date"] == before
+    assert db.get_db().execute("SELECT COUNT(*) FROM completions").fetchone()[0] == 0
+
+
+def test_small_clock_skew_is_accepted(db, task):
+    results = db.complete_tasks([
+        {"client_id": "ahead", "task_id": task, "completed_at": _stamp(timedelta(minutes=2))},
+        {"client_id": "past", "task_id": task, "completed_at": _stamp(-timedelta(days=3))},
+    ])
+
+    assert [r["status"] for r in results] == ["ok", "ok"]
@@ -0,0 +1,142 @@
+"""DisplayController against a fake sysfs tree and stub vcgencmd/xset/uhubctl binaries."""
+import os
+import shutil
+import threading
+
+import pytest
+
+from display import SCREEN_POWER_UP_S, DisplayController
+
+
+@pytest.fixture
+def fake_pi(tmp_path):
+    panel = tmp_path / "backlight" / "10-0045"
+    panel.mkdir(parents=True)
+    (panel / "brightness").write_text("200\n")
+    (panel / "max_brightness").write_text("200\n")
+    (panel / "bl_power").write_text("0\n")
+
+    bindir = tmp_path / "bin"
+    bindir.mkdir()
+    calls = tmp_path / "calls"
+    for name in ("vcgencmd", "xset", "uhubctl"):
+        stub = bindir / name
+        stub.write_text(f'#!/bin/sh\necho "{name} $*" >> "{calls}"\n')
+        stub.chmod(0o755)
+    return panel, bindir, calls
+
+
+def _controller(tmp_path, bindir, tools=("vcgencmd", "xset", "uhubctl"), sleeps=None):
+    def which(name):
+        return shutil.which(name, path=str(bindir)) if name in tools else None
+    sleep = sleeps.append if sleeps is not None else (lambda s: None)
+    return DisplayController(str(tmp_path / "backlight"), which=which, sleep=sleep)
+
+
+def _calls(calls):
+    return calls.read_text().splitlines() if calls.exists() else []
+
+
+def test_probe_finds_sysfs_and_tools(tmp_path, fake_pi):
+    panel, bindir, _ = fake_pi
+    caps = _controller(tmp_path, bindir).capabilities()
+    assert caps["brightness"] == str(panel / "brightness")
+    assert caps["max_brightness"] == 200
+    assert caps["bl_power"] == str(panel / "bl_power")
+    assert sorted(caps["tools"]) == ["uhubctl", "vcgencmd", "xset"]
+
+
+def test_backlight_off_and_on(tmp_path, fake_pi):
+    panel, bindir, calls = fake_pi
+    ctl = _controller(tmp_path, bindir)
+
+    assert ctl.display_power(False) == {"brightness": True, "bl_power": True,
+                                        "vcgencmd": True, "xset": True}
+    assert (panel / "brightness").read_text() == "0"
+    assert (panel / "bl_power").read_text() == "1"
+
+    ctl.display_power(True)
+    assert (panel / "brightness").read_text() == "200"
+    assert (panel / "bl_power").read_text() == "0"
+    assert _calls(calls) == ["vcgencmd display_power 0", "xset dpms force off",
+                             "vcgencmd display_power 1", "xset dpms force on"]
+
+
+def test_missing_binary_is_skipped(tmp_path, fake_pi):
+    panel, bindir, calls = fake_pi
+    ctl = _controller(tmp_path, bindir, tools=("xset",))
+    assert "vcgencmd" not in ctl.capabilities()["tools"]
+
+    results = ctl.display_power(False)
+    assert "vcgencmd" not in results and results["xset"] is True
+    assert ctl._usb_power(False) is False
+    assert _calls(calls) == ["xset dpms force off"]
+
+
+def test_binary_vanishing_after_probe_reports_false(tmp_path, fake_pi):
+    _, bindir, _ = fake_pi
+    ctl = _controller(tmp_path, bindir)
+    os.remove(bindir / "vcgencmd")
+    os.remove(bindir / "uhubctl")
+
+    assert ctl.display_power(True)["vcgencmd"] is False
+    assert ctl._usb_power(True) is False
+
+
+def test_worker_applies_queued_job(tmp_path, fake_pi):
+    panel, bindir, calls = fake_pi
+    sleeps = []
+    ctl = _controller(tmp_path, bindir, sleeps=sleeps)
+
+    job = ctl.submit("screen_off")
+    assert job["status"] in ("queued", "running") and job["action"] == "screen_off"
+    assert ctl.wait_idle(timeout=10)
+    done = ctl.get_job(job["id"])
+    assert done["status"] == "done" and done["error"] is None
+    assert done["methods"]["uhubctl"] is True
+    assert (panel / "brightness").read_text() == "0"
+    assert _calls(calls)[-1] == "uhubctl -a off -p 2"
+
+    job = ctl.submit("screen_on")
+    assert ctl.wait_idle(timeout=10)
+    assert ctl.get_job(job["id"])["status"] == "done"
+    assert _calls(calls)[-3] == "uhubctl -a on -p 2"  # USB power before the panel
+    assert sleeps == [SCREEN_POWER_UP_S]
+    assert (panel / "brightness").read_text() == "200"
+
+
+def test_pending_job_is_superseded(tmp_path, fake_pi):
+    panel, bindir, calls = fake_pi
+    release = threading.Event()
+    ctl = _controller(tmp_path, bindir)
+    ctl._sleep = lambda s: release.wait(10)  # hold the worker inside screen_on
+
+    first = ctl.submit("screen_on")
+    second = ctl.submit("backlight_off")
+    third = ctl.submit("screen_off")
+    release.set()
+    assert ctl.wait_idle(timeout=10)
+
+    assert ctl.get_job(second["id"])["status"] == "superseded"
+    assert ctl.get_job(first["id"])["status"] in ("done", "superseded")
+    assert ctl.get_job(third["id"])["status"] == "done"
+    assert _calls(calls)[-1] == "uhubctl -a off -p 2"
+    assert (panel / "brightness").read_text() == "0"
+
+
+def test_failing_job_keeps_worker_alive(tmp_path, fake_pi):
+    _, bindir, _ = fake_pi
+    ctl = _controller(tmp_path, bindir)
+    ctl._apply = lambda usb, panel: 1 / 0
+
+    job = ctl.submit("backlight_on")
+    assert ctl.wait_idle(timeout=10)
+    failed = ctl.get_job(job["id"])
+    assert failed["status"] == "failed" and "division" in failed["error"]
+
+    del ctl._apply
+    job = ctl.submit("backlight_off")
+    assert ctl.wait_idle(timeout=10)
+    assert ctl.get_job(job["id"])["status"] == "done"
+    with pytest.raises(ValueError):
+        ctl.submit("reboot")
@@ -0,0 +1,102 @@
+"""import_ndjson publishes every committed batch, not just the finished import."""
+import json
+from datetime import date, timedelta
+
+import pytest
+
+
+def _export_lines(n_tasks):
+    done = (date.today() - timedelta(days=1)).isoformat() + " 08:00:00"
+    lines = [json.dumps({"type": "header", "version": 1})]
+    for i in range(1, n_tasks + 1):
+        lines.append(json.dumps({"type": "task", "id": i, "title": f"Zadanie {i}",
+                                 "is_recurring": 1, "recurrence_type": "days",
+                                 "recurrence_value": 3}))
+        lines.append(json.dumps({"type": "completion", "task_id": i, "completed_at": done}))
+    return lines
+
+
+def test_each_batch_bumps_version_and_next_due(db, monkeypatch):
+    monkeypatch.setattr(db, "_change_listeners", [])
+    seen = []
+    db.add_change_listener(lambda board_id: seen.append(
+        (board_id, db.get_data_version(board_id),
+         db.get_db().execute("SELECT COUNT(*) FROM tasks WHERE next_due_date IS NULL").fetchone()[0])))
+
+    counts = db.import_ndjson(_export_lines(5), batch_size=4)
+
+    assert counts == {"tasks": 5, "completions": 5, "rollups": 0, "skipped": 0}
+    assert len(seen) == 3  # 10 records in batches of 4
+    versions = [v for _, v, _ in seen]
+    assert versions == sorted(set(versions))
+    assert all(board == db.DEFAULT_BOARD_ID and nulls == 0 for board, _, nulls in seen)
+    assert db.get_tasks_for_today() == []  # every task was done yesterday, due in 3 days
+
+
+def test_committed_batches_are_published_before_an_error(db, monkeypatch):
+    monkeypatch.setattr(db, "_change_listeners", [])
+    version = db.get_data_version()
+    lines = _export_lines(4) + ["{not json"]
+
+    with pytest.raises(ValueError):
+        db.import_ndjson(lines, batch_size=4)
+
+    assert db.get_data_version() > version
+    rows = db.get_db().execute("SELECT next_due_date FROM tasks").fetchall()
+    assert len(rows) == 4 and all(r[0] for r in rows)
+
+
+@pytest.mark.parametrize("completed_at", ["yesterday", "2026-13-01 08:00:00", "2026-01-01", 20260101])
+def test_malformed_completed_at_names_its_line(db, completed_at):
+    lines = _export_lines(2)
+    lines[4] = json.dumps({"type": "completion", "task_id": 2, "completed_at": completed_at})
+
+    with pytest.raises(ValueError, match="^Line 5: completed_at must be YYYY-MM-DD HH:MM:SS$"):
+        db.import_ndjson(lines)
+
+    assert db.get_db().execute("SELECT COUNT(*) FROM completions").fetchone()[0] == 0
+
+
+@pytest.mark.parametrize("rule, message", [
+    ({"recurrence_type": "bogus"}, "Unknown recurrence type: bogus"),
+    ({"recurrence_type": "days", "recurrence_value": 0}, "recurrence_value must be at least 1"),
+    ({"recurrence_type": "weekdays", "recurrence_days": "mon,xyz", "weekday_mask": 1},
+     "Unknown weekday: xyz"),
+    ({"recurrence_type": "nth_weekday", "recurrence_days": "mon", "weekday_mask": 1,
+      "recurrence_nth": 7}, r"recurrence_nth must be 1-4 or -1 \(last\)"),
+])
+def test_invalid_recurrence_rule_names_its_line(db, rule, message):
+    lines = _export_lines(1) + [json.dumps({"type": "task", "id": 9, "title": "Zła reguła",
+                                            "is_recurring": 1, **rule})]
+
+    with pytest.raises(ValueError, match=f"^Line 4: {message}$"):
+        db.import_ndjson(lines)
+
+    assert [r[0] for r in db.get_db().execute("SELECT title FROM tasks")] == []
+
+
+def test_compiled_rule_columns_are_rebuilt_from_the_rule(db):
+    tasks = [
+        {"title": "Dni tygodnia", "recurrence_type": "weekdays", "recurrence_days": "Fri, mon",
+         "weekday_mask": 0b1000000, "recurrence_nth": 3},
+        {"title": "Koniec miesiąca", "recurrence_type": "month_end", "recurrence_value": 2,
+         "recurrence_days": "tue", "weekday_mask": 0b10, "recurrence_nth": -1},
+        {"title": "N-ty dzień", "recurrence_type": "nth_weekday", "recurrence_days": "wed",
+         "weekday_mask": 0b1, "recurrence_nth": "-1"},
+        {"title": "Stary format", "recurrence_type": "weekdays", "recurrence_days": "sat",
+         "recurrence_value": 5},  # no weekday_mask: exported before intervals existed
+    ]
+    lines = [json.dumps({"type": "task", "id": i, "is_recurring": 1, **t})
+             for i, t in enumerate(tasks, start=1)]
+
+    db.import_ndjson(lines)
+
+    rows = db.get_db().execute(
+        """SELECT recurrence_type, recurrence_value, recurrence_days, weekday_mask, recurrence_nth
+           FROM tasks ORDER BY id""").fetchall()
+    assert [tuple(r) for r in rows] == [
+        ("weekdays", 1, "mon,fri", 0b10001, None),
+        ("month_end", 2, None, 0, None),
+        ("nth_weekday", 1, "wed", 0b100, -1),
+        ("weekdays", 1, "sat", 0b100000, None),
+    ]
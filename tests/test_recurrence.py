@@ -0,0 +1,86 @@
+"""Compiled recurrence rules against a naive date-by-date walk over random dates."""
+import calendar
+import random
+from datetime import date, timedelta
+
+import pytest
+
+from recurrence import WEEKDAY_NAMES, next_due, parse_rule, shows_on
+
+ONE_DAY = timedelta(days=1)
+
+
+def _random_day(rng):
+    return date(2000, 1, 1) + timedelta(days=rng.randrange(40 * 366))
+
+
+def _is_month_end(day):
+    return (day + ONE_DAY).day == 1
+
+
+def _is_nth_weekday(day, weekday, nth):
+    if day.weekday() != weekday:
+        return False
+    if nth == -1:
+        return day.month != (day + timedelta(weeks=1)).month
+    return (day.day - 1) // 7 + 1 == nth
+
+
+def _months_between(a, b):
+    return (b.year - a.year) * 12 + b.month - a.month
+
+
+def _reference_calendar(matches, last, interval):
+    """Walk back to the latest occurrence <= last, then forward to the one N months later."""
+    anchor = last
+    while not matches(anchor):
+        anchor -= ONE_DAY
+    day = anchor + ONE_DAY
+    while not (matches(day) and _months_between(anchor, day) == interval):
+        day += ONE_DAY
+    return day
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_weekday_mask_matches_day_walk(seed):
+    rng = random.Random(seed)
+    for _ in range(400):
+        days = rng.sample(WEEKDAY_NAMES, rng.randint(1, 7))
+        interval = rng.randint(1, 12)
+        rule = parse_rule("weekdays", interval, ",".join(days))
+        last = _random_day(rng)
+
+        day, seen = last, 0
+        while seen < interval:
+            day += ONE_DAY
+            if WEEKDAY_NAMES[day.weekday()] in days:
+                seen += 1
+        assert next_due(rule, last) == day, (days, interval, last)
+        assert shows_on(rule, last) == (WEEKDAY_NAMES[last.weekday()] in days)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_month_end_matches_day_walk(seed):
+    rng = random.Random(seed)
+    for _ in range(400):
+        interval = rng.randint(1, 14)
+        rule = parse_rule("month_end", interval)
+        last = _random_day(rng)
+        if rng.random() < 0.25:  # hit the boundary itself regularly
+            last = last.replace(day=calendar.monthrange(last.year, last.month)[1])
+        expected = _reference_calendar(_is_month_end, last, interval)
+        assert next_due(rule, last) == expected, (interval, last)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_nth_weekday_matches_day_walk(seed):
+    rng = random.Random(seed)
+    for _ in range(400):
+        weekday = rng.randrange(7)
+        nth = rng.choice((1, 2, 3, 4, -1))
+        interval = rng.randint(1, 14)
+        rule = parse_rule("nth_weekday", interval, WEEKDAY_NAMES[weekday], nth)
+        last = _random_day(rng)
+        matches = lambda d: _is_nth_weekday(d, weekday, nth)  # noqa: E731
+        expected = _reference_calendar(matches, last, interval)
+        assert next_due(rule, last) == expected, (WEEKDAY_NAMES[weekday], nth, interval, last)
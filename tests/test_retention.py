@@ -0,0 +1,46 @@
+import random
+from datetime import date, datetime, timedelta
+
+import pytest
+
+
+def _complete_on(db, task_id, days):
+    items = [{"client_id": f"{task_id}-{d.isoformat()}", "task_id": task_id,
+              "completed_at": datetime.combine(d, datetime.min.time())
+              .replace(hour=8 + n % 12).strftime("%Y-%m-%d %H:%M:%S")}
+             for n, d in enumerate(days)]
+    assert all(r["status"] == "ok" for r in db.complete_tasks(items))
+
+
+def _all_stats(db, task_ids):
+    return {task_id: db.get_completion_stats(task_id) for task_id in task_ids}
+
+
+@pytest.mark.parametrize("period", ["week", "day"])
+def test_stats_unchanged_by_compaction(db, period):
+    today = date.today()
+    rnd = random.Random(period)
+    daily = db.add_task("Codziennie", is_recurring=True, recurrence_type="days", recurrence_value=1)
+    _complete_on(db, daily, [today - timedelta(days=n) for n in range(1, 801)])
+
+    # Gaps of every length break and resume streaks at random points
+    gappy = db.add_task("Z przerwami", is_recurring=True, recurrence_type="days", recurrence_value=2)
+    _complete_on(db, gappy, [today - timedelta(days=n) for n in range(1, 700)
+                             if rnd.random() < 0.6])
+
+    weekly = db.add_task("Pn/Śr/Pt", is_recurring=True, recurrence_type="weekdays",
+                         recurrence_value=1, recurrence_days="mon,wed,fri")
+    _complete_on(db, weekly, [today - timedelta(days=n) for n in range(1, 600)
+                              if (today - timedelta(days=n)).weekday() in (0, 2, 4)])
+
+    before = _all_stats(db, [daily, gappy, weekly])
+    assert before[daily]["current_streak"] == before[daily]["longest_streak"] == 800
+
+    result = db.compact_completions(retention_days=30, period=period, pause=0)
+    assert result["rolled_up"] > 0
+    assert _all_stats(db, [daily, gappy, weekly]) == before
+
+
+def test_legacy_rollups_get_first_and_last_day_bits(db):
+    assert db._rollup_day_mask("2026-03-02", "2026-03-02 07:00:00", "2026-03-08 21:00:00") == 0b1000001
+    assert db._rollup_day_mask("2026-03-04", "2026-03-04 07:00:00", "2026-03-04 09:00:00") == 1
@@ -0,0 +1,85 @@
+"""get_tasks_for_today() (materialized next_due_date) against the original per-task logic."""
+import calendar
+import random
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from recurrence import WEEKDAY_NAMES
+
+
+def _add_months(day, months):
+    month = day.month - 1 + months
+    year, month = day.year + month // 12, month % 12 + 1
+    return day.replace(year=year, month=month,
+                       day=min(day.day, calendar.monthrange(year, month)[1]))
+
+
+def _reference_today(conn, today):
+    """The dashboard before next_due_date existed: one decision per task, read live."""
+    shown = []
+    for task in conn.execute("SELECT * FROM tasks WHERE active = 1 ORDER BY sort_order, id"):
+        if task["start_date"] and today < date.fromisoformat(task["start_date"]):
+            continue
+        if task["end_date"] and today > date.fromisoformat(task["end_date"]):
+            continue
+        if not task["is_recurring"]:
+            shown.append(task["id"])
+            continue
+        last = conn.execute("SELECT MAX(completed_at) FROM completions WHERE task_id = ?",
+                            (task["id"],)).fetchone()[0]
+        last = datetime.strptime(last, "%Y-%m-%d %H:%M:%S").date() if last else None
+        kind, value = task["recurrence_type"], task["recurrence_value"] or 1
+        if kind == "weekdays":
+            if WEEKDAY_NAMES[today.weekday()] in task["recurrence_days"].split(",") and last != today:
+                shown.append(task["id"])
+            continue
+        if last is None:
+            shown.append(task["id"])
+            continue
+        if kind == "days":
+            due = last + timedelta(days=value)
+        elif kind == "weeks":
+            due = last + timedelta(weeks=value)
+        else:
+            due = _add_months(last, value)
+        if today >= due:
+            shown.append(task["id"])
+    return shown
+
+
+def _random_board(db, rnd, today, tasks=200):
+    completions = []
+    for n in range(tasks):
+        kind = rnd.choice(["days", "weeks", "months", "weekdays", "once"])
+        window = {}
+        if rnd.random() < 0.2:
+            window["start_date"] = (today + timedelta(days=rnd.randint(-10, 10))).isoformat()
+        if rnd.random() < 0.2:
+            window["end_date"] = (today + timedelta(days=rnd.randint(-10, 10))).isoformat()
+        if kind == "once":
+            task_id = db.add_task(f"Zadanie {n}", **window)
+        elif kind == "weekdays":
+            days = rnd.sample(WEEKDAY_NAMES, rnd.randint(1, 4))
+            task_id = db.add_task(f"Zadanie {n}", is_recurring=True, recurrence_type=kind,
+                                  recurrence_value=1, recurrence_days=",".join(days), **window)
+        else:
+            task_id = db.add_task(f"Zadanie {n}", is_recurring=True, recurrence_type=kind,
+                                  recurrence_value=rnd.randint(1, 3), **window)
+        for k in range(rnd.choice([0, 0, 1, 2, 5])):
+            day = today - timedelta(days=rnd.choice([0, 0, 1, 2, 3, 6, 7, 8, 13, 30, 31, 60, 95]))
+            completions.append({"client_id": f"{task_id}-{k}", "task_id": task_id,
+                                "completed_at": f"{day.isoformat()} {rnd.randint(0, 23):02d}:"
+                                                f"{rnd.randint(0, 59):02d}:00"})
+    rnd.shuffle(completions)
+    db.complete_tasks(completions)
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_today_matches_per_task_logic(db, seed):
+    today = date.today()
+    _random_board(db, random.Random(seed), today)
+    expected = _reference_today(db.get_db(), today)
+    assert [t["id"] for t in db.get_tasks_for_today()] == expected
+    # Second call is served from the cache and must not differ
+    assert [t["id"] for t in db.get_tasks_for_today()] == expected